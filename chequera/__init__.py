@@ -1,2 +1,9 @@
 from . import models
-#from . import controllers
\ No newline at end of file
+#from . import controllers
+
+
+def post_init_hook(env):
+    # Con todas las tablas ya creadas: fecha de compra, estadísticas de riesgo
+    # e índice de movimientos
+    env['chequera.check']._init_risk_stats()
+    env['chequera.check']._init_movement_index()
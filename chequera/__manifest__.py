@@ -1,7 +1,7 @@
 {
     "name": "Chequera",
     "summary": "Gestión de compra y venta de cheques",
-    "version": "1.0",
+    "version": "1.1",
     "category": "Finance",
     "author": "VRP",
     "website": "https://virtualremotepartner.com/",
@@ -9,6 +9,7 @@
         "base",
         "mail",
         "web",
+        "bus",
         "custom_contact_types",
     ],
     "data": [
@@ -20,6 +21,7 @@
         "data/chequera_sequence.xml",
         "data/chequera_sale_sequence.xml",
         "data/chequera_formula_data.xml",
+        "data/chequera_job_data.xml",
         
         # Vistas - es importante el orden
         #"views/chequera_dashboard_view.xml",
@@ -33,17 +35,23 @@
         "views/chequera_reversion_confirmation_view.xml",
         "views/chequera_wallet_view.xml",
         "views/chequera_check_view.xml",
+        "views/chequera_check_import_view.xml",
+        "views/chequera_check_audit_view.xml",
+        "views/chequera_maturity_ladder_view.xml",
         "views/chequera_operations_view.xml",
         "views/chequera_dashboard_new_view.xml",
+        "views/chequera_job_view.xml",
         "views/chequera_menus.xml",
     ],
     "assets": {
         "web.assets_backend": [
             "/chequera/static/src/css/chequera_style.css",
+            "/chequera/static/src/js/chequera_job_service.js",
         ],
     },
     "application": True,
     "installable": True,
     "auto_install": False,
+    "post_init_hook": "post_init_hook",
     "images": ["static/description/icon.png"],
 }
\ No newline at end of file
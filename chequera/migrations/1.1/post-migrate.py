@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Completa la fecha de compra, las estadísticas de riesgo y el índice de movimientos"""
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['chequera.check']._init_risk_stats()
+    env['chequera.check']._init_movement_index()
@@ -12,4 +12,14 @@ from . import chequera_sale_wizard
 from . import chequera_rejection_wizard
 from . import chequera_reversion_confirmation
 from . import chequera_dashboard
-from . import chequera_security
\ No newline at end of file
+from . import chequera_security
+from . import ir_sequence
+from . import chequera_check_import
+from . import chequera_check_audit
+from . import chequera_check_search
+from . import chequera_emisor_risk
+from . import chequera_maturity_ladder
+from . import chequera_check_image
+from . import chequera_movement_index
+from . import chequera_job
+from . import ir_actions_report
@@ -151,8 +151,8 @@ class ChequeraCheck(models.Model):
     is_in_sale_wizard = fields.Boolean(string='En proceso de venta múltiple', default=False, copy=False)
 
     # Campo para saber si el cheque está en una operación confirmada
-    operation_id = fields.Many2one('chequera.purchase.wizard', string='Operación de compra', readonly=True)
-    sale_operation_id = fields.Many2one('chequera.sale.wizard', string='Operación de venta', readonly=True)
+    operation_id = fields.Many2one('chequera.purchase.wizard', string='Operación de compra', readonly=True, index=True)
+    sale_operation_id = fields.Many2one('chequera.sale.wizard', string='Operación de venta', readonly=True, index=True)
 
     # Campos computados
     dias_para_vencimiento = fields.Integer(string='Días para vencimiento', compute='_compute_dias_para_vencimiento', store=True)
@@ -177,29 +177,23 @@ class ChequeraCheck(models.Model):
         if not isinstance(vals_list, list):
             vals_list = [vals_list]
         
+        # Reservar en bloque los códigos de todos los cheques nuevos
+        vals_sin_codigo = [vals for vals in vals_list if vals.get('name', 'Nuevo') == 'Nuevo']
+        if vals_sin_codigo:
+            codigos = self.env['ir.sequence'].next_block_by_code(
+                'chequera.check.sequence', len(vals_sin_codigo)
+            )
+            for vals, codigo in zip(vals_sin_codigo, codigos):
+                vals['name'] = codigo or '000000'
+
+        proveedor_no_definido = None
         for vals in vals_list:
-            # Generar secuencia si es necesario
-            if vals.get('name', 'Nuevo') == 'Nuevo':
-                vals['name'] = self.env['ir.sequence'].next_by_code('chequera.check.sequence') or '000000'
-            
             # NUEVA LÓGICA PARA IMPORTACIÓN (sin usar supplier_rank)
             # Si viene con precio_compra pero sin proveedor (típico de importación)
             if vals.get('precio_compra') and not vals.get('proveedor_id'):
-                # Buscar o crear el proveedor "No definido"
-                proveedor_no_definido = self.env['res.partner'].search([
-                    ('name', '=', 'PROVEEDOR NO DEFINIDO'),
-                    ('is_company', '=', True)
-                ], limit=1)
-                
-                if not proveedor_no_definido:
-                    # Crear el proveedor no definido sin usar supplier_rank
-                    proveedor_no_definido = self.env['res.partner'].create({
-                        'name': 'PROVEEDOR NO DEFINIDO',
-                        'is_company': True,
-                        'tasa_pesificacion_compra': 0.0,
-                        'interes_mensual_compra': 0.0,
-                        'comment': 'Proveedor automático para cheques importados sin proveedor específico'
-                    })
+                # Se resuelve una sola vez por lote
+                if proveedor_no_definido is None:
+                    proveedor_no_definido = self._get_proveedor_no_definido()
                 
                 vals['proveedor_id'] = proveedor_no_definido.id
                 
@@ -216,6 +210,25 @@ class ChequeraCheck(models.Model):
 
         return super(ChequeraCheck, self).create(vals_list)
 
+    @api.model
+    def _get_proveedor_no_definido(self):
+        """Buscar o crear el proveedor "No definido" usado en cheques importados"""
+        proveedor = self.env['res.partner'].search([
+            ('name', '=', 'PROVEEDOR NO DEFINIDO'),
+            ('is_company', '=', True)
+        ], limit=1)
+        
+        if not proveedor:
+            # Crear el proveedor no definido sin usar supplier_rank
+            proveedor = self.env['res.partner'].create({
+                'name': 'PROVEEDOR NO DEFINIDO',
+                'is_company': True,
+                'tasa_pesificacion_compra': 0.0,
+                'interes_mensual_compra': 0.0,
+                'comment': 'Proveedor automático para cheques importados sin proveedor específico'
+            })
+        return proveedor
+
     @api.depends('fecha_pago')
     def _compute_fecha_vencimiento(self):
         for record in self:
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo import models, fields, _
+
+# Clave de contexto que activa el modo masivo; su valor describe la operación
+BULK_OPERATION_KEY = 'chequera_bulk_operation'
+
+PRICE_FIELDS = [
+    'pesificacion_valor_compra', 'interes_valor_compra', 'precio_compra',
+    'pesificacion_valor_venta', 'interes_valor_venta', 'precio_venta',
+]
+
+
+class ChequeraCheckBulkAudit(models.Model):
+    """Registro compacto de una operación masiva sobre cheques.
+
+    Reemplaza los mensajes de seguimiento por cheque: una sola fila guarda la
+    operación, el usuario, los cheques afectados y los valores anteriores y
+    nuevos de cada campo modificado en JSON.
+    """
+    _name = 'chequera.check.bulk.audit'
+    _description = 'Auditoría de operaciones masivas sobre cheques'
+    _order = 'date desc, id desc'
+
+    name = fields.Char(string='Operación', required=True, readonly=True)
+    user_id = fields.Many2one('res.users', string='Usuario', readonly=True,
+                              default=lambda self: self.env.user)
+    date = fields.Datetime(string='Fecha', readonly=True, default=fields.Datetime.now)
+    check_ids = fields.Many2many('chequera.check', 'chequera_check_bulk_audit_rel',
+                                 'audit_id', 'check_id', string='Cheques', readonly=True)
+    check_count = fields.Integer(string='Cantidad de cheques', readonly=True)
+    changed_fields = fields.Char(string='Campos modificados', readonly=True)
+    changes = fields.Text(string='Cambios (JSON)', readonly=True)
+
+
+class ChequeraCheckBulkTracking(models.Model):
+    _inherit = 'chequera.check'
+
+    bulk_audit_ids = fields.Many2many('chequera.check.bulk.audit', 'chequera_check_bulk_audit_rel',
+                                      'check_id', 'audit_id', string='Auditoría masiva',
+                                      readonly=True, copy=False)
+
+    def _get_bulk_tracking_threshold(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param('chequera.bulk_tracking_threshold', 20))
+
+    def _is_bulk_operation(self):
+        """Modo masivo: pedido por contexto o automático a partir del umbral configurado"""
+        if self.env.context.get('tracking_disable') or not all(self._ids):
+            return False
+        return bool(self.env.context.get(BULK_OPERATION_KEY)) or len(self) >= self._get_bulk_tracking_threshold()
+
+    def _bulk_audit_snapshot(self, fnames):
+        return {values['id']: values for values in self.read(fnames)}
+
+    def _bulk_audit_log(self, before, fnames):
+        """Compara con la foto previa y guarda una única fila de auditoría con los cambios"""
+        after = self._bulk_audit_snapshot(fnames)
+        changes = {}
+        changed_fields = set()
+        for check_id, new_values in after.items():
+            old_values = before.get(check_id, {})
+            diff = {
+                fname: [old_values.get(fname), new_values[fname]]
+                for fname in fnames
+                if old_values.get(fname) != new_values[fname]
+            }
+            if diff:
+                changes[str(check_id)] = diff
+                changed_fields.update(diff)
+        if not changes:
+            return False
+
+        operation = self.env.context.get(BULK_OPERATION_KEY)
+        if not isinstance(operation, str):
+            operation = _('Escritura masiva')
+        return self.env['chequera.check.bulk.audit'].sudo().create({
+            'name': operation,
+            'user_id': self.env.uid,
+            'check_ids': [(6, 0, [int(check_id) for check_id in changes])],
+            'check_count': len(changes),
+            'changed_fields': ', '.join(
+                self._fields[fname].string for fname in sorted(changed_fields)
+            ),
+            'changes': json.dumps(changes, default=str),
+        })
+
+    def write(self, vals):
+        if not self._is_bulk_operation():
+            return super().write(vals)
+
+        # Campos seguidos que se escriben, más los precios que pueden recalcularse por dependencia
+        fnames = sorted(self._track_get_fields() & (set(vals) | set(PRICE_FIELDS)))
+        before = self._bulk_audit_snapshot(fnames)
+        res = super(ChequeraCheckBulkTracking, self.with_context(tracking_disable=True)).write(vals)
+        self._bulk_audit_log(before, fnames)
+        return res
+
+    def action_recompute_precios(self):
+        """Recalcula en bloque los precios almacenados con una sola fila de auditoría"""
+        checks = self.with_context(**{BULK_OPERATION_KEY: _('Recálculo de precios')})
+        before = checks._bulk_audit_snapshot(PRICE_FIELDS)
+        for fname in PRICE_FIELDS:
+            self.env.add_to_compute(self._fields[fname], checks)
+        checks.flush_recordset(PRICE_FIELDS)
+        checks._bulk_audit_log(before, PRICE_FIELDS)
+        return True
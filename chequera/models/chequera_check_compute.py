@@ -1,9 +1,79 @@
 from odoo import models, fields, api
 from datetime import date
 
+# Fórmulas por defecto, en orden de evaluación: pesificación, interés y precio
+DEFAULT_FORMULAS = {
+    'compra': (
+        ('pesificacion_valor_compra', "record.monto * record.tasa_pesificacion_compra / 100"),
+        ('interes_valor_compra', "record.monto * record.interes_mensual_compra / 100 * record.meses_hasta_vencimiento"),
+        ('precio_compra', "record.monto - record.pesificacion_valor_compra - record.interes_valor_compra"),
+    ),
+    'venta': (
+        ('pesificacion_valor_venta', "record.monto * record.tasa_pesificacion_venta / 100"),
+        ('interes_valor_venta', "record.monto * record.interes_mensual_venta / 100 * record.meses_hasta_vencimiento"),
+        ('precio_venta', "record.monto - record.pesificacion_valor_venta - record.interes_valor_venta"),
+    ),
+}
+
+
+# Tasas que un wizard aplica en bloque y que el operador puede ajustar por cheque
+RATE_FIELDS = {
+    'compra': ('tasa_pesificacion_compra', 'interes_mensual_compra'),
+    'venta': ('tasa_pesificacion_venta', 'interes_mensual_venta'),
+}
+
+# Clave de contexto con la que cada wizard abre el formulario del cheque
+WIZARD_CONTEXT_KEYS = {
+    'compra': 'wizard_id',
+    'venta': 'sale_wizard_id',
+}
+
+
+class _PreviewRecord:
+    """Cheque con valores sobrescritos en memoria, para evaluar fórmulas sin escribir en la base"""
+
+    def __init__(self, record, values):
+        self._record = record
+        self.__dict__.update(values)
+
+    def __getattr__(self, name):
+        return getattr(self._record, name)
+
+
 class ChequeraCheckCompute(models.Model):
     _inherit = 'chequera.check'
     
+    # Tasas ajustadas a mano desde el wizard: las tasas masivas no las pisan
+    tasas_compra_manuales = fields.Boolean(string='Tasas de compra ajustadas', copy=False, readonly=True)
+    tasas_venta_manuales = fields.Boolean(string='Tasas de venta ajustadas', copy=False, readonly=True)
+    
+    # Vista previa con las tasas pendientes del wizard en borrador que contiene el cheque
+    tasa_pesificacion_compra_preview = fields.Float(string='Tasa de pesificación (%)', compute='_compute_preview_compra')
+    interes_mensual_compra_preview = fields.Float(string='Interés mensual (%)', compute='_compute_preview_compra')
+    precio_compra_preview = fields.Float(string='Precio de compra', compute='_compute_preview_compra')
+    tasa_pesificacion_venta_preview = fields.Float(string='Tasa de pesificación (%)', compute='_compute_preview_venta')
+    interes_mensual_venta_preview = fields.Float(string='Interés mensual (%)', compute='_compute_preview_venta')
+    precio_venta_preview = fields.Float(string='Precio de venta', compute='_compute_preview_venta')
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Un cheque cargado desde el wizard con tasas distintas a las masivas queda ajustado
+        for context_type, context_key in WIZARD_CONTEXT_KEYS.items():
+            if not self.env.context.get(context_key):
+                continue
+            for vals in vals_list:
+                if any(field_name in vals and vals[field_name] != self.env.context.get('default_' + field_name)
+                       for field_name in RATE_FIELDS[context_type]):
+                    vals['tasas_%s_manuales' % context_type] = True
+        return super().create(vals_list)
+    
+    def write(self, vals):
+        # Tasas editadas desde el formulario abierto por el wizard
+        for context_type, context_key in WIZARD_CONTEXT_KEYS.items():
+            if self.env.context.get(context_key) and set(RATE_FIELDS[context_type]) & set(vals):
+                vals = dict(vals, **{'tasas_%s_manuales' % context_type: True})
+        return super().write(vals)
+    
     # Computos de fechas y valores
     @api.depends('fecha_vencimiento')
     def _compute_dias_para_vencimiento(self):
@@ -43,82 +113,100 @@ class ChequeraCheckCompute(models.Model):
             else:
                 record.meses_hasta_vencimiento = 0
     
+    @api.model
+    def _get_formulas(self, context_type):
+        """Devuelve [(campo, código)] en orden de evaluación, con las fórmulas personalizadas si existen"""
+        formulas = self.env['chequera.formula_config'].search([
+            ('context_type', '=', context_type)
+        ])
+        codes = {formula.field_name: formula.code for formula in formulas}
+        return [(field_name, codes.get(field_name, default))
+                for field_name, default in DEFAULT_FORMULAS[context_type]]
+    
+    @api.model
+    def _apply_formulas(self, record, formulas):
+        """Evalúa las fórmulas sobre ``record`` asignando cada resultado antes de la siguiente"""
+        fallbacks = (0, 0, record.monto)
+        for (field_name, code), fallback in zip(formulas, fallbacks):
+            # Evaluar fórmulas (con seguridad)
+            try:
+                value = eval(code)
+            except Exception:
+                value = fallback
+            setattr(record, field_name, value)
+    
     @api.depends('monto', 'fecha_pago', 'fecha_vencimiento', 'tasa_pesificacion_compra', 'interes_mensual_compra', 'meses_hasta_vencimiento')
     def _compute_valores_compra(self):
+        # Las fórmulas se resuelven una sola vez para todo el lote
+        formulas = self._get_formulas('compra')
         for record in self:
-            # Obtener fórmulas configuradas para cada cálculo
-            formulas = self.env['chequera.formula_config'].search([
-                ('context_type', '=', 'compra')
-            ])
-            
-            # Por defecto, si no hay fórmulas personalizadas
-            pesificacion_formula = "record.monto * record.tasa_pesificacion_compra / 100"
-            interes_formula = "record.monto * record.interes_mensual_compra / 100 * record.meses_hasta_vencimiento"
-            precio_formula = "record.monto - record.pesificacion_valor_compra - record.interes_valor_compra"
-            
-            # Buscar fórmulas personalizadas si existen
-            for formula in formulas:
-                if formula.field_name == 'pesificacion_valor_compra':
-                    pesificacion_formula = formula.code
-                elif formula.field_name == 'interes_valor_compra':
-                    interes_formula = formula.code
-                elif formula.field_name == 'precio_compra':
-                    precio_formula = formula.code
-            
-            # Evaluar fórmulas (con seguridad)
-            try:
-                record.pesificacion_valor_compra = eval(pesificacion_formula)
-            except Exception as e:
-                record.pesificacion_valor_compra = 0
-                
-            try:
-                record.interes_valor_compra = eval(interes_formula)
-            except Exception as e:
-                record.interes_valor_compra = 0
-                
-            try:
-                # CAMBIO: Siempre recalcular, igual que en venta
-                record.precio_compra = eval(precio_formula)
-            except Exception as e:
-                record.precio_compra = record.monto
+            # CAMBIO: Siempre recalcular, igual que en venta
+            self._apply_formulas(record, formulas)
     
     @api.depends('monto', 'fecha_pago', 'fecha_vencimiento', 'tasa_pesificacion_venta', 'interes_mensual_venta', 'meses_hasta_vencimiento')
     def _compute_valores_venta(self):
+        # Las fórmulas se resuelven una sola vez para todo el lote
+        formulas = self._get_formulas('venta')
         for record in self:
-            # Obtener fórmulas configuradas para cada cálculo
-            formulas = self.env['chequera.formula_config'].search([
-                ('context_type', '=', 'venta')
-            ])
-            
-            # Por defecto, si no hay fórmulas personalizadas
-            pesificacion_formula = "record.monto * record.tasa_pesificacion_venta / 100"
-            interes_formula = "record.monto * record.interes_mensual_venta / 100 * record.meses_hasta_vencimiento"
-            precio_formula = "record.monto - record.pesificacion_valor_venta - record.interes_valor_venta"
-            
-            # Buscar fórmulas personalizadas si existen
-            for formula in formulas:
-                if formula.field_name == 'pesificacion_valor_venta':
-                    pesificacion_formula = formula.code
-                elif formula.field_name == 'interes_valor_venta':
-                    interes_formula = formula.code
-                elif formula.field_name == 'precio_venta':
-                    precio_formula = formula.code
-            
-            # Evaluar fórmulas (con seguridad)
-            try:
-                record.pesificacion_valor_venta = eval(pesificacion_formula)
-            except Exception as e:
-                record.pesificacion_valor_venta = 0
-                
-            try:
-                record.interes_valor_venta = eval(interes_formula)
-            except Exception as e:
-                record.interes_valor_venta = 0
-                
-            try:
-                record.precio_venta = eval(precio_formula)
-            except Exception as e:
-                record.precio_venta = record.monto
+            self._apply_formulas(record, formulas)
+    
+    def _pending_vals_for(self, context_type, pending_vals):
+        """Valores pendientes del wizard para este cheque, sin las tasas si fueron ajustadas a mano"""
+        if self['tasas_%s_manuales' % context_type]:
+            rate_fields = RATE_FIELDS[context_type]
+            return {key: value for key, value in pending_vals.items() if key not in rate_fields}
+        return pending_vals
+    
+    def _write_pending_vals(self, context_type, pending_vals, vals):
+        """Confirma los cheques de un wizard: las tasas masivas solo en los no ajustados a mano"""
+        manual_field = 'tasas_%s_manuales' % context_type
+        cheques = self.with_context(**{key: False for key in WIZARD_CONTEXT_KEYS.values()})
+        manual = cheques.filtered(manual_field)
+        for group in (cheques - manual, manual):
+            if group:
+                group.write(dict(group[:1]._pending_vals_for(context_type, pending_vals), **vals, **{manual_field: False}))
+    
+    def _preview_records(self, context_type, pending_vals):
+        """Cheques con las tasas pendientes de un wizard aplicadas en memoria: {id: vista previa}"""
+        formulas = self._get_formulas(context_type)
+        previews = {}
+        for record in self:
+            preview = _PreviewRecord(record, record._pending_vals_for(context_type, pending_vals))
+            self._apply_formulas(preview, formulas)
+            previews[record.id] = preview
+        return previews
+    
+    def _preview_precios(self, context_type, pending_vals):
+        """Precio de cada cheque con las tasas pendientes de un wizard, calculado en memoria sin escribir"""
+        precio_field = DEFAULT_FORMULAS[context_type][-1][0]
+        return {
+            record_id: getattr(preview, precio_field)
+            for record_id, preview in self._preview_records(context_type, pending_vals).items()
+        }
+    
+    def _compute_preview(self, context_type, wizard_model):
+        tasa_field, interes_field = RATE_FIELDS[context_type]
+        precio_field = DEFAULT_FORMULAS[context_type][-1][0]
+        wizards = self.env[wizard_model].search([
+            ('state', '=', 'borrador'),
+            ('check_ids', 'in', self.ids),
+        ]) if self.ids else self.env[wizard_model]
+        previews = {}
+        for wizard in wizards:
+            cheques = wizard.check_ids & self
+            previews.update(cheques._preview_records(context_type, wizard._get_pending_check_vals()))
+        for record in self:
+            # Fuera de un wizard en borrador se muestran los valores guardados
+            source = previews.get(record.id, record)
+            record[tasa_field + '_preview'] = getattr(source, tasa_field)
+            record[interes_field + '_preview'] = getattr(source, interes_field)
+            record[precio_field + '_preview'] = getattr(source, precio_field)
+    
+    def _compute_preview_compra(self):
+        self._compute_preview('compra', 'chequera.purchase.wizard')
+    
+    def _compute_preview_venta(self):
+        self._compute_preview('venta', 'chequera.sale.wizard')
                 
     # Cálculo de datos para el dashboard
     def _compute_dashboard_data(self):
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+
+# Tamaño máximo del original normalizado
+IMAGE_MAX_SIZE = 1920
+
+# Adjuntos sueltos que alimentan la imagen normalizada del mismo lado
+ARCHIVO_IMAGE_FIELDS = {
+    'archivo_frente_id': 'image_frente',
+    'archivo_dorso_id': 'image_dorso',
+}
+
+
+class ChequeraCheckImage(models.Model):
+    _inherit = 'chequera.check'
+
+    # Original comprimido y redimensionado una sola vez al subirlo
+    image_frente = fields.Image(string='Frente del Cheque', max_width=IMAGE_MAX_SIZE, max_height=IMAGE_MAX_SIZE)
+    image_dorso = fields.Image(string='Dorso del Cheque', max_width=IMAGE_MAX_SIZE, max_height=IMAGE_MAX_SIZE)
+
+    # Miniaturas almacenadas: las listas, kanban y wizards solo leen estas
+    image_frente_128 = fields.Image(string='Miniatura Frente', related='image_frente',
+                                    max_width=128, max_height=128, store=True)
+    image_frente_512 = fields.Image(string='Vista Previa Frente', related='image_frente',
+                                    max_width=512, max_height=512, store=True)
+    image_dorso_128 = fields.Image(string='Miniatura Dorso', related='image_dorso',
+                                   max_width=128, max_height=128, store=True)
+    image_dorso_512 = fields.Image(string='Vista Previa Dorso', related='image_dorso',
+                                   max_width=512, max_height=512, store=True)
+
+    @api.model
+    def _find_archivo_duplicates(self, attachments):
+        """Devuelve {checksum: adjunto} con los adjuntos ya usados por otros cheques con igual contenido"""
+        checksums = [checksum for checksum in attachments.mapped('checksum') if checksum]
+        if not checksums:
+            return {}
+        existing = {}
+        cheques = self.sudo().search([
+            '|',
+            ('archivo_frente_id.checksum', 'in', checksums),
+            ('archivo_dorso_id.checksum', 'in', checksums),
+        ])
+        for attachment in (cheques.archivo_frente_id | cheques.archivo_dorso_id) - attachments:
+            if attachment.checksum in checksums:
+                existing.setdefault(attachment.checksum, attachment)
+        return existing
+
+    @api.model
+    def _prepare_archivo_images(self, vals_list):
+        """Reutiliza adjuntos repetidos y copia las imágenes al campo normalizado.
+
+        Si el mismo archivo ya está vinculado a otro cheque se apunta a ese
+        adjunto y se borra la subida temporal; la imagen se procesa una única
+        vez al escribirse en ``image_frente``/``image_dorso``.
+        """
+        attachment_ids = {
+            vals[archivo_field]
+            for vals in vals_list
+            for archivo_field in ARCHIVO_IMAGE_FIELDS
+            if vals.get(archivo_field)
+        }
+        if not attachment_ids:
+            return
+        attachments = self.env['ir.attachment'].browse(attachment_ids).exists()
+        duplicates = self._find_archivo_duplicates(attachments)
+
+        discarded = self.env['ir.attachment']
+        for vals in vals_list:
+            for archivo_field, image_field in ARCHIVO_IMAGE_FIELDS.items():
+                attachment = attachments.filtered(lambda a: a.id == vals.get(archivo_field))
+                if not attachment:
+                    continue
+                duplicate = duplicates.get(attachment.checksum)
+                if duplicate:
+                    vals[archivo_field] = duplicate.id
+                    if not attachment.res_id:
+                        discarded |= attachment
+                if image_field not in vals and (attachment.mimetype or '').startswith('image/'):
+                    vals[image_field] = attachment.datas
+        if discarded:
+            discarded.sudo().unlink()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self._prepare_archivo_images(vals_list)
+        return super().create(vals_list)
+
+    def write(self, vals):
+        if any(vals.get(archivo_field) for archivo_field in ARCHIVO_IMAGE_FIELDS):
+            self._prepare_archivo_images([vals])
+        return super().write(vals)
@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+import base64
+import csv
+import io
+import logging
+import re
+from datetime import date, datetime
+from itertools import islice
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Entero con puntos de miles: "1.234" o "12.345.678"
+THOUSANDS_RE = re.compile(r'^-?\d{1,3}(\.\d{3})+$')
+
+# Encabezados aceptados en el archivo -> clave interna
+IMPORT_COLUMNS = {
+    'numero_cheque': 'numero_cheque',
+    'numero': 'numero_cheque',
+    'banco': 'banco',
+    'banco_codigo': 'banco',
+    'emisor': 'emisor',
+    'cuit': 'cuit',
+    'emisor_cuit': 'cuit',
+    'monto': 'monto',
+    'fecha_pago': 'fecha_pago',
+    'fecha_emision': 'fecha_emision',
+    'proveedor': 'proveedor',
+    'tasa_pesificacion_compra': 'tasa_pesificacion_compra',
+    'interes_mensual_compra': 'interes_mensual_compra',
+    'precio_compra': 'precio_compra',
+}
+
+
+class ChequeraCheckImportError(models.TransientModel):
+    _name = 'chequera.check.import.error'
+    _description = 'Error de importación de cheques'
+    _order = 'row_number'
+
+    wizard_id = fields.Many2one('chequera.check.import.wizard', string='Importación',
+                                required=True, ondelete='cascade')
+    row_number = fields.Integer(string='Fila')
+    numero_cheque = fields.Char(string='Número de cheque')
+    message = fields.Char(string='Error')
+
+
+class ChequeraCheckImportWizard(models.TransientModel):
+    _name = 'chequera.check.import.wizard'
+    _description = 'Importación masiva de cheques'
+
+    file = fields.Binary(string='Archivo', required=True)
+    filename = fields.Char(string='Nombre del archivo')
+    batch_size = fields.Integer(string='Cheques por lote', default=2000, required=True)
+    create_missing_emisores = fields.Boolean(
+        string='Crear emisores inexistentes',
+        default=True,
+        help='Si el emisor no existe (por CUIT o nombre) se crea automáticamente.'
+    )
+
+    state = fields.Selection([
+        ('draft', 'Borrador'),
+        ('done', 'Importado')
+    ], default='draft', string='Estado')
+    total_rows = fields.Integer(string='Filas leídas', readonly=True)
+    imported_count = fields.Integer(string='Cheques importados', readonly=True)
+    error_count = fields.Integer(string='Filas con error', readonly=True)
+    error_ids = fields.One2many('chequera.check.import.error', 'wizard_id', string='Errores', readonly=True)
+
+    # ==========================================
+    # LECTURA DEL ARCHIVO
+    # ==========================================
+
+    def _iter_rows(self):
+        """Genera (número de fila, dict) sin cargar todas las filas en memoria"""
+        data = base64.b64decode(self.file)
+        filename = (self.filename or '').lower()
+        if filename.endswith('.xlsx'):
+            rows = self._iter_xlsx_rows(data)
+        elif filename.endswith('.csv') or not filename:
+            rows = self._iter_csv_rows(data)
+        else:
+            raise UserError(_('Formato no soportado. Use un archivo CSV o XLSX.'))
+
+        header = None
+        for row_number, row in enumerate(rows, start=1):
+            if header is None:
+                header = [self._normalize_header(cell) for cell in row]
+                unknown = [h for h in header if h and h not in IMPORT_COLUMNS]
+                if unknown:
+                    raise UserError(_('Columnas desconocidas en el archivo: %s') % ', '.join(unknown))
+                for required in ('numero_cheque', 'banco', 'monto', 'fecha_pago'):
+                    if required not in [IMPORT_COLUMNS.get(h) for h in header]:
+                        raise UserError(_('Falta la columna obligatoria "%s".') % required)
+                continue
+            if not any(cell not in (None, '') for cell in row):
+                continue
+            yield row_number, {
+                IMPORT_COLUMNS[key]: value
+                for key, value in zip(header, row) if key
+            }
+
+    def _iter_csv_rows(self, data):
+        try:
+            text = data.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            text = data.decode('latin-1')
+        try:
+            dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        return csv.reader(io.StringIO(text), dialect)
+
+    def _iter_xlsx_rows(self, data):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise UserError(_('Para importar archivos XLSX se requiere la librería openpyxl.'))
+        workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+        return workbook.active.iter_rows(values_only=True)
+
+    @staticmethod
+    def _normalize_header(cell):
+        return str(cell or '').strip().lower().replace(' ', '_')
+
+    # ==========================================
+    # CONVERSIÓN DE VALORES
+    # ==========================================
+
+    @staticmethod
+    def _parse_text(value):
+        if value is None:
+            return ''
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value).strip()
+
+    @staticmethod
+    def _parse_float(value):
+        if value in (None, ''):
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        # Formato es-AR: punto de miles y coma decimal ("1.234,56")
+        value = str(value).strip().replace('$', '').replace(' ', '')
+        if ',' in value:
+            value = value.replace('.', '').replace(',', '.')
+        elif THOUSANDS_RE.match(value):
+            value = value.replace('.', '')
+        return float(value)
+
+    @staticmethod
+    def _parse_date(value):
+        if value in (None, ''):
+            return None
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        value = str(value).strip()
+        for fmt in ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y'):
+            try:
+                return datetime.strptime(value, fmt).date()
+            except ValueError:
+                continue
+        raise ValueError(_('Fecha inválida: %s') % value)
+
+    # ==========================================
+    # MAPAS DE BÚSQUEDA
+    # ==========================================
+
+    def _load_bank_map(self):
+        """Bancos por código y por nombre (tabla chica, se carga completa)"""
+        bank_map = {}
+        for bank in self.env['chequera.bank'].search_read([], ['name', 'code']):
+            if bank['name']:
+                bank_map[bank['name'].strip().upper()] = bank['id']
+            if bank['code']:
+                bank_map[bank['code'].strip().upper()] = bank['id']
+        return bank_map
+
+    def _resolve_emisores(self, rows, emisor_map):
+        """Completa el mapa de emisores (por CUIT y por nombre) con los del lote"""
+        cuits = {row['cuit'] for row in rows if row.get('cuit') and row['cuit'] not in emisor_map}
+        names = {row['emisor'].upper() for row in rows if row.get('emisor') and row['emisor'].upper() not in emisor_map}
+        if cuits or names:
+            # Nombre comparado en mayúsculas de ambos lados, como las claves del mapa,
+            # para no duplicar un emisor cargado con otra capitalización
+            self.env['chequera.emisor'].flush_model(['name', 'cuit'])
+            self.env.cr.execute("""
+                SELECT id, name, cuit FROM chequera_emisor
+                WHERE cuit = ANY(%s) OR upper(name) = ANY(%s)
+                ORDER BY id
+            """, (list(cuits), list(names)))
+            for emisor_id, name, cuit in self.env.cr.fetchall():
+                if cuit:
+                    emisor_map.setdefault(cuit, emisor_id)
+                emisor_map.setdefault(name.upper(), emisor_id)
+
+        if not self.create_missing_emisores:
+            return
+        to_create = {}
+        for row in rows:
+            if not row.get('emisor'):
+                continue
+            if emisor_map.get(row.get('cuit')) or emisor_map.get(row['emisor'].upper()):
+                continue
+            key = row.get('cuit') or row['emisor'].upper()
+            to_create.setdefault(key, {'name': row['emisor'], 'cuit': row.get('cuit') or False})
+        if to_create:
+            created = self.env['chequera.emisor'].with_context(
+                tracking_disable=True, mail_create_nolog=True
+            ).create(list(to_create.values()))
+            for emisor in created:
+                if emisor.cuit:
+                    emisor_map[emisor.cuit] = emisor.id
+                emisor_map[emisor.name.upper()] = emisor.id
+
+    def _resolve_providers(self, rows, provider_map):
+        """Completa el mapa de proveedores por nombre con los del lote"""
+        names = {row['proveedor'] for row in rows if row.get('proveedor')}
+        missing = [name for name in names if name.upper() not in provider_map]
+        if not missing:
+            return
+        for partner in self.env['res.partner'].search_read([('name', 'in', missing)], ['name']):
+            provider_map.setdefault(partner['name'].upper(), partner['id'])
+
+    # ==========================================
+    # IMPORTACIÓN
+    # ==========================================
+
+    def _prepare_check_vals(self, row, bank_map, emisor_map, provider_map):
+        """Convierte una fila en vals de chequera.check; lanza ValueError con el motivo si es inválida"""
+        if not row.get('numero_cheque'):
+            raise ValueError(_('Falta el número de cheque.'))
+
+        banco_id = bank_map.get(row.get('banco', '').upper())
+        if not banco_id:
+            raise ValueError(_('Banco no encontrado: %s') % row.get('banco', ''))
+
+        emisor_id = emisor_map.get(row.get('cuit')) or emisor_map.get(row.get('emisor', '').upper())
+        if not emisor_id:
+            raise ValueError(_('Emisor no encontrado: %s') % (row.get('emisor') or row.get('cuit') or ''))
+
+        monto = self._parse_float(row.get('monto'))
+        if not monto or monto <= 0:
+            raise ValueError(_('El monto debe ser mayor a cero.'))
+
+        fecha_pago = self._parse_date(row.get('fecha_pago'))
+        if not fecha_pago:
+            raise ValueError(_('Falta la fecha de pago.'))
+
+        vals = {
+            'numero_cheque': row['numero_cheque'],
+            'banco_id': banco_id,
+            'emisor_id': emisor_id,
+            'monto': monto,
+            'fecha_pago': fecha_pago,
+        }
+
+        fecha_emision = self._parse_date(row.get('fecha_emision'))
+        if fecha_emision:
+            vals['fecha_emision'] = fecha_emision
+
+        if row.get('proveedor'):
+            proveedor_id = provider_map.get(row['proveedor'].upper())
+            if not proveedor_id:
+                raise ValueError(_('Proveedor no encontrado: %s') % row['proveedor'])
+            vals['proveedor_id'] = proveedor_id
+
+        for field_name in ('tasa_pesificacion_compra', 'interes_mensual_compra', 'precio_compra'):
+            value = self._parse_float(row.get(field_name))
+            if value is not None:
+                vals[field_name] = value
+
+        return vals
+
+    def _filter_duplicates(self, batch, seen_keys, errors):
+        """Descarta las filas cuyo cheque ya existe o se repite en el archivo"""
+        Check = self.env['chequera.check']
+        keyed = [
+            (row_number, vals, Check._get_dedup_key(vals['banco_id'], vals['numero_cheque'],
+                                                    vals['monto'], vals['fecha_pago']))
+            for row_number, vals in batch
+        ]
+        existing = Check._find_duplicate_keys([key for row_number, vals, key in keyed])
+        result = []
+        for row_number, vals, key in keyed:
+            if key in existing or key in seen_keys:
+                errors.append({
+                    'wizard_id': self.id,
+                    'row_number': row_number,
+                    'numero_cheque': vals.get('numero_cheque'),
+                    'message': _('Cheque duplicado (mismo banco, número, monto y fecha de pago).'),
+                })
+                continue
+            seen_keys.add(key)
+            result.append((row_number, vals))
+        return result
+
+    def _create_batch(self, batch, errors):
+        """Crea un lote de cheques; si falla, reintenta fila por fila para aislar los errores"""
+        Check = self.env['chequera.check'].with_context(
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_notrack=True,
+        )
+        try:
+            with self.env.cr.savepoint():
+                Check.create([vals for row_number, vals in batch])
+            return len(batch)
+        except Exception:
+            _logger.info('Lote de importación con errores, reintentando fila por fila')
+            self.env.invalidate_all()
+
+        created = 0
+        for row_number, vals in batch:
+            try:
+                with self.env.cr.savepoint():
+                    Check.create([vals])
+                created += 1
+            except Exception as e:
+                errors.append({
+                    'wizard_id': self.id,
+                    'row_number': row_number,
+                    'numero_cheque': vals.get('numero_cheque'),
+                    'message': str(e)[:250],
+                })
+        return created
+
+    def action_import(self):
+        """Importa el archivo por lotes sin abortar ante filas inválidas"""
+        self.ensure_one()
+        if self.batch_size <= 0:
+            raise UserError(_('La cantidad de cheques por lote debe ser mayor a cero.'))
+
+        bank_map = self._load_bank_map()
+        emisor_map = {}
+        provider_map = {}
+        seen_keys = set()
+        total_rows = imported = 0
+        errors = []
+
+        rows_iter = self._iter_rows()
+        while True:
+            chunk = list(islice(rows_iter, self.batch_size))
+            if not chunk:
+                break
+            total_rows += len(chunk)
+
+            rows = []
+            for row_number, raw in chunk:
+                row = {key: self._parse_text(value) if key not in ('monto', 'fecha_pago', 'fecha_emision')
+                       else value for key, value in raw.items()}
+                rows.append((row_number, row))
+
+            self._resolve_emisores([row for row_number, row in rows], emisor_map)
+            self._resolve_providers([row for row_number, row in rows], provider_map)
+
+            batch = []
+            for row_number, row in rows:
+                try:
+                    batch.append((row_number, self._prepare_check_vals(row, bank_map, emisor_map, provider_map)))
+                except ValueError as e:
+                    errors.append({
+                        'wizard_id': self.id,
+                        'row_number': row_number,
+                        'numero_cheque': row.get('numero_cheque'),
+                        'message': str(e),
+                    })
+
+            batch = self._filter_duplicates(batch, seen_keys, errors)
+            if batch:
+                imported += self._create_batch(batch, errors)
+
+            # Liberar el caché del ORM entre lotes para mantener acotada la memoria
+            self.env.flush_all()
+            self.env.invalidate_all()
+            _logger.info('Importación de cheques: %s filas leídas, %s importadas', total_rows, imported)
+
+        if errors:
+            self.env['chequera.check.import.error'].create(errors)
+
+        self.write({
+            'state': 'done',
+            'total_rows': total_rows,
+            'imported_count': imported,
+            'error_count': len(errors),
+        })
+
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'chequera.check.import.wizard',
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import logging
+
+import psycopg2
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+from odoo.tools import sql
+
+_logger = logging.getLogger(__name__)
+
+
+def _ensure_trigram(cr):
+    """Activa pg_trgm si es posible; devuelve False si el usuario de la base no tiene permisos"""
+    cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    if cr.fetchone():
+        return True
+    try:
+        with cr.savepoint(flush=False):
+            cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        return True
+    except psycopg2.Error:
+        _logger.warning('No se pudo activar pg_trgm: las búsquedas de cheques no usarán índices trigram')
+        return False
+
+
+def _create_trigram_index(cr, indexname, tablename, column):
+    sql.create_index(cr, indexname, tablename, ['(%s) gin_trgm_ops' % column], method='gin')
+
+
+class ChequeraCheckSearch(models.Model):
+    _inherit = 'chequera.check'
+
+    dedup_key = fields.Char(
+        string='Clave de duplicado',
+        compute='_compute_dedup_key',
+        store=True,
+        copy=False,
+        help='Hash de banco, número, monto y fecha de pago para detectar el mismo cheque físico.'
+    )
+
+    @api.model
+    def _get_dedup_key(self, banco_id, numero_cheque, monto, fecha_pago):
+        if not (banco_id and numero_cheque and fecha_pago):
+            return False
+        raw = '%s|%s|%.2f|%s' % (
+            banco_id,
+            numero_cheque.strip().upper(),
+            monto or 0.0,
+            fields.Date.to_date(fecha_pago).isoformat(),
+        )
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    @api.depends('banco_id', 'numero_cheque', 'monto', 'fecha_pago')
+    def _compute_dedup_key(self):
+        for record in self:
+            record.dedup_key = self._get_dedup_key(
+                record.banco_id.id, record.numero_cheque, record.monto, record.fecha_pago
+            )
+
+    @api.model
+    def _find_duplicate_keys(self, keys):
+        """Devuelve {clave: número de cheque} de los cheques vigentes que ya tienen alguna de las claves"""
+        keys = [key for key in keys if key]
+        if not keys:
+            return {}
+        existing = self.sudo().search_read(
+            [('dedup_key', 'in', keys), ('state', '!=', 'anulado')],
+            ['dedup_key', 'numero_cheque']
+        )
+        return {record['dedup_key']: record['numero_cheque'] for record in existing}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        keys = [
+            self._get_dedup_key(vals.get('banco_id'), vals.get('numero_cheque'),
+                                vals.get('monto'), vals.get('fecha_pago'))
+            for vals in vals_list
+        ]
+        seen = set()
+        for vals, key in zip(vals_list, keys):
+            if key and key in seen:
+                raise ValidationError(_('El cheque %s está repetido en los datos a crear.') % vals.get('numero_cheque'))
+            seen.add(key)
+        duplicates = self._find_duplicate_keys(keys)
+        if duplicates:
+            raise ValidationError(_(
+                'Ya existen cheques con el mismo banco, número, monto y fecha de pago: %s'
+            ) % ', '.join(sorted(set(duplicates.values()))))
+        return super().create(vals_list)
+
+    def init(self):
+        super().init()
+        cr = self.env.cr
+        if _ensure_trigram(cr):
+            _create_trigram_index(cr, 'chequera_check_numero_cheque_trgm_idx', self._table, 'numero_cheque')
+
+        # Un cheque físico solo puede estar una vez vigente (los anulados quedan fuera)
+        if not sql.index_exists(cr, 'chequera_check_dedup_key_uniq'):
+            # La columna recién creada se calcula recién después de init(): se completa
+            # antes para que el índice valide los datos reales
+            self._backfill_dedup_key()
+            try:
+                with cr.savepoint(flush=False):
+                    cr.execute("""
+                        CREATE UNIQUE INDEX chequera_check_dedup_key_uniq
+                        ON chequera_check (dedup_key)
+                        WHERE dedup_key IS NOT NULL AND state != 'anulado'
+                    """)
+            except psycopg2.IntegrityError:
+                _logger.warning('Existen cheques duplicados; no se creó el índice único '
+                                'chequera_check_dedup_key_uniq. Revise los cheques con igual clave de duplicado.')
+
+    @api.model
+    def _backfill_dedup_key(self):
+        """Completa con SQL la clave de duplicado de los cheques que no la tienen"""
+        cr = self.env.cr
+        cr.execute("""
+            SELECT id, banco_id, numero_cheque, monto, fecha_pago
+            FROM chequera_check
+            WHERE dedup_key IS NULL
+              AND banco_id IS NOT NULL AND numero_cheque IS NOT NULL AND fecha_pago IS NOT NULL
+        """)
+        rows = cr.fetchall()
+        for start in range(0, len(rows), 1000):
+            ids, keys = [], []
+            for check_id, banco_id, numero_cheque, monto, fecha_pago in rows[start:start + 1000]:
+                key = self._get_dedup_key(banco_id, numero_cheque, monto, fecha_pago)
+                if key:
+                    ids.append(check_id)
+                    keys.append(key)
+            if ids:
+                cr.execute("""
+                    UPDATE chequera_check c
+                    SET dedup_key = data.dedup_key
+                    FROM unnest(%s::int[], %s::varchar[]) AS data(id, dedup_key)
+                    WHERE c.id = data.id
+                """, (ids, keys))
+        self.invalidate_model(['dedup_key'])
+
+    @api.model
+    def _name_search(self, name, domain=None, operator='ilike', limit=None, order=None):
+        """Busca por código, número de cheque, nombre o CUIT del emisor (índices trigram)"""
+        if name and operator in ('ilike', 'like', '=ilike', '=like', '='):
+            domain = ['|', '|', '|',
+                      ('name', operator, name),
+                      ('numero_cheque', operator, name),
+                      ('emisor_id.name', operator, name),
+                      ('emisor_id.cuit', operator, name)] + (domain or [])
+            return self._search(domain, limit=limit, order=order)
+        return super()._name_search(name, domain, operator, limit, order)
+
+
+class ChequeraEmisorSearch(models.Model):
+    _inherit = 'chequera.emisor'
+
+    def init(self):
+        super().init()
+        cr = self.env.cr
+        if _ensure_trigram(cr):
+            _create_trigram_index(cr, 'chequera_emisor_name_trgm_idx', self._table, 'name')
+            _create_trigram_index(cr, 'chequera_emisor_cuit_trgm_idx', self._table, 'cuit')
+        # Búsqueda exacta sin distinguir mayúsculas (importación de cheques)
+        sql.create_index(cr, 'chequera_emisor_upper_name_idx', self._table, ['upper(name)'])
+
+    @api.model
+    def _name_search(self, name, domain=None, operator='ilike', limit=None, order=None):
+        """Permite buscar emisores por nombre o CUIT"""
+        if name and operator in ('ilike', 'like', '=ilike', '=like', '='):
+            domain = ['|', ('name', operator, name), ('cuit', operator, name)] + (domain or [])
+            return self._search(domain, limit=limit, order=order)
+        return super()._name_search(name, domain, operator, limit, order)
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.tools import sql
+
+# Columnas acumulativas que se actualizan por deltas
+RISK_COUNTERS = [
+    'cant_comprados', 'monto_comprado',
+    'cant_vendidos', 'monto_vendido',
+    'cant_rechazados', 'monto_rechazado',
+    'dias_plazo_total', 'cant_plazo',
+]
+
+BOUGHT_STATES = ('disponible', 'vendido', 'rechazado')
+
+
+def _is_sold(state, has_sale):
+    """Cuenta como vendido: vendido, o rechazado después de haberse vendido"""
+    return state == 'vendido' or (state == 'rechazado' and has_sale)
+
+
+class ChequeraEmisorRisk(models.Model):
+    _inherit = 'chequera.emisor'
+
+    # Estadísticas de riesgo almacenadas (se actualizan incrementalmente)
+    cant_comprados = fields.Integer(string='Cheques comprados', readonly=True, default=0)
+    monto_comprado = fields.Float(string='Monto comprado', readonly=True, default=0.0)
+    cant_vendidos = fields.Integer(string='Cheques vendidos', readonly=True, default=0)
+    monto_vendido = fields.Float(string='Monto vendido', readonly=True, default=0.0)
+    cant_rechazados = fields.Integer(string='Cheques rechazados', readonly=True, default=0)
+    monto_rechazado = fields.Float(string='Monto rechazado', readonly=True, default=0.0)
+    fecha_ultimo_rechazo = fields.Date(string='Último rechazo', readonly=True)
+    dias_plazo_total = fields.Float(string='Días de plazo acumulados', readonly=True, default=0.0)
+    cant_plazo = fields.Integer(string='Cheques con plazo', readonly=True, default=0)
+
+    plazo_promedio = fields.Float(string='Plazo promedio (días)', compute='_compute_riesgo', digits=(16, 1))
+    tasa_rechazo = fields.Float(string='Tasa de rechazo (%)', compute='_compute_riesgo', digits=(16, 2))
+    nivel_riesgo = fields.Selection([
+        ('sin_historial', 'Sin historial'),
+        ('bajo', 'Bajo'),
+        ('medio', 'Medio'),
+        ('alto', 'Alto'),
+    ], string='Riesgo', compute='_compute_riesgo')
+
+    @api.depends('cant_comprados', 'monto_comprado', 'cant_rechazados', 'monto_rechazado',
+                 'fecha_ultimo_rechazo', 'dias_plazo_total', 'cant_plazo')
+    def _compute_riesgo(self):
+        params = self.env['ir.config_parameter'].sudo()
+        umbral_alto = float(params.get_param('chequera.riesgo_tasa_alta', 10.0))
+        dias_recientes = int(params.get_param('chequera.riesgo_dias_rechazo_reciente', 90))
+        limite_reciente = fields.Date.context_today(self) - timedelta(days=dias_recientes)
+        for emisor in self:
+            emisor.plazo_promedio = emisor.dias_plazo_total / emisor.cant_plazo if emisor.cant_plazo else 0.0
+            if emisor.monto_comprado:
+                emisor.tasa_rechazo = emisor.monto_rechazado / emisor.monto_comprado * 100
+            else:
+                emisor.tasa_rechazo = 0.0
+
+            if not emisor.cant_comprados and not emisor.cant_rechazados:
+                emisor.nivel_riesgo = 'sin_historial'
+            elif emisor.tasa_rechazo >= umbral_alto or (
+                    emisor.fecha_ultimo_rechazo and emisor.fecha_ultimo_rechazo >= limite_reciente):
+                emisor.nivel_riesgo = 'alto'
+            elif emisor.cant_rechazados:
+                emisor.nivel_riesgo = 'medio'
+            else:
+                emisor.nivel_riesgo = 'bajo'
+
+    @api.model
+    def _apply_risk_deltas(self, deltas, rejection_dates=None):
+        """Suma los deltas {emisor_id: {columna: delta}} con un UPDATE por emisor"""
+        cr = self.env.cr
+        for emisor_id, values in deltas.items():
+            values = {column: delta for column, delta in values.items() if delta}
+            if not values:
+                continue
+            assignments = ', '.join('%s = COALESCE(%s, 0) + %%s' % (column, column) for column in values)
+            cr.execute('UPDATE chequera_emisor SET %s WHERE id = %%s' % assignments,
+                       list(values.values()) + [emisor_id])
+        for emisor_id, rejection_date in (rejection_dates or {}).items():
+            cr.execute("""
+                UPDATE chequera_emisor
+                SET fecha_ultimo_rechazo = GREATEST(fecha_ultimo_rechazo, %s)
+                WHERE id = %s
+            """, (rejection_date, emisor_id))
+        emisor_ids = set(deltas) | set(rejection_dates or {})
+        if emisor_ids:
+            self.browse(list(emisor_ids)).invalidate_recordset(RISK_COUNTERS + ['fecha_ultimo_rechazo'])
+
+    @api.model
+    def _rebuild_risk_stats(self):
+        """Recalcula desde cero las estadísticas de todos los emisores"""
+        self.env.flush_all()
+        self.env.cr.execute("""
+            UPDATE chequera_emisor e
+            SET cant_comprados = COALESCE(s.cant_comprados, 0),
+                monto_comprado = COALESCE(s.monto_comprado, 0),
+                cant_vendidos = COALESCE(s.cant_vendidos, 0),
+                monto_vendido = COALESCE(s.monto_vendido, 0),
+                cant_rechazados = COALESCE(s.cant_rechazados, 0),
+                monto_rechazado = COALESCE(s.monto_rechazado, 0),
+                fecha_ultimo_rechazo = s.fecha_ultimo_rechazo,
+                dias_plazo_total = COALESCE(s.dias_plazo_total, 0),
+                cant_plazo = COALESCE(s.cant_plazo, 0)
+            FROM chequera_emisor e2
+            LEFT JOIN (
+                SELECT c.emisor_id,
+                       COUNT(*) FILTER (WHERE c.state IN %(bought)s) AS cant_comprados,
+                       SUM(c.monto) FILTER (WHERE c.state IN %(bought)s) AS monto_comprado,
+                       COUNT(*) FILTER (WHERE c.state = 'vendido'
+                                        OR (c.state = 'rechazado' AND c.sale_operation_id IS NOT NULL)) AS cant_vendidos,
+                       SUM(c.monto) FILTER (WHERE c.state = 'vendido'
+                                            OR (c.state = 'rechazado' AND c.sale_operation_id IS NOT NULL)) AS monto_vendido,
+                       COUNT(*) FILTER (WHERE c.state = 'rechazado') AS cant_rechazados,
+                       SUM(c.monto) FILTER (WHERE c.state = 'rechazado') AS monto_rechazado,
+                       MAX(c.fecha_rechazo) AS fecha_ultimo_rechazo,
+                       SUM(c.fecha_pago - c.fecha_compra)
+                           FILTER (WHERE c.state IN %(bought)s AND c.fecha_compra IS NOT NULL) AS dias_plazo_total,
+                       COUNT(*) FILTER (WHERE c.state IN %(bought)s AND c.fecha_compra IS NOT NULL) AS cant_plazo
+                FROM chequera_check c
+                GROUP BY c.emisor_id
+            ) s ON s.emisor_id = e2.id
+            WHERE e.id = e2.id
+        """, {'bought': BOUGHT_STATES})
+        self.invalidate_model(RISK_COUNTERS + ['fecha_ultimo_rechazo'])
+
+
+class ChequeraCheckRisk(models.Model):
+    _inherit = 'chequera.check'
+
+    fecha_compra = fields.Date(string='Fecha de compra', readonly=True, copy=False)
+    emisor_nivel_riesgo = fields.Selection(related='emisor_id.nivel_riesgo', string='Riesgo del emisor')
+
+    def _get_fecha_compra(self):
+        return self.operation_id.fecha_operacion or fields.Date.context_today(self)
+
+    def _risk_deltas(self, previous):
+        """Deltas de riesgo por emisor a partir de los estados anteriores.
+
+        ``previous`` es {id: (estado, fecha_compra, tenía venta)}.
+        """
+        deltas = defaultdict(lambda: defaultdict(float))
+        rejection_dates = {}
+        fechas_compra = {}
+        for cheque in self:
+            old_state, old_fecha_compra, old_has_sale = previous.get(cheque.id, ('borrador', False, False))
+            new_state = cheque.state
+            if old_state == new_state or not cheque.emisor_id:
+                continue
+            stats = deltas[cheque.emisor_id.id]
+
+            # Compra: entra a la cartera, o sale de ella por reversión/anulación
+            if old_state not in BOUGHT_STATES and new_state in BOUGHT_STATES:
+                fecha_compra = cheque._get_fecha_compra()
+                fechas_compra[cheque.id] = fecha_compra
+                stats['cant_comprados'] += 1
+                stats['monto_comprado'] += cheque.monto
+                stats['dias_plazo_total'] += (cheque.fecha_pago - fecha_compra).days
+                stats['cant_plazo'] += 1
+            elif old_state in BOUGHT_STATES and new_state not in BOUGHT_STATES:
+                stats['cant_comprados'] -= 1
+                stats['monto_comprado'] -= cheque.monto
+                if old_fecha_compra:
+                    stats['dias_plazo_total'] -= (cheque.fecha_pago - old_fecha_compra).days
+                    stats['cant_plazo'] -= 1
+                fechas_compra[cheque.id] = False
+
+            # Venta: mismo criterio que _rebuild_risk_stats, un rechazo posterior
+            # a la venta sigue contando como vendido
+            old_sold = _is_sold(old_state, old_has_sale)
+            new_sold = _is_sold(new_state, bool(cheque.sale_operation_id))
+            if new_sold and not old_sold:
+                stats['cant_vendidos'] += 1
+                stats['monto_vendido'] += cheque.monto
+            elif old_sold and not new_sold:
+                stats['cant_vendidos'] -= 1
+                stats['monto_vendido'] -= cheque.monto
+
+            # Rechazo
+            if new_state == 'rechazado':
+                stats['cant_rechazados'] += 1
+                stats['monto_rechazado'] += cheque.monto
+                fecha = cheque.fecha_rechazo or fields.Date.context_today(self)
+                rejection_dates[cheque.emisor_id.id] = max(fecha, rejection_dates.get(cheque.emisor_id.id, fecha))
+            elif old_state == 'rechazado':
+                stats['cant_rechazados'] -= 1
+                stats['monto_rechazado'] -= cheque.monto
+        return deltas, rejection_dates, fechas_compra
+
+    def _update_emisor_risk(self, previous):
+        deltas, rejection_dates, fechas_compra = self._risk_deltas(previous)
+        if deltas or rejection_dates:
+            self.env['chequera.emisor']._apply_risk_deltas(deltas, rejection_dates)
+        if fechas_compra:
+            # Un UPDATE por fecha distinta, sin pasar por write() ni el seguimiento
+            ids_por_fecha = defaultdict(list)
+            for cheque_id, fecha_compra in fechas_compra.items():
+                ids_por_fecha[fecha_compra or None].append(cheque_id)
+            self.flush_recordset(['fecha_compra'])
+            for fecha_compra, cheque_ids in ids_por_fecha.items():
+                self.env.cr.execute('UPDATE chequera_check SET fecha_compra = %s WHERE id = ANY(%s)',
+                                    (fecha_compra, cheque_ids))
+            self.browse(list(fechas_compra)).invalidate_recordset(['fecha_compra'])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        cheques = super().create(vals_list)
+        cheques.filtered(lambda c: c.state != 'borrador')._update_emisor_risk({})
+        return cheques
+
+    def write(self, vals):
+        if 'state' not in vals:
+            return super().write(vals)
+        previous = {
+            cheque.id: (cheque.state, cheque.fecha_compra, bool(cheque.sale_operation_id))
+            for cheque in self
+        }
+        res = super().write(vals)
+        self._update_emisor_risk(previous)
+        return res
+
+    @api.model
+    def _init_risk_stats(self):
+        """Completa la fecha de compra de cheques existentes y reconstruye las estadísticas.
+
+        Se ejecuta una sola vez, al instalar o al migrar el módulo.
+        """
+        cr = self.env.cr
+        if not sql.table_exists(cr, 'chequera_purchase_wizard'):
+            return
+        cr.execute("""
+            UPDATE chequera_check c
+            SET fecha_compra = o.fecha_operacion
+            FROM chequera_purchase_wizard o
+            WHERE c.operation_id = o.id AND c.fecha_compra IS NULL
+        """)
+        self.invalidate_model(['fecha_compra'])
+        self.env['chequera.emisor']._rebuild_risk_stats()
@@ -1,4 +1,12 @@
+import logging
+
+import psycopg2
+
 from odoo import models, fields, api
+from odoo.tools import sql
+
+_logger = logging.getLogger(__name__)
+
 
 class ChequeraFormulaConfig(models.Model):
     _name = 'chequera.formula_config'
@@ -35,31 +43,67 @@ class ChequeraFormulaConfig(models.Model):
             context_label = dict(formula._fields['context_type'].selection).get(formula.context_type, '')
             formula.name = f"{field_label} ({context_label})"
     
-    @api.model
-    def create(self, vals):
-        """Al crear, verificar que no exista otra fórmula activa para el mismo campo y contexto"""
-        res = super(ChequeraFormulaConfig, self).create(vals)
-        self._check_unique_active_formula(res)
-        return res
+    def init(self):
+        cr = self.env.cr
+        # Una sola fórmula activa por campo y contexto
+        if not sql.index_exists(cr, 'chequera_formula_config_active_uniq'):
+            try:
+                with cr.savepoint(flush=False):
+                    cr.execute("""
+                        CREATE UNIQUE INDEX chequera_formula_config_active_uniq
+                        ON chequera_formula_config (field_name, context_type)
+                        WHERE active
+                    """)
+            except psycopg2.IntegrityError:
+                _logger.warning('Existen fórmulas activas repetidas; no se creó el índice único '
+                                'chequera_formula_config_active_uniq. Desactive las fórmulas duplicadas.')
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Al crear, desactivar la fórmula activa anterior del mismo campo y contexto"""
+        keys = [
+            (vals.get('field_name'), vals.get('context_type'))
+            for vals in vals_list if vals.get('active', True)
+        ]
+        self._deactivate_active_formulas(keys)
+        return super(ChequeraFormulaConfig, self).create(vals_list)
     
     def write(self, vals):
-        """Al modificar, verificar que no exista otra fórmula activa para el mismo campo y contexto"""
-        res = super(ChequeraFormulaConfig, self).write(vals)
-        for formula in self:
-            self._check_unique_active_formula(formula)
-        return res
+        """Al activar o mover una fórmula, desactivar la que ocupaba su campo y contexto"""
+        if {'active', 'field_name', 'context_type'} & set(vals):
+            keys = [
+                (vals.get('field_name', formula.field_name), vals.get('context_type', formula.context_type))
+                for formula in self if vals.get('active', formula.active)
+            ]
+            self._deactivate_active_formulas(keys, exclude=self)
+        return super(ChequeraFormulaConfig, self).write(vals)
     
-    def _check_unique_active_formula(self, formula):
-        """Verificar que no haya más de una fórmula activa para el mismo campo y contexto"""
-        if formula.active:
-            # Buscar otras fórmulas activas para el mismo campo y contexto
-            duplicate = self.search([
-                ('id', '!=', formula.id),
-                ('field_name', '=', formula.field_name),
-                ('context_type', '=', formula.context_type),
-                ('active', '=', True)
-            ], limit=1)
-            
-            if duplicate:
-                # Desactivar la otra fórmula
-                duplicate.active = False
\ No newline at end of file
+    @api.model
+    def _deactivate_active_formulas(self, keys, exclude=None):
+        """Desactiva las fórmulas activas de las claves (campo, contexto) dadas.
+        
+        Toma un advisory lock por clave para que dos transacciones que activan
+        fórmulas del mismo campo se serialicen; el índice único parcial
+        ``chequera_formula_config_active_uniq`` garantiza la regla en base.
+        """
+        keys = sorted({key for key in keys if all(key)})
+        if not keys:
+            return
+        for field_name, context_type in keys:
+            self.env.cr.execute(
+                "SELECT pg_advisory_xact_lock(hashtext(%s))",
+                ['chequera.formula_config:%s:%s' % (field_name, context_type)]
+            )
+        
+        self.flush_model(['field_name', 'context_type', 'active'])
+        self.env.cr.execute("""
+            UPDATE chequera_formula_config
+            SET active = FALSE, write_uid = %s, write_date = (now() at time zone 'UTC')
+            WHERE active
+              AND (field_name, context_type) IN %s
+              AND id != ALL(%s::int[])
+            RETURNING id
+        """, [self.env.uid, tuple(keys), list(exclude.ids) if exclude else []])
+        deactivated = [row[0] for row in self.env.cr.fetchall()]
+        if deactivated:
+            self.browse(deactivated).invalidate_recordset(['active', 'write_uid', 'write_date'])
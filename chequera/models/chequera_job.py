@@ -0,0 +1,450 @@
+# -*- coding: utf-8 -*-
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from odoo import models, fields, api, _, SUPERUSER_ID
+from odoo.exceptions import UserError, ValidationError, AccessError
+
+_logger = logging.getLogger(__name__)
+
+# Parámetros del sistema que configuran el ejecutor
+PARAM_CONCURRENCY = 'chequera.job_concurrency'
+PARAM_MAX_ATTEMPTS = 'chequera.job_max_attempts'
+PARAM_RETRY_DELAY = 'chequera.job_retry_delay'
+PARAM_TIMEOUT = 'chequera.job_timeout'
+
+# Segundos que el cron sigue tomando tareas en una misma ejecución
+RUNNER_TIME_BUDGET = 240
+
+# Errores funcionales: reintentar no cambia el resultado
+NO_RETRY_EXCEPTIONS = (UserError, ValidationError, AccessError)
+
+# Campos que definen la llamada: se fijan al encolar y no se modifican
+CALL_FIELDS = frozenset({
+    'model_name', 'method_name', 'res_ids', 'args', 'kwargs', 'context', 'user_id', 'company_id',
+})
+
+
+def _json_context(context):
+    """Contexto reducido a valores serializables para guardarlo en la tarea"""
+    return {
+        key: value for key, value in context.items()
+        if isinstance(value, (str, int, float, bool, list, dict, type(None)))
+    }
+
+
+class ChequeraJob(models.Model):
+    """Tarea en segundo plano.
+
+    Guarda la llamada ``modelo.browse(ids).método(*args, **kwargs)`` para
+    ejecutarla desde el cron con el usuario y contexto de quien la encoló,
+    fuera del tiempo límite de la petición HTTP.
+    """
+    _name = 'chequera.job'
+    _description = 'Tarea en Segundo Plano'
+    _order = 'id desc'
+
+    name = fields.Char(string='Descripción', required=True, readonly=True)
+
+    # Llamada a ejecutar
+    model_name = fields.Char(string='Modelo', required=True, readonly=True)
+    method_name = fields.Char(string='Método', required=True, readonly=True)
+    res_ids = fields.Json(string='Registros', readonly=True)
+    args = fields.Json(string='Argumentos', readonly=True)
+    kwargs = fields.Json(string='Argumentos con Nombre', readonly=True)
+    context = fields.Json(string='Contexto', readonly=True)
+
+    user_id = fields.Many2one(
+        'res.users',
+        string='Usuario',
+        required=True,
+        readonly=True,
+        index=True,
+        default=lambda self: self.env.user
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Empresa',
+        readonly=True,
+        default=lambda self: self.env.company
+    )
+
+    # Estado y planificación
+    state = fields.Selection([
+        ('pending', 'Pendiente'),
+        ('running', 'En Ejecución'),
+        ('done', 'Completada'),
+        ('failed', 'Fallida'),
+        ('cancelled', 'Cancelada')
+    ], string='Estado', default='pending', required=True, readonly=True, index=True)
+
+    priority = fields.Integer(
+        string='Prioridad',
+        default=10,
+        readonly=True,
+        help="Las tareas con menor número se ejecutan primero"
+    )
+
+    eta = fields.Datetime(
+        string='Ejecutar a partir de',
+        readonly=True,
+        default=fields.Datetime.now
+    )
+
+    attempts = fields.Integer(string='Intentos', readonly=True)
+    max_attempts = fields.Integer(string='Máximo de Intentos', readonly=True)
+
+    date_started = fields.Datetime(string='Inicio', readonly=True)
+    date_done = fields.Datetime(string='Fin', readonly=True)
+
+    # Progreso informado por la tarea, guardado en chequera.job.progress
+    progress = fields.Float(string='Progreso', compute='_compute_progress')
+    progress_message = fields.Char(string='Etapa', compute='_compute_progress')
+
+    # Resultado
+    result_action = fields.Json(string='Acción de Resultado', readonly=True)
+    has_result = fields.Boolean(string='Tiene Resultado', compute='_compute_has_result')
+    result_message = fields.Text(string='Resultado', readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', string='Archivo', readonly=True)
+    exc_info = fields.Text(string='Error', readonly=True)
+
+    call_display = fields.Text(string='Llamada', compute='_compute_call_display')
+
+    def _compute_progress(self):
+        progress_rows = self.env['chequera.job.progress'].sudo().search([('job_id', 'in', self.ids)])
+        by_job = {row.job_id.id: row for row in progress_rows}
+        for job in self:
+            row = by_job.get(job.id)
+            job.progress = 100.0 if job.state == 'done' else (row.progress if row else 0.0)
+            job.progress_message = row.message if row and job.state == 'running' else False
+
+    @api.depends('result_action')
+    def _compute_has_result(self):
+        for job in self:
+            job.has_result = bool(job.result_action)
+
+    @api.depends('model_name', 'method_name', 'res_ids', 'args', 'kwargs')
+    def _compute_call_display(self):
+        for job in self:
+            arguments = [repr(arg) for arg in job.args or []]
+            arguments += ['%s=%r' % item for item in (job.kwargs or {}).items()]
+            job.call_display = '%s.browse(%s).%s(%s)' % (
+                job.model_name, job.res_ids or [], job.method_name, ', '.join(arguments)
+            )
+
+    def write(self, vals):
+        # La llamada solo se define al encolar: cambiarla permitiría ejecutar
+        # cualquier método con el usuario de otro
+        if CALL_FIELDS.intersection(vals):
+            raise AccessError(_('No se puede modificar la llamada de una tarea encolada.'))
+        return super().write(vals)
+
+    @api.model
+    def _get_param(self, key, default):
+        return int(self.env['ir.config_parameter'].sudo().get_param(key, default))
+
+    # ------------------------------------------------------------------
+    # Encolado
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _enqueue(self, records, method_name, args=None, kwargs=None, name=None,
+                 priority=10, result_action=None):
+        """Encola ``records.method_name(*args, **kwargs)`` y despierta al ejecutor"""
+        job = self.sudo().create({
+            'name': name or '%s.%s' % (records._name, method_name),
+            'model_name': records._name,
+            'method_name': method_name,
+            'res_ids': records.ids,
+            'args': list(args or []),
+            'kwargs': dict(kwargs or {}),
+            'context': _json_context(records.env.context),
+            'user_id': records.env.uid,
+            'company_id': records.env.company.id,
+            'priority': priority,
+            'max_attempts': self._get_param(PARAM_MAX_ATTEMPTS, 3),
+            'result_action': result_action,
+        })
+        self.env.ref('chequera.ir_cron_run_jobs').sudo()._trigger()
+        return job.with_env(self.env)
+
+    @api.model
+    def _enqueue_action(self, records, method_name, args=None, kwargs=None, name=None,
+                        priority=10, result_action=None):
+        """Encola la llamada y devuelve la notificación para el usuario.
+
+        Dentro de otra tarea, o con ``chequera_job_sync`` en el contexto, la
+        llamada se ejecuta en el momento y se devuelve su resultado.
+        """
+        if self.env.context.get('chequera_job_id') or self.env.context.get('chequera_job_sync'):
+            result = getattr(records, method_name)(*(args or []), **(kwargs or {}))
+            if isinstance(result, dict):
+                return result
+            return self._process_result(result).get('result_action') or result_action or True
+
+        job = self._enqueue(records, method_name, args=args, kwargs=kwargs, name=name,
+                            priority=priority, result_action=result_action)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Tarea en segundo plano'),
+                'message': _('"%s" se está procesando. Se le avisará al terminar.') % job.name,
+                'type': 'info',
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'},
+            }
+        }
+
+    @api.model
+    def _enqueue_report(self, report_ref, records, name=None):
+        """Encola el render PDF de un reporte; el archivo queda adjunto a la tarea"""
+        report = self.env['ir.actions.report']._get_report(report_ref)
+        return self._enqueue_action(
+            report, '_chequera_render_attachment', args=[records.ids],
+            name=name or '%s - %s' % (report.name, ', '.join(records.mapped('display_name'))),
+        )
+
+    # ------------------------------------------------------------------
+    # Progreso y notificaciones
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _report_progress(self, progress, message=None):
+        """Informa el avance de la tarea en curso (0-100).
+
+        Se escribe con un cursor propio para que el usuario lo vea antes de que
+        termine la transacción de la tarea, en chequera.job.progress y no en la
+        fila de la tarea: la transacción de la tarea la actualiza al terminar y
+        chocaría con una escritura confirmada después de su snapshot.
+        Fuera de una tarea no hace nada.
+        """
+        job_id = self.env.context.get('chequera_job_id')
+        if not job_id:
+            return
+        with self.env.registry.cursor() as cr:
+            env = self.env(cr=cr, user=SUPERUSER_ID)
+            env['chequera.job.progress']._set_progress(job_id, progress, message)
+            env['chequera.job'].browse(job_id)._notify_user()
+
+    def _notify_user(self):
+        """Envía el estado de las tareas por el bus al usuario que las encoló"""
+        notifications = []
+        for job in self:
+            notifications.append((job.user_id.partner_id, 'chequera/job', {
+                'id': job.id,
+                'name': job.name,
+                'state': job.state,
+                'progress': job.progress,
+                'message': job.progress_message if job.state == 'running' else (job.result_message or ''),
+                'action': job.result_action if job.state == 'done' else False,
+            }))
+        self.env['bus.bus']._sendmany(notifications)
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _requeue_stalled(self):
+        """Devuelve a pendiente las tareas cuyo proceso murió sin terminar"""
+        limit = fields.Datetime.now() - timedelta(minutes=self._get_param(PARAM_TIMEOUT, 60))
+        stalled = self.search([('state', '=', 'running'), ('date_started', '<', limit)])
+        if stalled:
+            _logger.warning('Reencolando tareas interrumpidas: %s', stalled.ids)
+            stalled.write({'state': 'pending', 'eta': fields.Datetime.now()})
+
+    @api.model
+    def _acquire(self):
+        """Toma la próxima tarea pendiente si hay lugar según la concurrencia configurada"""
+        cr = self.env.cr
+        # Serializa la toma entre ejecutores para respetar el límite
+        cr.execute("SELECT pg_advisory_xact_lock(hashtext('chequera_job_acquire'))")
+        cr.execute("SELECT COUNT(*) FROM chequera_job WHERE state = 'running'")
+        if cr.fetchone()[0] >= self._get_param(PARAM_CONCURRENCY, 2):
+            return self
+        cr.execute("""
+            SELECT id FROM chequera_job
+            WHERE state = 'pending' AND (eta IS NULL OR eta <= now() at time zone 'UTC')
+            ORDER BY priority, id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        """)
+        row = cr.fetchone()
+        if not row:
+            return self
+        job = self.browse(row[0])
+        job.write({
+            'state': 'running',
+            'date_started': fields.Datetime.now(),
+            'attempts': job.attempts + 1,
+            'exc_info': False,
+        })
+        # El avance de un intento anterior no aplica al nuevo
+        self.env['chequera.job.progress'].search([('job_id', '=', job.id)]).unlink()
+        job._notify_user()
+        return job
+
+    def _get_target(self):
+        """Registros sobre los que se ejecuta la tarea, con el entorno de quien la encoló"""
+        self.ensure_one()
+        context = dict(self.context or {}, chequera_job_id=self.id)
+        if self.company_id:
+            context.setdefault('allowed_company_ids', [self.company_id.id])
+        env = self.env(user=self.user_id.id, context=context)
+        return env[self.model_name].browse(self.res_ids or [])
+
+    def _process_result(self, result):
+        """Valores a guardar según lo devuelto por el método"""
+        vals = {}
+        if isinstance(result, models.BaseModel) and result._name == 'ir.attachment':
+            vals['attachment_id'] = result.id
+            vals['result_action'] = {
+                'type': 'ir.actions.act_url',
+                'url': '/web/content/%s?download=true' % result.id,
+                'target': 'self',
+            }
+        elif isinstance(result, dict) and result.get('type'):
+            if result.get('tag') == 'display_notification':
+                vals['result_message'] = result.get('params', {}).get('message')
+            elif result['type'] != 'ir.actions.act_window_close' and not self.result_action:
+                vals['result_action'] = result
+        return vals
+
+    def _run(self):
+        """Ejecuta la tarea; confirma su propia transacción.
+
+        La escritura final del estado es la única actualización de la fila de
+        la tarea dentro de esta transacción.
+        """
+        self.ensure_one()
+        cr = self.env.cr
+        job_id = self.id
+        try:
+            result = getattr(self._get_target(), self.method_name)(*(self.args or []), **(self.kwargs or {}))
+            vals = self._process_result(result)
+            vals.update({
+                'state': 'done',
+                'date_done': fields.Datetime.now(),
+            })
+            vals.setdefault('result_message', _('Tarea completada.'))
+            self.write(vals)
+            self._notify_user()
+            cr.commit()
+        except Exception as error:
+            cr.rollback()
+            self.env.invalidate_all()
+            job = self.browse(job_id)
+            retry = not isinstance(error, NO_RETRY_EXCEPTIONS) and job.attempts < job.max_attempts
+            if retry:
+                delay = self._get_param(PARAM_RETRY_DELAY, 5) * job.attempts
+                _logger.warning('Tarea %s falló (intento %s), se reintenta en %s min', job_id, job.attempts, delay)
+                job.write({
+                    'state': 'pending',
+                    'eta': fields.Datetime.now() + timedelta(minutes=delay),
+                    'exc_info': traceback.format_exc(),
+                })
+            else:
+                _logger.exception('Tarea %s falló', job_id)
+                job.write({
+                    'state': 'failed',
+                    'date_done': fields.Datetime.now(),
+                    'exc_info': traceback.format_exc(),
+                    'result_message': str(error.args[0]) if isinstance(error, NO_RETRY_EXCEPTIONS) and error.args else _('Error inesperado al ejecutar la tarea.'),
+                })
+                job._notify_user()
+            cr.commit()
+
+    @api.model
+    def _cron_run_jobs(self):
+        """Ejecutor: procesa tareas pendientes mientras haya lugar y tiempo"""
+        self._requeue_stalled()
+        self.env.cr.commit()
+
+        start = time.monotonic()
+        while time.monotonic() - start < RUNNER_TIME_BUDGET:
+            job = self._acquire()
+            # Liberar el bloqueo de toma antes de ejecutar
+            self.env.cr.commit()
+            if not job:
+                break
+            job._run()
+
+    # ------------------------------------------------------------------
+    # Acciones de usuario
+    # ------------------------------------------------------------------
+
+    def action_open_result(self):
+        self.ensure_one()
+        if not self.result_action:
+            raise UserError(_('La tarea no generó un resultado para abrir.'))
+        return self.result_action
+
+    def _check_manage_access(self):
+        """Solo el supervisor gestiona las tareas; los usuarios no tienen permiso de escritura"""
+        if not self.env.user.has_group('chequera.group_chequera_supervisor'):
+            raise AccessError(_('Solo un supervisor de chequera puede gestionar tareas.'))
+        self.check_access_rule('read')
+
+    def action_requeue(self):
+        """Vuelve a encolar tareas fallidas o canceladas"""
+        self._check_manage_access()
+        if any(job.state not in ('failed', 'cancelled') for job in self):
+            raise UserError(_('Solo se pueden reencolar tareas fallidas o canceladas.'))
+        self.sudo().write({
+            'state': 'pending',
+            'eta': fields.Datetime.now(),
+            'attempts': 0,
+            'exc_info': False,
+        })
+        self.env.ref('chequera.ir_cron_run_jobs').sudo()._trigger()
+        return True
+
+    def action_cancel(self):
+        self._check_manage_access()
+        if any(job.state != 'pending' for job in self):
+            raise UserError(_('Solo se pueden cancelar tareas pendientes.'))
+        self.sudo().write({'state': 'cancelled'})
+        return True
+
+
+class ChequeraJobProgress(models.Model):
+    """Avance informado por una tarea en curso.
+
+    Vive en su propia tabla: la escribe un cursor aparte mientras la tarea
+    corre y la transacción de la tarea nunca la actualiza.
+    """
+    _name = 'chequera.job.progress'
+    _description = 'Avance de Tarea en Segundo Plano'
+
+    job_id = fields.Many2one(
+        'chequera.job',
+        string='Tarea',
+        required=True,
+        ondelete='cascade'
+    )
+    progress = fields.Float(string='Progreso')
+    message = fields.Char(string='Etapa')
+
+    _sql_constraints = [
+        ('job_unique', 'UNIQUE(job_id)', 'La tarea ya tiene un registro de avance.'),
+    ]
+
+    @api.model
+    def _set_progress(self, job_id, progress, message=None):
+        """Crea o actualiza el avance de la tarea (0-100)"""
+        self.env.cr.execute("""
+            INSERT INTO chequera_job_progress (job_id, progress, message, create_uid, create_date, write_uid, write_date)
+            VALUES (%(job)s, %(progress)s, %(message)s, %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC')
+            ON CONFLICT (job_id) DO UPDATE
+            SET progress = EXCLUDED.progress, message = EXCLUDED.message, write_date = EXCLUDED.write_date
+        """, {
+            'job': job_id,
+            'progress': min(max(progress, 0.0), 100.0),
+            'message': message or None,
+            'uid': self.env.uid,
+        })
+        self.invalidate_model(['progress', 'message'])
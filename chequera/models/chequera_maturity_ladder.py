@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import UserError
+
+LADDER_STATES = ('disponible', 'vendido')
+LADDER_BUCKETS = ('day', 'week', 'month')
+
+# Secuencia usada como versión de los datos de la escalera
+LADDER_VERSION_SEQUENCE = 'chequera_maturity_ladder_version_seq'
+
+
+class ChequeraMaturityLadder(models.Model):
+    """Escalera de vencimientos: cheques en cartera o vendidos por fecha de pago futura"""
+    _name = 'chequera.maturity.ladder'
+    _description = 'Escalera de Vencimientos de Cheques'
+    _auto = False
+    _order = 'fecha_pago asc'
+    _rec_name = 'check_id'
+
+    check_id = fields.Many2one('chequera.check', string='Cheque', readonly=True)
+    fecha_pago = fields.Date(string='Fecha de pago', readonly=True)
+    state = fields.Selection([
+        ('disponible', 'Disponible'),
+        ('vendido', 'Vendido'),
+    ], string='Estado', readonly=True)
+    banco_id = fields.Many2one('chequera.bank', string='Banco', readonly=True)
+    emisor_id = fields.Many2one('chequera.emisor', string='Emisor', readonly=True)
+    monto = fields.Float(string='Monto', readonly=True)
+    cantidad = fields.Integer(string='Cantidad', readonly=True)
+
+    @property
+    def _table_query(self):
+        return """
+            SELECT c.id, c.id AS check_id, c.fecha_pago, c.state, c.banco_id, c.emisor_id,
+                   c.monto, 1 AS cantidad
+            FROM chequera_check c
+            WHERE c.state IN ('disponible', 'vendido')
+              AND c.fecha_pago >= CURRENT_DATE
+        """
+
+    def init(self):
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % LADDER_VERSION_SEQUENCE)
+
+    @api.model
+    def _get_version(self):
+        """Versión actual de los datos; leerla no bloquea ni escribe"""
+        self.env.cr.execute("SELECT last_value FROM %s" % LADDER_VERSION_SEQUENCE)
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _bump_version(self):
+        """Invalida la escalera cacheada en todos los workers.
+
+        Se incrementa en el momento y otra vez al confirmar: un lector
+        concurrente puede haber cacheado con la versión nueva datos que todavía
+        no incluían esta transacción.
+        """
+        cr = self.env.cr
+        cr.execute("SELECT nextval('%s')" % LADDER_VERSION_SEQUENCE)
+        if cr.postcommit.data.get('chequera_maturity_ladder_bump'):
+            return
+        cr.postcommit.data['chequera_maturity_ladder_bump'] = True
+        registry = self.env.registry
+
+        @cr.postcommit.add
+        def bump():
+            with registry.cursor() as bump_cr:
+                bump_cr.execute("SELECT nextval('%s')" % LADDER_VERSION_SEQUENCE)
+
+    @api.model
+    def get_maturity_ladder(self, days=90, bucket='day'):
+        """Payload RPC: montos y cantidades por tramo de fecha de pago para los próximos ``days`` días"""
+        if bucket not in LADDER_BUCKETS:
+            raise UserError(_('Tramo no soportado: %s') % bucket)
+        today = fields.Date.context_today(self)
+        return self._get_cached_ladder(self._get_version(), int(days), bucket, today)
+
+    @api.model
+    @tools.ormcache('version', 'days', 'bucket', 'today')
+    def _get_cached_ladder(self, version, days, bucket, today):
+        """Escalera en memoria del worker mientras no cambie la versión de los datos.
+
+        Los cheques no pertenecen a una empresa, por lo que la escalera es común
+        a todas.
+        """
+        return self._compute_ladder(days, bucket, today)
+
+    @api.model
+    def _compute_ladder(self, days, bucket, today):
+        """Una única consulta agrupada por tramo y estado.
+
+        El primer tramo semanal o mensual empieza hoy y no en el inicio del
+        período, que ya quedó atrás.
+        """
+        date_to = today + timedelta(days=days)
+        self.env['chequera.check'].flush_model(['state', 'fecha_pago', 'monto'])
+        self.env.cr.execute("""
+            SELECT GREATEST(date_trunc(%(bucket)s, c.fecha_pago)::date, %(date_from)s) AS tramo,
+                   c.state,
+                   SUM(c.monto),
+                   COUNT(*)
+            FROM chequera_check c
+            WHERE c.state IN %(states)s
+              AND c.fecha_pago BETWEEN %(date_from)s AND %(date_to)s
+            GROUP BY 1, 2
+            ORDER BY 1
+        """, {'bucket': bucket, 'states': LADDER_STATES, 'date_from': today, 'date_to': date_to})
+
+        buckets = {}
+        totals = {state: {'amount': 0.0, 'count': 0} for state in LADDER_STATES}
+        for tramo, state, amount, count in self.env.cr.fetchall():
+            row = buckets.setdefault(tramo, {
+                'date': fields.Date.to_string(tramo),
+                **{s: {'amount': 0.0, 'count': 0} for s in LADDER_STATES},
+            })
+            row[state] = {'amount': amount or 0.0, 'count': count}
+            totals[state]['amount'] += amount or 0.0
+            totals[state]['count'] += count
+
+        for row in buckets.values():
+            row['total'] = {
+                'amount': sum(row[s]['amount'] for s in LADDER_STATES),
+                'count': sum(row[s]['count'] for s in LADDER_STATES),
+            }
+        totals['total'] = {
+            'amount': sum(totals[s]['amount'] for s in LADDER_STATES),
+            'count': sum(totals[s]['count'] for s in LADDER_STATES),
+        }
+        return {
+            'days': days,
+            'bucket': bucket,
+            'date_from': fields.Date.to_string(today),
+            'date_to': fields.Date.to_string(date_to),
+            'buckets': [buckets[key] for key in sorted(buckets)],
+            'totals': totals,
+        }
+
+
+class ChequeraCheckMaturity(models.Model):
+    _inherit = 'chequera.check'
+
+    def _invalidate_maturity_ladder(self):
+        self.env['chequera.maturity.ladder']._bump_version()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        cheques = super().create(vals_list)
+        if any(cheque.state in LADDER_STATES for cheque in cheques):
+            cheques._invalidate_maturity_ladder()
+        return cheques
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'state', 'monto', 'fecha_pago'} & set(vals):
+            self._invalidate_maturity_ladder()
+        return res
+
+    def unlink(self):
+        self._invalidate_maturity_ladder()
+        return super().unlink()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+
+
+class ChequeraCheckMovementIndex(models.Model):
+    """Índice inverso cheque → movimientos originales de compra y venta.
+
+    Evita buscar por el many2many ``check_ids`` del movimiento: los rechazos,
+    reversiones y modificaciones llegan al movimiento con una lectura indexada.
+    """
+    _inherit = 'chequera.check'
+
+    purchase_movement_id = fields.Many2one('chequera.wallet.movement', string='Movimiento de compra',
+                                           readonly=True, copy=False, index=True, ondelete='set null')
+    sale_movement_id = fields.Many2one('chequera.wallet.movement', string='Movimiento de venta',
+                                       readonly=True, copy=False, index=True, ondelete='set null')
+
+    def _sync_movement_index(self):
+        """Recalcula el índice de los cheques con un único UPDATE (último movimiento confirmado por tipo)"""
+        if not self:
+            return
+        Movement = self.env['chequera.wallet.movement']
+        relation = Movement._fields['check_ids']
+        Movement.flush_model(['check_ids', 'cheque_id', 'tipo', 'state', 'active', 'es_compensacion'])
+        query = """
+            UPDATE chequera_check c
+            SET purchase_movement_id = idx.purchase_movement_id,
+                sale_movement_id = idx.sale_movement_id
+            FROM (
+                SELECT c2.id AS check_id,
+                       MAX(m.id) FILTER (WHERE m.tipo = 'compra') AS purchase_movement_id,
+                       MAX(m.id) FILTER (WHERE m.tipo = 'venta') AS sale_movement_id
+                FROM chequera_check c2
+                LEFT JOIN (
+                    SELECT r.{column2} AS check_id, r.{column1} AS movement_id
+                    FROM {relation} r
+                    WHERE r.{column2} = ANY(%(ids)s)
+                    UNION ALL
+                    SELECT cheque_id, id
+                    FROM chequera_wallet_movement
+                    WHERE cheque_id = ANY(%(ids)s)
+                ) link ON link.check_id = c2.id
+                LEFT JOIN chequera_wallet_movement m
+                       ON m.id = link.movement_id
+                      AND m.state = 'confirmado'
+                      AND m.active
+                      AND NOT COALESCE(m.es_compensacion, FALSE)
+                WHERE c2.id = ANY(%(ids)s)
+                GROUP BY c2.id
+            ) idx
+            WHERE c.id = idx.check_id
+              AND (c.purchase_movement_id IS DISTINCT FROM idx.purchase_movement_id
+                   OR c.sale_movement_id IS DISTINCT FROM idx.sale_movement_id)
+        """.format(relation=relation.relation, column1=relation.column1, column2=relation.column2)
+        self.env.cr.execute(query, {'ids': list(self.ids)})
+        self.invalidate_recordset(['purchase_movement_id', 'sale_movement_id'])
+
+    @api.model
+    def _init_movement_index(self):
+        """Completa el índice para el historial existente.
+
+        Se ejecuta una sola vez, al instalar o al migrar, y no en cada
+        actualización: los cheques sin movimientos lo recorrerían siempre.
+        """
+        self.env.cr.execute("""
+            SELECT id FROM chequera_check
+            WHERE purchase_movement_id IS NULL AND sale_movement_id IS NULL AND state != 'borrador'
+        """)
+        check_ids = [row[0] for row in self.env.cr.fetchall()]
+        if check_ids:
+            self.browse(check_ids)._sync_movement_index()
@@ -40,6 +40,9 @@ class ChequeraPurchaseWizard(models.Model):
     monto_total = fields.Float(string='Monto total', compute='_compute_totales', store=True)
     precio_total = fields.Float(string='Precio total de compra', compute='_compute_totales', store=True)
     
+    # Emisores de riesgo alto entre los cheques a comprar (estadísticas precalculadas)
+    emisores_riesgo_alto = fields.Char(string='Emisores de riesgo alto', compute='_compute_emisores_riesgo_alto')
+    
     # Campos para valores confirmados
     cantidad_cheques_confirmado = fields.Integer(string='Cantidad confirmada', readonly=True)
     precio_total_confirmado = fields.Float(string='Precio total confirmado', readonly=True)
@@ -67,18 +70,32 @@ class ChequeraPurchaseWizard(models.Model):
         return super(ChequeraPurchaseWizard, self).create(vals_list)
     
     @api.depends('check_ids', 'confirmed_check_ids', 'check_ids.monto', 'check_ids.precio_compra', 
-             'confirmed_check_ids.monto', 'confirmed_check_ids.precio_compra', 'state')
+             'check_ids.meses_hasta_vencimiento', 'confirmed_check_ids.monto', 'confirmed_check_ids.precio_compra',
+             'state', 'proveedor_id', 'tasa_pesificacion_masiva', 'interes_mensual_masivo',
+             'check_ids.tasas_compra_manuales')
     def _compute_totales(self):
         for wizard in self:
             if wizard.state == 'borrador':
                 wizard.cantidad_cheques = len(wizard.check_ids)
                 wizard.monto_total = sum(wizard.check_ids.mapped('monto'))
-                wizard.precio_total = sum(wizard.check_ids.mapped('precio_compra'))
+                if wizard.proveedor_id:
+                    # Vista previa con las tasas pendientes; se persisten recién al confirmar
+                    wizard.precio_total = sum(wizard.check_ids._preview_precios(
+                        'compra', wizard._get_pending_check_vals()
+                    ).values())
+                else:
+                    wizard.precio_total = sum(wizard.check_ids.mapped('precio_compra'))
             else:  # confirmado o revertido
                 wizard.cantidad_cheques = len(wizard.confirmed_check_ids)
                 wizard.monto_total = sum(wizard.confirmed_check_ids.mapped('monto'))
                 wizard.precio_total = sum(wizard.confirmed_check_ids.mapped('precio_compra'))
     
+    @api.depends('check_ids.emisor_id')
+    def _compute_emisores_riesgo_alto(self):
+        for wizard in self:
+            emisores = wizard.check_ids.emisor_id.filtered(lambda e: e.nivel_riesgo == 'alto')
+            wizard.emisores_riesgo_alto = ', '.join(emisores.mapped('name'))
+    
     @api.onchange('proveedor_id')
     def _onchange_proveedor_id(self):
         """Al cambiar el proveedor, actualizar los valores de las tasas masivas"""
@@ -86,27 +103,17 @@ class ChequeraPurchaseWizard(models.Model):
             self.tasa_pesificacion_masiva = self.proveedor_id.tasa_pesificacion_compra
             self.interes_mensual_masivo = self.proveedor_id.interes_mensual_compra
             self.vendedor_id_masivo = self.proveedor_id.assigned_seller_id
-            self._aplicar_tasas_a_cheques()
     
-    @api.onchange('check_ids')
-    def _onchange_check_ids(self):
-        """Al agregar cheques, actualizar sus tasas automáticamente"""
-        self._aplicar_tasas_a_cheques()
-    
-    def _aplicar_tasas_a_cheques(self):
-        """Método auxiliar para aplicar tasas a todos los cheques"""
-        if self.proveedor_id and self.check_ids:
-            for cheque in self.check_ids:
-                update_vals = {
-                    'is_in_purchase_wizard': True,
-                    'proveedor_id': self.proveedor_id.id,
-                    'tasa_pesificacion_compra': self.tasa_pesificacion_masiva,
-                    'interes_mensual_compra': self.interes_mensual_masivo,
-                }
-                if self.vendedor_id_masivo:
-                    update_vals['vendedor_id_compra'] = self.vendedor_id_masivo.id
-                
-                cheque.write(update_vals)
+    def _get_pending_check_vals(self):
+        """Tasas y operador pendientes de aplicar a los cheques de la operación"""
+        vals = {
+            'proveedor_id': self.proveedor_id.id,
+            'tasa_pesificacion_compra': self.tasa_pesificacion_masiva,
+            'interes_mensual_compra': self.interes_mensual_masivo,
+        }
+        if self.vendedor_id_masivo:
+            vals['vendedor_id_compra'] = self.vendedor_id_masivo.id
+        return vals
     
     def action_add_cheque(self):
         """Acción para agregar un nuevo cheque para la compra"""
@@ -171,13 +178,11 @@ class ChequeraPurchaseWizard(models.Model):
         }
     
     def action_update_tasas_masivas(self):
-        """Actualiza las tasas de todos los cheques seleccionados"""
+        """Refresca la vista previa de precios; las tasas se escriben al confirmar"""
         self.ensure_one()
         if not self.check_ids:
             return
         
-        self._aplicar_tasas_a_cheques()
-        
         return {
             'type': 'ir.actions.act_window',
             'res_model': 'chequera.purchase.wizard',
@@ -227,6 +232,17 @@ class ChequeraPurchaseWizard(models.Model):
             raise ValidationError(_('Todos los cheques deben tener el checklist completo antes de confirmar la compra.'))
         
         cheque_ids = cheques.ids[:]
+        
+        # Tasas pendientes y estado final en una escritura por grupo: los cheques
+        # con tasas ajustadas a mano conservan las suyas
+        self.env['chequera.check'].browse(cheque_ids).with_context(
+            chequera_bulk_operation=_('Confirmación de compra %s') % self.name
+        )._write_pending_vals('compra', self._get_pending_check_vals(), {
+            'state': 'disponible',
+            'is_in_purchase_wizard': False,
+            'operation_id': self.id
+        })
+        
         cantidad_cheques = len(cheque_ids)
         monto_total = sum(cheques.mapped('monto'))
         precio_total = sum(cheques.mapped('precio_compra'))
@@ -237,13 +253,6 @@ class ChequeraPurchaseWizard(models.Model):
             'state': 'confirmado'
         })
         
-        self.env['chequera.check'].browse(cheque_ids).write({
-            'state': 'disponible',
-            'proveedor_id': self.proveedor_id.id,
-            'is_in_purchase_wizard': False,
-            'operation_id': self.id
-        })
-        
         movement = self.env['chequera.wallet.movement'].create({
             'partner_id': self.proveedor_id.id,
             'tipo': 'compra',
@@ -292,12 +301,9 @@ class ChequeraPurchaseWizard(models.Model):
             })
         
         if cheques_modificables:
-            movement = self.env['chequera.wallet.movement'].search([
-                ('partner_id', '=', self.proveedor_id.id),
-                ('check_ids', 'in', cheques_operacion.ids),
-                ('tipo', '=', 'compra'),
-                ('state', '=', 'confirmado')
-            ], limit=1)
+            movement = cheques_operacion.purchase_movement_id.filtered(
+                lambda m: m.partner_id == self.proveedor_id
+            )[:1]
             
             if movement:
                 if cheques_vendidos:
@@ -310,7 +316,9 @@ class ChequeraPurchaseWizard(models.Model):
                 else:
                     movement.unlink()
         
-        cheques_modificables.write({
+        cheques_modificables.with_context(
+            chequera_bulk_operation=_('Modificación de compra %s') % self.name
+        ).write({
             'state': 'borrador',
             'proveedor_id': False
         })
@@ -368,6 +376,20 @@ class ChequeraPurchaseWizard(models.Model):
             'context': {'form_view_initial_mode': 'edit'},
         }
     
+    def _revert_cascade(self, related_sale_ids):
+        """Reversión en cascada desde la tarea en segundo plano.
+        
+        Rearma la confirmación con los datos guardados en la tarea y la aplica.
+        """
+        self.ensure_one()
+        confirmation = self.env['chequera.reversion.confirmation'].create({
+            'operation_type': 'purchase',
+            'purchase_operation_id': self.id,
+            'related_sale_ids': [(6, 0, related_sale_ids)],
+            'reversion_mode': 'cascade',
+        })
+        return confirmation._run_reversion()
+    
     def action_revertir_operacion(self):
         """Revertir una operación confirmada con validación de estados"""
         self.ensure_one()
@@ -385,10 +407,9 @@ class ChequeraPurchaseWizard(models.Model):
         cheques_vendidos = cheques_operacion.filtered(lambda c: c.state == 'vendido')
         
         if cheques_vendidos:
-            ventas_relacionadas = self.env['chequera.sale.wizard'].search([
-                ('confirmed_check_ids', 'in', cheques_vendidos.ids),
-                ('state', '=', 'confirmado')
-            ])
+            ventas_relacionadas = cheques_vendidos.sale_operation_id.filtered(
+                lambda s: s.state == 'confirmado'
+            )
             
             wizard = self.env['chequera.reversion.confirmation'].create({
                 'operation_type': 'purchase',
@@ -407,17 +428,16 @@ class ChequeraPurchaseWizard(models.Model):
                 'context': self.env.context,
             }
         
-        movement = self.env['chequera.wallet.movement'].search([
-            ('partner_id', '=', self.proveedor_id.id),
-            ('check_ids', 'in', cheques_operacion.ids),
-            ('tipo', '=', 'compra'),
-            ('state', '=', 'confirmado')
-        ], limit=1)
+        movement = cheques_operacion.purchase_movement_id.filtered(
+            lambda m: m.partner_id == self.proveedor_id
+        )[:1]
         
         if movement:
             movement.unlink()
         
-        cheques_operacion.write({
+        cheques_operacion.with_context(
+            chequera_bulk_operation=_('Reversión de compra %s') % self.name
+        ).write({
             'state': 'borrador',        
             'proveedor_id': False
         })
@@ -68,16 +68,10 @@ class ChequeraRejectionWizard(models.TransientModel):
         
         # Crear movimientos de compensación si se solicita
         if self.revertir_compra and cheque.proveedor_id:
-            # Buscar el movimiento original de compra
-            compra_original = self.env['chequera.wallet.movement'].search([
-                ('partner_id', '=', cheque.proveedor_id.id),
-                ('tipo', '=', 'compra'),
-                '|',
-                ('cheque_id', '=', cheque.id),
-                ('check_ids', 'in', cheque.id),
-                ('es_compensacion', '=', False),
-                ('state', '=', 'confirmado')
-            ], limit=1)
+            # Movimiento original de compra desde el índice del cheque
+            compra_original = cheque.purchase_movement_id.filtered(
+                lambda m: m.partner_id == cheque.proveedor_id
+            )
             
             if compra_original:
                 # Crear movimiento de compensación
@@ -94,16 +88,10 @@ class ChequeraRejectionWizard(models.TransientModel):
                 })
         
         if self.revertir_venta and cheque.cliente_id and cheque.state == 'vendido':
-            # Buscar el movimiento original de venta
-            venta_original = self.env['chequera.wallet.movement'].search([
-                ('partner_id', '=', cheque.cliente_id.id),
-                ('tipo', '=', 'venta'),
-                '|',
-                ('cheque_id', '=', cheque.id),
-                ('check_ids', 'in', cheque.id),
-                ('es_compensacion', '=', False),
-                ('state', '=', 'confirmado')
-            ], limit=1)
+            # Movimiento original de venta desde el índice del cheque
+            venta_original = cheque.sale_movement_id.filtered(
+                lambda m: m.partner_id == cheque.cliente_id
+            )
             
             if venta_original:
                 # Crear movimiento de compensación
@@ -1,3 +1,5 @@
+from markupsafe import escape
+
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 
@@ -47,6 +49,9 @@ class ChequeraReversionConfirmation(models.TransientModel):
     # Mensaje de advertencia
     warning_message = fields.Text(string='Advertencia', compute='_compute_warning_message')
     
+    # Plan de reversión que se mostrará antes de ejecutar
+    reversion_plan = fields.Html(string='Plan de Reversión', compute='_compute_reversion_plan', sanitize=False)
+    
     @api.depends('purchase_operation_id', 'sale_operation_id', 'operation_type')
     def _compute_operation_info(self):
         for record in self:
@@ -105,6 +110,147 @@ class ChequeraReversionConfirmation(models.TransientModel):
             else:
                 record.warning_message = "Esta operación puede ser revertida sin problemas."
     
+    @api.depends('reversion_mode', 'operation_type', 'purchase_operation_id', 'sale_operation_id', 'related_sale_ids')
+    def _compute_reversion_plan(self):
+        for record in self:
+            if record.reversion_mode == 'cancel':
+                record.reversion_plan = False
+                continue
+            try:
+                plan = record._build_reversion_plan()
+            except ValidationError as error:
+                record.reversion_plan = '<p class="text-danger">%s</p>' % escape(error.args[0])
+                continue
+            record.reversion_plan = record._render_reversion_plan(plan)
+    
+    def _build_reversion_plan(self):
+        """Calcula el grafo completo de la reversión con pocas consultas por conjunto.
+
+        compra → cheques → ventas → cheques vendidos → movimientos → compensaciones.
+        No modifica nada: devuelve los registros afectados y los valores a escribir.
+        """
+        self.ensure_one()
+        Check = self.env['chequera.check']
+        Movement = self.env['chequera.wallet.movement']
+        force = self.reversion_mode == 'force'
+        
+        purchase = self.purchase_operation_id if self.operation_type == 'purchase' else self.env['chequera.purchase.wizard']
+        purchase_checks = Check.search([('operation_id', '=', purchase.id)]) if purchase else Check
+        
+        if self.operation_type == 'sale':
+            sales = self.sale_operation_id
+        elif force:
+            sales = self.env['chequera.sale.wizard']
+        else:
+            # Ventas confirmadas que contienen cheques de la compra
+            sales = purchase_checks.filtered(lambda c: c.state == 'vendido').sale_operation_id
+            sales = (sales | self.related_sale_ids).filtered(lambda s: s.state == 'confirmado')
+        sale_checks = Check.search([('sale_operation_id', 'in', sales.ids)]) if sales else Check
+        
+        # Sin forzar, solo se tocan cheques vendidos cuyas ventas se revierten en la cascada
+        if purchase and not force:
+            sold_checks = purchase_checks.filtered(lambda c: c.state == 'vendido') - sale_checks
+            if sold_checks:
+                raise ValidationError(_('No se puede revertir: hay cheques vendidos en esta operación.'))
+        
+        # Movimientos originales de todas las operaciones desde el índice de los cheques
+        movements = purchase_checks.purchase_movement_id | sale_checks.sale_movement_id
+        movements = movements.filtered(
+            lambda m: (m.tipo == 'compra' and m.partner_id == purchase.proveedor_id and m.check_ids & purchase_checks)
+            or (m.tipo == 'venta' and m.partner_id in sales.cliente_id and m.check_ids & sale_checks)
+        )
+        compensations = Movement.search([
+            ('movement_origin_id', 'in', movements.ids),
+            ('es_compensacion', '=', True),
+        ]) if movements else Movement
+        
+        if force and purchase:
+            # Los cheques vendidos quedan vendidos y solo se informa en su historial
+            checks_kept = purchase_checks.filtered(lambda c: c.state == 'vendido')
+            purchase_reset = purchase_checks - checks_kept
+            purchase_vals = {'state': 'borrador', 'proveedor_id': False}
+        else:
+            checks_kept = Check
+            purchase_reset = purchase_checks
+            purchase_vals = {'state': 'borrador', 'operation_id': False, 'proveedor_id': False}
+            if sale_checks & purchase_reset:
+                purchase_vals.update({'sale_operation_id': False, 'cliente_id': False})
+        
+        return {
+            'purchase': purchase,
+            'sales': sales,
+            'purchase_reset': purchase_reset,
+            'purchase_vals': purchase_vals,
+            'sale_reset': sale_checks - purchase_reset,
+            'sale_vals': {'state': 'disponible', 'sale_operation_id': False, 'cliente_id': False},
+            'checks_kept': checks_kept,
+            'movements': movements,
+            'compensations': compensations,
+            'force': force,
+        }
+    
+    def _render_reversion_plan(self, plan):
+        """Resumen HTML del plan para que el operador lo revise antes de confirmar"""
+        steps = []
+        if plan['compensations']:
+            steps.append(_('Eliminar %s compensación(es) por rechazo') % len(plan['compensations']))
+        if plan['movements']:
+            steps.append(_('Eliminar %s movimiento(s) de wallet: %s') % (
+                len(plan['movements']), sum(plan['movements'].mapped('monto'))))
+        for sale in plan['sales']:
+            steps.append(_('Revertir venta %s (%s)') % (sale.name, sale.cliente_id.name or ''))
+        if plan['sale_reset']:
+            steps.append(_('Devolver %s cheque(s) a Disponible') % len(plan['sale_reset']))
+        if plan['purchase_reset']:
+            steps.append(_('Devolver %s cheque(s) a Borrador') % len(plan['purchase_reset']))
+        if plan['checks_kept']:
+            steps.append(_('Mantener %s cheque(s) vendidos sin cambios') % len(plan['checks_kept']))
+        if plan['purchase']:
+            steps.append(_('Revertir compra %s (%s)') % (plan['purchase'].name, plan['purchase'].proveedor_id.name or ''))
+        if not steps:
+            return False
+        return '<ol>%s</ol>' % ''.join('<li>%s</li>' % escape(step) for step in steps)
+    
+    def _apply_reversion_plan(self, plan):
+        """Ejecuta el plan con escrituras en bloque: una por grupo de registros"""
+        # Los cheques se actualizan abajo en bloque; el unlink no debe recorrerlos
+        (plan['compensations'] | plan['movements']).with_context(chequera_skip_movement_cascade=True).unlink()
+        
+        operation_name = plan['purchase'].name or ', '.join(plan['sales'].mapped('name'))
+        if plan['sale_reset']:
+            plan['sale_reset'].with_context(
+                chequera_bulk_operation=_('Reversión de venta %s') % ', '.join(plan['sales'].mapped('name'))
+            ).write(plan['sale_vals'])
+        if plan['purchase_reset']:
+            label = _('Reversión forzada de compra %s') if plan['force'] else _('Reversión de compra %s')
+            plan['purchase_reset'].with_context(
+                chequera_bulk_operation=label % operation_name
+            ).write(plan['purchase_vals'])
+        
+        if plan['sales']:
+            plan['sales'].write({'state': 'revertido'})
+            plan['sales']._message_log_batch(bodies={
+                sale.id: f"Operación revertida por {self.env.user.name}" for sale in plan['sales']
+            })
+        
+        purchase = plan['purchase']
+        if purchase:
+            purchase.write({'state': 'revertido'})
+            if plan['checks_kept']:
+                plan['checks_kept']._message_log_batch(bodies={
+                    cheque.id: f"Reversión FORZADA de compra (Operación {purchase.name}) por {self.env.user.name}. El cheque permanece vendido."
+                    for cheque in plan['checks_kept']
+                })
+                message = f"""Operación revertida FORZADAMENTE por {self.env.user.name}.
+            ADVERTENCIA: {len(plan['checks_kept'])} cheque(s) permanecen en estado vendido pero mantienen referencia a esta operación de compra revertida."""
+            else:
+                message = f"Operación revertida por {self.env.user.name}"
+            purchase.message_post(
+                body=message,
+                subject="Reversión de operación",
+                message_type='notification'
+            )
+    
     def action_confirm_reversion(self):
         """Ejecutar la reversión según el modo seleccionado"""
         self.ensure_one()
@@ -113,150 +259,50 @@ class ChequeraReversionConfirmation(models.TransientModel):
             # No hacer nada, solo cerrar
             return {'type': 'ir.actions.act_window_close'}
         
-        elif self.reversion_mode == 'cascade':
-            # Revertir en cascada: primero las ventas, luego la compra
-            reversion_log = []
-            
-            # Revertir cada venta relacionada
-            for sale_op in self.related_sale_ids:
-                if sale_op.state == 'confirmado':
-                    # Revertir la venta
-                    self._revert_sale_operation(sale_op)
-                    reversion_log.append(f"Revertida venta: {sale_op.name}")
-            
-            # Ahora revertir la compra original
-            if self.purchase_operation_id:
-                self._revert_purchase_operation(self.purchase_operation_id)
-                reversion_log.append(f"Revertida compra: {self.purchase_operation_id.name}")
-            
-            # Mensaje de éxito
-            message = "Reversión en cascada completada:\n" + "\n".join(reversion_log)
+        if self.reversion_mode == 'cascade' and self.operation_type == 'purchase':
+            # La cascada puede recorrer muchas ventas y cheques: se ejecuta en segundo plano.
+            # Se encola sobre la compra, no sobre este wizard transitorio que puede
+            # eliminarse antes de que la tarea corra.
+            return self.env['chequera.job']._enqueue_action(
+                self.purchase_operation_id, '_revert_cascade',
+                args=[self.related_sale_ids.ids],
+                name=_('Reversión en cascada de %s') % self.operation_name,
+            )
+        return self._run_reversion()
+    
+    def _run_reversion(self):
+        """Construye y aplica el plan de reversión"""
+        self.ensure_one()
+        Job = self.env['chequera.job']
+        
+        Job._report_progress(10, _('Armando plan de reversión'))
+        plan = self._build_reversion_plan()
+        Job._report_progress(40, _('Aplicando reversión'))
+        self._apply_reversion_plan(plan)
+        
+        if self.reversion_mode == 'cascade':
+            reversion_log = [f"Revertida venta: {sale.name}" for sale in plan['sales']]
+            if plan['purchase']:
+                reversion_log.append(f"Revertida compra: {plan['purchase'].name}")
             
             return {
                 'type': 'ir.actions.client',
                 'tag': 'display_notification',
                 'params': {
                     'title': _('Reversión Exitosa'),
-                    'message': message,
+                    'message': "Reversión en cascada completada:\n" + "\n".join(reversion_log),
                     'type': 'success',
                     'sticky': False,
                 }
             }
         
-        elif self.reversion_mode == 'force':
-            # Forzar reversión (no recomendado)
-            if self.purchase_operation_id:
-                self._revert_purchase_operation(self.purchase_operation_id, force=True)
-            elif self.sale_operation_id:
-                self._revert_sale_operation(self.sale_operation_id, force=True)
-            
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': _('Reversión Forzada'),
-                    'message': _('La operación ha sido revertida forzosamente. Verifique la consistencia de los datos.'),
-                    'type': 'warning',
-                    'sticky': True,
-                }
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Reversión Forzada'),
+                'message': _('La operación ha sido revertida forzosamente. Verifique la consistencia de los datos.'),
+                'type': 'warning',
+                'sticky': True,
             }
-    
-    def _revert_purchase_operation(self, operation, force=False):
-        """Revertir una operación de compra"""
-        # Buscar cheques de la operación
-        cheques_operacion = self.env['chequera.check'].search([
-            ('operation_id', '=', operation.id)
-        ])
-        
-        # Identificar cheques vendidos
-        cheques_vendidos = cheques_operacion.filtered(lambda c: c.state == 'vendido')
-        cheques_no_vendidos = cheques_operacion.filtered(lambda c: c.state != 'vendido')
-        
-        if not force and cheques_vendidos:
-            raise ValidationError(_('No se puede revertir: hay cheques vendidos en esta operación.'))
-        
-        # Buscar y eliminar movimientos de wallet
-        movement = self.env['chequera.wallet.movement'].search([
-            ('partner_id', '=', operation.proveedor_id.id),
-            ('check_ids', 'in', cheques_operacion.ids),
-            ('tipo', '=', 'compra'),
-            ('state', '=', 'confirmado')
-        ], limit=1)
-        
-        if movement:
-            movement.unlink()
-        
-        # Actualizar cheques según el caso
-        if force:
-            # IMPORTANTE: Actualizar solo los NO vendidos
-            for cheque in cheques_no_vendidos:
-                cheque.write({
-                    'state': 'borrador',                    
-                    'proveedor_id': False
-                })
-            
-            # Para los vendidos, SOLO quitar la referencia a la operación
-            for cheque in cheques_vendidos:
-
-                 # Agregar mensaje al historial del cheque
-                cheque.message_post(
-                    body=f"Reversión FORZADA de compra (Operación {operation.name}) por {self.env.user.name}. El cheque permanece vendido.",
-                    subject="Reversión forzada de compra"
-                )
-        else:
-            # Reversión normal: todos a borrador
-            cheques_operacion.write({
-                'state': 'borrador',
-                'operation_id': False,
-                'proveedor_id': False
-            })
-        
-        # Actualizar operación
-        operation.write({'state': 'revertido'})
-        
-        # Log en chatter
-        if force and cheques_vendidos:
-            message = f"""Operación revertida FORZADAMENTE por {self.env.user.name}.
-            ADVERTENCIA: {len(cheques_vendidos)} cheque(s) permanecen en estado vendido pero mantienen referencia a esta operación de compra revertida."""
-        else:
-            message = f"Operación revertida por {self.env.user.name}"
-        
-        operation.message_post(
-            body=message,
-            subject="Reversión de operación",
-            message_type='notification'
-        )
-    
-    def _revert_sale_operation(self, operation, force=False):
-        """Revertir una operación de venta"""
-        # Buscar cheques de la operación
-        cheques_operacion = self.env['chequera.check'].search([
-            ('sale_operation_id', '=', operation.id)
-        ])
-        
-        # Buscar y eliminar movimientos de wallet
-        movement = self.env['chequera.wallet.movement'].search([
-            ('partner_id', '=', operation.cliente_id.id),
-            ('check_ids', 'in', cheques_operacion.ids),
-            ('tipo', '=', 'venta'),
-            ('state', '=', 'confirmado')
-        ], limit=1)
-        
-        if movement:
-            movement.unlink()
-        
-        # Actualizar cheques
-        cheques_operacion.write({
-            'state': 'disponible',
-            'sale_operation_id': False,
-            'cliente_id': False
-        })
-        
-        # Actualizar operación
-        operation.write({'state': 'revertido'})
-        
-        # Log en chatter
-        operation.message_post(
-            body=f"Operación revertida por {self.env.user.name}",
-            subject="Reversión de operación"
-        )
\ No newline at end of file
+        }
@@ -64,15 +64,60 @@ class ChequeraSaleWizard(models.Model):
         for vals in vals_list:
             if vals.get('name', 'Nueva Venta') == 'Nueva Venta':
                 vals['name'] = self.env['ir.sequence'].next_by_code('chequera.sale.sequence') or 'OPV#000'
-        return super(ChequeraSaleWizard, self).create(vals_list)
+        wizards = super(ChequeraSaleWizard, self).create(vals_list)
+        wizards._sync_is_in_sale_wizard({})
+        return wizards
     
-    @api.depends('check_ids', 'check_ids.monto', 'check_ids.precio_venta')
+    def write(self, vals):
+        if 'check_ids' not in vals:
+            return super(ChequeraSaleWizard, self).write(vals)
+        previous = {wizard.id: wizard.check_ids for wizard in self}
+        res = super(ChequeraSaleWizard, self).write(vals)
+        self._sync_is_in_sale_wizard(previous)
+        return res
+    
+    def _sync_is_in_sale_wizard(self, previous):
+        """Marca los cheques agregados a una venta en borrador y desmarca los quitados.
+        
+        Solo escribe el indicador, en una escritura por grupo; las tasas siguen
+        pendientes hasta confirmar.
+        """
+        Check = self.env['chequera.check']
+        added = Check
+        removed = Check
+        for wizard in self:
+            old_checks = previous.get(wizard.id, Check)
+            if wizard.state == 'borrador':
+                added |= wizard.check_ids - old_checks
+            removed |= old_checks - wizard.check_ids
+        added = added.filtered(lambda c: not c.is_in_sale_wizard)
+        removed = removed.filtered('is_in_sale_wizard') - added
+        if removed:
+            # Siguen marcados si todavía están en otra venta en borrador
+            removed -= self.search([
+                ('state', '=', 'borrador'),
+                ('check_ids', 'in', removed.ids),
+            ]).check_ids
+        if added:
+            added.write({'is_in_sale_wizard': True})
+        if removed:
+            removed.write({'is_in_sale_wizard': False})
+    
+    @api.depends('check_ids', 'check_ids.monto', 'check_ids.precio_venta', 'check_ids.meses_hasta_vencimiento',
+                 'cliente_id', 'tasa_pesificacion_masiva', 'interes_mensual_masivo',
+                 'check_ids.tasas_venta_manuales')
     def _compute_totales(self):
         for wizard in self:
             if wizard.state != 'confirmado':
                 wizard.cantidad_cheques = len(wizard.check_ids)
                 wizard.monto_total = sum(wizard.check_ids.mapped('monto'))
-                wizard.precio_total = sum(wizard.check_ids.mapped('precio_venta'))
+                if wizard.cliente_id:
+                    # Vista previa con las tasas pendientes; se persisten recién al confirmar
+                    wizard.precio_total = sum(wizard.check_ids._preview_precios(
+                        'venta', wizard._get_pending_check_vals()
+                    ).values())
+                else:
+                    wizard.precio_total = sum(wizard.check_ids.mapped('precio_venta'))
     
     @api.onchange('cliente_id')
     def _onchange_cliente_id(self):
@@ -81,29 +126,17 @@ class ChequeraSaleWizard(models.Model):
             self.tasa_pesificacion_masiva = self.cliente_id.tasa_pesificacion_venta
             self.interes_mensual_masivo = self.cliente_id.interes_mensual_venta
             self.vendedor_id_masivo = self.cliente_id.assigned_seller_id
-            self._aplicar_tasas_a_cheques()
-    
-    @api.onchange('check_ids')
-    def _onchange_check_ids(self):
-        """Al agregar cheques, actualizar sus tasas automáticamente"""
-        self._aplicar_tasas_a_cheques()
     
-    def _aplicar_tasas_a_cheques(self):
-        """Método auxiliar para aplicar tasas a todos los cheques"""
-        if self.cliente_id and self.check_ids:
-            for cheque in self.check_ids:
-                update_vals = {
-                    'cliente_id': self.cliente_id.id,
-                    'tasa_pesificacion_venta': self.tasa_pesificacion_masiva,
-                    'interes_mensual_venta': self.interes_mensual_masivo,
-                    'is_in_sale_wizard': True,
-                }
-                
-                if self.vendedor_id_masivo:
-                    update_vals['vendedor_id_venta'] = self.vendedor_id_masivo.id
-                
-                cheque.write(update_vals)
-                cheque._compute_valores_venta()
+    def _get_pending_check_vals(self):
+        """Tasas y operador pendientes de aplicar a los cheques de la operación"""
+        vals = {
+            'cliente_id': self.cliente_id.id,
+            'tasa_pesificacion_venta': self.tasa_pesificacion_masiva,
+            'interes_mensual_venta': self.interes_mensual_masivo,
+        }
+        if self.vendedor_id_masivo:
+            vals['vendedor_id_venta'] = self.vendedor_id_masivo.id
+        return vals
     
     def action_edit_cheque(self):
         """Acción para editar un cheque existente en venta"""
@@ -140,14 +173,11 @@ class ChequeraSaleWizard(models.Model):
         }
     
     def action_update_tasas_masivas(self):
-        """Actualiza las tasas de todos los cheques seleccionados"""
+        """Refresca la vista previa de precios; las tasas se escriben al confirmar"""
         self.ensure_one()
         if not self.check_ids:
             return
         
-        self._aplicar_tasas_a_cheques()
-        self._compute_totales()
-        
         return {
             'type': 'ir.actions.act_window',
             'res_model': 'chequera.sale.wizard',
@@ -169,6 +199,17 @@ class ChequeraSaleWizard(models.Model):
             raise ValidationError(_('Debe seleccionar un cliente para la venta.'))
         
         cheque_ids = cheques.ids[:]
+        
+        # Tasas pendientes y estado final en una escritura por grupo: los cheques
+        # con tasas ajustadas a mano conservan las suyas
+        self.env['chequera.check'].browse(cheque_ids).with_context(
+            chequera_bulk_operation=_('Confirmación de venta %s') % self.name
+        )._write_pending_vals('venta', self._get_pending_check_vals(), {
+            'state': 'vendido',
+            'is_in_sale_wizard': False,
+            'sale_operation_id': self.id
+        })
+        
         cantidad_cheques = len(cheque_ids)
         monto_total = sum(cheques.mapped('monto'))
         precio_total = sum(cheques.mapped('precio_venta'))
@@ -179,13 +220,6 @@ class ChequeraSaleWizard(models.Model):
             'state': 'confirmado'
         })
         
-        self.env['chequera.check'].browse(cheque_ids).write({
-            'state': 'vendido',
-            'cliente_id': self.cliente_id.id,
-            'is_in_sale_wizard': False,
-            'sale_operation_id': self.id
-        })
-        
         movement = self.env['chequera.wallet.movement'].create({
             'partner_id': self.cliente_id.id,
             'tipo': 'venta',
@@ -231,17 +265,16 @@ class ChequeraSaleWizard(models.Model):
                 'cliente_original_id': self.cliente_id.id,
             })
         
-        movement = self.env['chequera.wallet.movement'].search([
-            ('partner_id', '=', self.cliente_id.id),
-            ('check_ids', 'in', cheques_operacion.ids),
-            ('tipo', '=', 'venta'),
-            ('state', '=', 'confirmado')
-        ], limit=1)
+        movement = cheques_operacion.sale_movement_id.filtered(
+            lambda m: m.partner_id == self.cliente_id
+        )[:1]
         
         if movement:
             movement.unlink()
         
-        cheques_operacion.write({
+        cheques_operacion.with_context(
+            chequera_bulk_operation=_('Modificación de venta %s') % self.name
+        ).write({
             'state': 'disponible',
             'cliente_id': False
         })
@@ -309,17 +342,16 @@ class ChequeraSaleWizard(models.Model):
         if not cheques_operacion:
             raise ValidationError(_('No se encontraron cheques asociados a esta operación.'))
         
-        movement = self.env['chequera.wallet.movement'].search([
-            ('partner_id', '=', self.cliente_id.id),
-            ('check_ids', 'in', cheques_operacion.ids),
-            ('tipo', '=', 'venta'),
-            ('state', '=', 'confirmado')
-        ], limit=1)
+        movement = cheques_operacion.sale_movement_id.filtered(
+            lambda m: m.partner_id == self.cliente_id
+        )[:1]
         
         if movement:
             movement.unlink()
         else:
-            cheques_operacion.write({
+            cheques_operacion.with_context(
+                chequera_bulk_operation=_('Reversión de venta %s') % self.name
+            ).write({
                 'state': 'disponible',
                 'sale_operation_id': False,
                 'cliente_id': False
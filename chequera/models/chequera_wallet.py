@@ -1,6 +1,10 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
 
+# Campos del movimiento que alteran el índice inverso cheque → movimiento
+INDEXED_FIELDS = {'check_ids', 'cheque_id', 'tipo', 'state', 'active', 'es_compensacion'}
+
+
 class ChequeraWalletMovement(models.Model):
     _name = 'chequera.wallet.movement'
     _description = 'Movimiento de Wallet de Chequera'
@@ -39,14 +43,16 @@ class ChequeraWalletMovement(models.Model):
     es_compensacion = fields.Boolean(string='Es compensación', default=False, 
                                     help="Indica si este movimiento es una compensación por rechazo de cheque")
     movement_origin_id = fields.Many2one('chequera.wallet.movement', string='Movimiento original',
-                                        help="Movimiento original que se está compensando")
+                                        index=True, help="Movimiento original que se está compensando")
           
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Solo permitir creación desde operaciones, no manual"""
         if self.env.context.get('create', True) == False:
             raise ValidationError(_('Los movimientos de wallet solo pueden crearse desde operaciones de compra/venta.'))
-        return super(ChequeraWalletMovement, self).create(vals)
+        movements = super(ChequeraWalletMovement, self).create(vals_list)
+        movements.filtered(lambda m: not m.es_compensacion)._get_indexed_checks()._sync_movement_index()
+        return movements
 
     def write(self, vals):
         """Restringir modificación de movimientos"""
@@ -54,7 +60,16 @@ class ChequeraWalletMovement(models.Model):
         if not self.env.context.get('from_operation'):
             if set(vals.keys()) - {'state', 'active'}:
                 raise ValidationError(_('Los movimientos de wallet no pueden modificarse directamente. Use las operaciones de compra/venta.'))
-        return super(ChequeraWalletMovement, self).write(vals)
+        if not INDEXED_FIELDS & set(vals):
+            return super(ChequeraWalletMovement, self).write(vals)
+        cheques = self._get_indexed_checks()
+        res = super(ChequeraWalletMovement, self).write(vals)
+        (cheques | self._get_indexed_checks())._sync_movement_index()
+        return res
+    
+    def _get_indexed_checks(self):
+        """Cheques cuyo índice inverso de movimientos depende de estos movimientos"""
+        return self.check_ids | self.cheque_id
     
     @api.depends('partner_id', 'tipo', 'cheque_id', 'fecha', 'multiple_checks', 'check_ids', 'es_compensacion')
     def _compute_name(self):
@@ -87,48 +102,27 @@ class ChequeraWalletMovement(models.Model):
                     record.name = f"{tipo_desc} - {cheque_name} - {partner_name}"
        
     def action_view_operation(self):
-        """Abrir la operación relacionada basándose en los cheques"""
+        """Abrir la operación relacionada a partir de la operación indexada en los cheques"""
         self.ensure_one()
+        cheques = self._get_indexed_checks()
         
-        # Buscar en operaciones de compra
         if self.tipo == 'compra':
-            if self.check_ids:
-                operation = self.env['chequera.purchase.wizard'].search([
-                    ('confirmed_check_ids', 'in', self.check_ids.ids)
-                ], limit=1)
-            else:
-                operation = self.env['chequera.purchase.wizard'].search([
-                    ('confirmed_check_ids', '=', self.cheque_id.id)
-                ], limit=1)
-                
-            if operation:
-                return {
-                    'type': 'ir.actions.act_window',
-                    'res_model': 'chequera.purchase.wizard',
-                    'res_id': operation.id,
-                    'view_mode': 'form',
-                    'target': 'current',
-                }
-        
-        # Buscar en operaciones de venta
+            operation = cheques.operation_id[:1]
+            res_model = 'chequera.purchase.wizard'
         elif self.tipo == 'venta':
-            if self.check_ids:
-                operation = self.env['chequera.sale.wizard'].search([
-                    ('confirmed_check_ids', 'in', self.check_ids.ids)
-                ], limit=1)
-            else:
-                operation = self.env['chequera.sale.wizard'].search([
-                    ('confirmed_check_ids', '=', self.cheque_id.id)
-                ], limit=1)
-                
-            if operation:
-                return {
-                    'type': 'ir.actions.act_window',
-                    'res_model': 'chequera.sale.wizard',
-                    'res_id': operation.id,
-                    'view_mode': 'form',
-                    'target': 'current',
-                }
+            operation = cheques.sale_operation_id[:1]
+            res_model = 'chequera.sale.wizard'
+        else:
+            operation = False
+        
+        if operation:
+            return {
+                'type': 'ir.actions.act_window',
+                'res_model': res_model,
+                'res_id': operation.id,
+                'view_mode': 'form',
+                'target': 'current',
+            }
         
         raise ValidationError(_('No se encontró la operación relacionada.'))
     
@@ -149,35 +143,46 @@ class ChequeraWalletMovement(models.Model):
     
     def unlink(self):
         """Al eliminar un movimiento, actualizar el estado del cheque según corresponda"""
-        for movement in self:
-            if movement.state == 'confirmado' and not movement.es_compensacion:
-                if movement.tipo == 'compra':
-                    if movement.multiple_checks and movement.check_ids:
-                        cheques_no_vendidos = movement.check_ids.filtered(lambda c: c.state != 'vendido')
-                        cheques_no_vendidos.write({
-                            'state': 'borrador',
-                            'proveedor_id': False
-                        })
-                    elif movement.cheque_id and movement.cheque_id.state != 'vendido':
-                        movement.cheque_id.write({
-                            'state': 'borrador',
-                            'proveedor_id': False
-                        })
-                        
-                elif movement.tipo == 'venta':
-                    new_state = 'disponible'
-                    update_vals = {'state': new_state, 'cliente_id': False}
+        cheques = self._get_indexed_checks()
+        if self.env.context.get('chequera_skip_movement_cascade'):
+            # El planificador de reversiones ya actualiza cheques y compensaciones en bloque
+            res = super(ChequeraWalletMovement, self).unlink()
+            cheques.exists()._sync_movement_index()
+            return res
+        
+        originales = self.filtered(lambda m: m.state == 'confirmado' and not m.es_compensacion)
+        for movement in originales:
+            if movement.tipo == 'compra':
+                if movement.multiple_checks and movement.check_ids:
+                    cheques_no_vendidos = movement.check_ids.filtered(lambda c: c.state != 'vendido')
+                    cheques_no_vendidos.write({
+                        'state': 'borrador',
+                        'proveedor_id': False
+                    })
+                elif movement.cheque_id and movement.cheque_id.state != 'vendido':
+                    movement.cheque_id.write({
+                        'state': 'borrador',
+                        'proveedor_id': False
+                    })
                     
-                    if movement.multiple_checks and movement.check_ids:
-                        movement.check_ids.write(update_vals)
-                    elif movement.cheque_id:
-                        movement.cheque_id.write(update_vals)
+            elif movement.tipo == 'venta':
+                new_state = 'disponible'
+                update_vals = {'state': new_state, 'cliente_id': False}
                 
-                compensaciones = self.search([
-                    ('movement_origin_id', '=', movement.id),
-                    ('es_compensacion', '=', True)
-                ])
-                if compensaciones:
-                    compensaciones.unlink()
+                if movement.multiple_checks and movement.check_ids:
+                    movement.check_ids.write(update_vals)
+                elif movement.cheque_id:
+                    movement.cheque_id.write(update_vals)
+        
+        # Compensaciones de todos los movimientos en una sola búsqueda indexada
+        if originales:
+            compensaciones = self.search([
+                ('movement_origin_id', 'in', originales.ids),
+                ('es_compensacion', '=', True)
+            ]) - self
+            if compensaciones:
+                compensaciones.unlink()
         
-        return super(ChequeraWalletMovement, self).unlink()
\ No newline at end of file
+        res = super(ChequeraWalletMovement, self).unlink()
+        cheques.exists()._sync_movement_index()
+        return res
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import time
+
+from odoo import models
+from odoo.tools.safe_eval import safe_eval
+
+
+class IrActionsReport(models.Model):
+    _inherit = 'ir.actions.report'
+
+    def _chequera_render_attachment(self, res_ids):
+        """Genera el PDF del reporte y lo guarda como adjunto (usado por las tareas en segundo plano)"""
+        self.ensure_one()
+        records = self.env[self.model].browse(res_ids)
+        self.env['chequera.job']._report_progress(10, self.name)
+        pdf, _ext = self._render_qweb_pdf(self, res_ids)
+
+        name = self.name
+        if len(records) == 1 and self.print_report_name:
+            name = safe_eval(self.print_report_name, {'object': records, 'time': time}) or name
+        return self.env['ir.attachment'].create({
+            'name': '%s.pdf' % name,
+            'type': 'binary',
+            'raw': pdf,
+            'mimetype': 'application/pdf',
+            'res_model': self.model if len(records) == 1 else False,
+            'res_id': records.id if len(records) == 1 else False,
+        })
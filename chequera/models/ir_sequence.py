@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from odoo import models, api
+
+
+class IrSequence(models.Model):
+    _inherit = 'ir.sequence'
+
+    def _next_block(self, count):
+        """Reserva ``count`` números consecutivos de la secuencia en un solo acceso a la base"""
+        self.ensure_one()
+        if count <= 0:
+            return []
+        if self.use_date_range:
+            # Los rangos por fecha mantienen su propio contador; se respeta el camino estándar
+            return [self._next() for _ in range(count)]
+
+        if self.implementation == 'standard':
+            self.env.cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                ('ir_sequence_%03d' % self.id, count)
+            )
+            numbers = [row[0] for row in self.env.cr.fetchall()]
+        else:
+            # no_gap: un único UPDATE bloquea la fila una sola vez para todo el bloque
+            self.env.cr.execute("""
+                UPDATE ir_sequence
+                SET number_next = number_next + number_increment * %(count)s
+                WHERE id = %(id)s
+                RETURNING number_next - number_increment * %(count)s, number_increment
+            """, {'id': self.id, 'count': count})
+            start, step = self.env.cr.fetchone()
+            self.invalidate_recordset(['number_next'])
+            numbers = [start + step * i for i in range(count)]
+
+        return [self.get_next_char(number) for number in numbers]
+
+    @api.model
+    def next_block_by_code(self, sequence_code, count):
+        """Equivalente a ``next_by_code`` que devuelve una lista de ``count`` números"""
+        if count <= 0:
+            return []
+        self.check_access_rights('read')
+        company_id = self.env.company.id
+        sequence = self.search([
+            ('code', '=', sequence_code),
+            ('company_id', 'in', [company_id, False])
+        ], order='company_id', limit=1)
+        if not sequence:
+            return [False] * count
+        return sequence._next_block(count)
@@ -0,0 +1,65 @@
+/** @odoo-module **/
+
+import { registry } from "@web/core/registry";
+import { _t } from "@web/core/l10n/translation";
+
+/**
+ * Shows the progress and outcome of background jobs (chequera.job)
+ * pushed on the user's partner channel.
+ */
+export const chequeraJobService = {
+    dependencies: ["bus_service", "notification", "action"],
+
+    start(env, { bus_service, notification, action }) {
+        // One live notification per job, replaced on every update
+        const closers = new Map();
+
+        const close = (jobId) => {
+            const closeFn = closers.get(jobId);
+            if (closeFn) {
+                closeFn();
+                closers.delete(jobId);
+            }
+        };
+
+        bus_service.subscribe("chequera/job", (job) => {
+            close(job.id);
+            if (job.state === "running") {
+                const progress = Math.round(job.progress || 0);
+                const message = job.message ? `${progress}% - ${job.message}` : `${progress}%`;
+                closers.set(job.id, notification.add(message, {
+                    title: job.name,
+                    type: "info",
+                    sticky: true,
+                }));
+            } else if (job.state === "done") {
+                const buttons = [];
+                if (job.action) {
+                    buttons.push({
+                        name: _t("Abrir"),
+                        primary: true,
+                        onClick: () => {
+                            close(job.id);
+                            action.doAction(job.action);
+                        },
+                    });
+                }
+                closers.set(job.id, notification.add(job.message || _t("Tarea completada."), {
+                    title: job.name,
+                    type: "success",
+                    sticky: Boolean(job.action),
+                    buttons,
+                }));
+            } else if (job.state === "failed") {
+                notification.add(job.message || _t("La tarea falló."), {
+                    title: job.name,
+                    type: "danger",
+                    sticky: true,
+                });
+            }
+        });
+        bus_service.start();
+    },
+};
+
+registry.category("services").add("chequera_job", chequeraJobService);
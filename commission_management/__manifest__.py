@@ -68,6 +68,7 @@ Desarrollado por VRP - Virtual Remote Partner
         'reports/commission_report_actions.xml',
         'reports/commission_liquidation_report.xml',
         'reports/partner_commission_report.xml',
+        'views/commission_pnl_report_views.xml',
         
         # Dashboard
         'views/commission_dashboard_view.xml',
@@ -8,4 +8,5 @@ from . import res_partner_inherit
 from . import chequera_wallet_movement_inherit
 from . import sucursales_cajas_operation_inherit
 from . import chequera_check_inherit  # Agregar esta línea
-from . import divisas_currency_inherit  # Agregar esta línea
\ No newline at end of file
+from . import divisas_currency_inherit  # Agregar esta línea
+from . import commission_pnl_report
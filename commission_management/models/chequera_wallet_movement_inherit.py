@@ -19,11 +19,12 @@ class ChequeraWalletMovement(models.Model):
         ondelete={'cashbox_operation': 'cascade'}
     )
     
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Override para manejar operaciones de caja"""
         # Si viene de una operación de caja, establecer el tipo correctamente
-        if vals.get('cashbox_operation_id'):
-            vals['tipo'] = 'cashbox_operation'
+        for vals in vals_list:
+            if vals.get('cashbox_operation_id'):
+                vals['tipo'] = 'cashbox_operation'
         
-        return super(ChequeraWalletMovement, self).create(vals)
\ No newline at end of file
+        return super(ChequeraWalletMovement, self).create(vals_list)
\ No newline at end of file
@@ -165,12 +165,12 @@ class CommissionCost(models.Model):
     @api.model_create_multi
     def create(self, vals_list):
         """Override para generar código"""
-        for vals in vals_list:
-            if vals.get('code', 'Nuevo') == 'Nuevo':
-                # Generar código según tipo
-                cost_type = vals.get('cost_type', 'CF')
-                sequence = self.env['ir.sequence'].next_by_code('commission.cost') or '001'
-                vals['code'] = f'{cost_type}/{sequence}'
+        pending = [vals for vals in vals_list if vals.get('code', 'Nuevo') == 'Nuevo']
+        sequences = self.env['ir.sequence'].next_block_by_code('commission.cost', len(pending))
+        for vals, sequence in zip(pending, sequences):
+            # Generar código según tipo
+            cost_type = vals.get('cost_type', 'CF')
+            vals['code'] = f'{cost_type}/{sequence or "001"}'
         return super().create(vals_list)
     
     @api.depends('date')
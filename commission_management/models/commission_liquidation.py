@@ -63,16 +63,17 @@ class CommissionLiquidation(models.Model):
     @api.model_create_multi
     def create(self, vals_list):
         """Genera el número de liquidación al crear"""
-        for vals in vals_list:
-            if vals.get('name', 'Nueva') == 'Nueva':
-                prefix = {
-                    'cheques': 'LIQ/CHQ/',
-                    'divisas': 'LIQ/DIV/',
-                    'caja': 'LIQ/CAJA/',
-                    'manual': 'LIQ/MAN/'
-                }.get(vals.get('liquidation_type', 'manual'), 'LIQ/')
-                
-                vals['name'] = self.env['ir.sequence'].next_by_code('commission.liquidation') or prefix + '00001'
+        pending = [vals for vals in vals_list if vals.get('name', 'Nueva') == 'Nueva']
+        names = self.env['ir.sequence'].next_block_by_code('commission.liquidation', len(pending))
+        for vals, name in zip(pending, names):
+            prefix = {
+                'cheques': 'LIQ/CHQ/',
+                'divisas': 'LIQ/DIV/',
+                'caja': 'LIQ/CAJA/',
+                'manual': 'LIQ/MAN/'
+            }.get(vals.get('liquidation_type', 'manual'), 'LIQ/')
+            
+            vals['name'] = name or prefix + '00001'
         
         return super(CommissionLiquidation, self).create(vals_list)
     
@@ -371,10 +372,11 @@ class CommissionLiquidation(models.Model):
                 self.period_end = next_month - timedelta(days=1)
     
     def action_print_report(self):
-        """Imprime el reporte de liquidación"""
+        """Genera el PDF de la liquidación en segundo plano"""
         self.ensure_one()
-        # TODO: Implementar reporte PDF
-        return self.env.ref('commission_management.action_report_commission_liquidation').report_action(self)
+        return self.env['chequera.job']._enqueue_report(
+            'commission_management.action_report_commission_liquidation', self
+        )
     
     def action_add_cost(self):
         """Abre el wizard para agregar un costo/gasto"""
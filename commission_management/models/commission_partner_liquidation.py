@@ -189,6 +189,15 @@ class CommissionPartnerLiquidation(models.Model):
         default=lambda self: self.env.company
     )
     
+    _sql_constraints = [
+        ('period_month_check', 'CHECK(period_month BETWEEN 1 AND 12)',
+         'El mes debe estar entre 1 y 12.'),
+        # Una liquidación vigente (no cancelada) por período
+        ('period_unique',
+         "EXCLUDE USING btree (period_year WITH =, period_month WITH =) WHERE (state != 'cancelled')",
+         'Ya existe una liquidación de socios para ese período.'),
+    ]
+    
     @api.model_create_multi
     def create(self, vals_list):
         """Override para generar número de secuencia"""
@@ -347,34 +356,35 @@ class CommissionPartnerLiquidation(models.Model):
         for record in self:
             record.total_commission = sum(record.line_ids.mapped('commission_amount'))
     
-    @api.constrains('period_year', 'period_month')
-    def _check_period(self):
-        """Valida el período"""
-        for record in self:
-            if record.period_month < 1 or record.period_month > 12:
-                raise ValidationError(_('El mes debe estar entre 1 y 12.'))
-            
-            # Verificar que no exista otra liquidación para el mismo período
-            existing = self.search([
-                ('id', '!=', record.id),
-                ('period_year', '=', record.period_year),
-                ('period_month', '=', record.period_month),
-                ('state', '!=', 'cancelled')
-            ])
-            
-            if existing:
-                raise ValidationError(
-                    _('Ya existe una liquidación de socios para el período %s.') 
-                    % record.period_display
-                )
-    
     def action_calculate(self):
-        """Calcula la distribución entre socios"""
+        """Calcula la distribución entre socios en segundo plano"""
         self.ensure_one()
         
         if self.state not in ['draft', 'calculated']:
             raise UserError(_('Solo se pueden calcular liquidaciones en borrador.'))
         
+        return self.env['chequera.job']._enqueue_action(
+            self, '_calculate_distribution',
+            name=_('Cálculo de liquidación de socios %s') % self.period_display,
+            result_action={
+                'type': 'ir.actions.act_window',
+                'res_model': self._name,
+                'res_id': self.id,
+                'view_mode': 'form',
+                'views': [(False, 'form')],
+            },
+        )
+    
+    def _calculate_distribution(self):
+        """Crea las líneas de distribución entre socios"""
+        self.ensure_one()
+        Job = self.env['chequera.job']
+        
+        if self.state not in ['draft', 'calculated']:
+            raise UserError(_('Solo se pueden calcular liquidaciones en borrador.'))
+        
+        Job._report_progress(10, _('Buscando socios'))
+        
         # Limpiar líneas existentes
         self.line_ids.unlink()
         
@@ -397,6 +407,7 @@ class CommissionPartnerLiquidation(models.Model):
             )
         
         # Crear líneas de distribución
+        Job._report_progress(60, _('Distribuyendo entre %s socios') % len(partners))
         for partner in partners:
             if partner.commission_percentage > 0:
                 self.env['commission.partner.liquidation.line'].create({
@@ -505,10 +516,11 @@ class CommissionPartnerLiquidation(models.Model):
         }
     
     def action_print_report(self):
-        """Imprime reporte de liquidación"""
+        """Genera el PDF de la liquidación en segundo plano"""
         self.ensure_one()
-        # TODO: Implementar reporte
-        raise UserError(_('Reporte en desarrollo.'))
+        return self.env['chequera.job']._enqueue_report(
+            'commission_management.action_report_partner_commission', self
+        )
 
 
 class CommissionPartnerLiquidationLine(models.Model):
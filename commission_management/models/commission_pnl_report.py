@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.tools import sql
+
+
+class CommissionPnlReport(models.Model):
+    """Resultado unificado de todas las líneas de negocio.
+
+    Vista materializada que une en una sola forma (fecha, línea de negocio,
+    cliente, operador, moneda, ingreso, costo, ganancia):
+    - cheques vendidos (precio de venta contra precio de compra)
+    - consumos FIFO de lotes de divisas, vivos y archivados
+    - coberturas de posiciones abiertas de divisas
+    - comisiones a operadores en operaciones de caja completadas, como costo
+    Los cheques no tienen compañía: se toma la del usuario que registró la venta.
+    Se refresca de forma concurrente, sin bloquear las lecturas.
+    """
+    _name = 'commission.pnl.report'
+    _description = 'Resultado por Línea de Negocio'
+    _auto = False
+    _order = 'date desc, id desc'
+    _rec_name = 'reference'
+
+    date = fields.Date(string='Fecha', readonly=True)
+    business_line = fields.Selection([
+        ('cheques', 'Cheques'),
+        ('divisas', 'Divisas - Venta FIFO'),
+        ('divisas_coverage', 'Divisas - Cobertura'),
+        ('caja', 'Caja'),
+    ], string='Línea de Negocio', readonly=True)
+    reference = fields.Char(string='Referencia', readonly=True)
+    partner_id = fields.Many2one('res.partner', string='Cliente', readonly=True)
+    operator_id = fields.Many2one('res.users', string='Operador', readonly=True)
+    currency = fields.Selection([
+        ('ARS', 'ARS'),
+        ('USD', 'USD'),
+        ('EUR', 'EUR'),
+        ('USDT', 'USDT'),
+        ('USDC', 'USDC'),
+        ('other', 'Otra'),
+    ], string='Moneda', readonly=True)
+    revenue = fields.Float(string='Ingreso', digits=(16, 2), readonly=True)
+    cost = fields.Float(string='Costo', digits=(16, 2), readonly=True)
+    profit = fields.Float(string='Ganancia', digits=(16, 2), readonly=True)
+    company_id = fields.Many2one('res.company', string='Compañía', readonly=True)
+
+    # Documento de origen para navegar desde el reporte
+    res_model = fields.Char(string='Modelo Origen', readonly=True)
+    res_id = fields.Integer(string='ID Origen', readonly=True)
+
+    def _query(self):
+        """Unión de las cinco fuentes; el id combina el id de origen con un dígito por fuente"""
+        return """
+            SELECT c.id * 10 + 1 AS id,
+                   COALESCE(sw.fecha_operacion, c.write_date::date) AS date,
+                   'cheques' AS business_line,
+                   c.name AS reference,
+                   c.cliente_id AS partner_id,
+                   COALESCE(c.vendedor_id_venta, p.assigned_seller_id) AS operator_id,
+                   'ARS' AS currency,
+                   c.precio_venta AS revenue,
+                   c.precio_compra AS cost,
+                   c.ganancia AS profit,
+                   u.company_id AS company_id,
+                   'chequera.check' AS res_model,
+                   c.id AS res_id
+            FROM chequera_check c
+            LEFT JOIN chequera_sale_wizard sw ON sw.id = c.sale_operation_id
+            LEFT JOIN res_partner p ON p.id = c.cliente_id
+            LEFT JOIN res_users u ON u.id = sw.create_uid
+            WHERE c.state = 'vendido'
+
+            UNION ALL
+
+            SELECT lc.id * 10 + 2,
+                   lc.date,
+                   'divisas',
+                   op.name,
+                   lc.partner_id,
+                   p.assigned_seller_id,
+                   COALESCE(lc.profit_currency, 'ARS'),
+                   lc.quantity_consumed * lc.consumption_rate,
+                   lc.quantity_consumed * lc.acquisition_rate,
+                   CASE WHEN lc.profit_currency = 'USD' THEN lc.profit_usd ELSE lc.profit_ars END,
+                   lc.company_id,
+                   'divisas.currency',
+                   lc.sale_operation_id
+            FROM divisas_lot_consumption lc
+            LEFT JOIN divisas_currency op ON op.id = lc.sale_operation_id
+            LEFT JOIN res_partner p ON p.id = lc.partner_id
+            WHERE lc.state = 'active'
+
+            UNION ALL
+
+            SELECT la.original_id * 10 + 3,
+                   la.date,
+                   'divisas',
+                   op.name,
+                   la.partner_id,
+                   p.assigned_seller_id,
+                   COALESCE(la.profit_currency, 'ARS'),
+                   la.quantity_consumed * la.consumption_rate,
+                   la.quantity_consumed * la.acquisition_rate,
+                   CASE WHEN la.profit_currency = 'USD' THEN la.profit_usd ELSE la.profit_ars END,
+                   la.company_id,
+                   'divisas.currency',
+                   la.sale_operation_id
+            FROM divisas_lot_consumption_archive la
+            LEFT JOIN divisas_currency op ON op.id = la.sale_operation_id
+            LEFT JOIN res_partner p ON p.id = la.partner_id
+            WHERE la.state = 'active'
+
+            UNION ALL
+
+            SELECT pc.id * 10 + 4,
+                   pc.date,
+                   'divisas_coverage',
+                   pos.name,
+                   pos.partner_id,
+                   p.assigned_seller_id,
+                   COALESCE(pc.profit_currency, 'ARS'),
+                   pc.quantity_covered * pc.sale_rate,
+                   pc.quantity_covered * pc.purchase_rate,
+                   CASE WHEN pc.profit_currency = 'USD' THEN pc.profit_usd ELSE pc.profit_ars END,
+                   pc.company_id,
+                   'divisas.open.position',
+                   pc.position_id
+            FROM divisas_position_coverage pc
+            JOIN divisas_open_position pos ON pos.id = pc.position_id
+            LEFT JOIN res_partner p ON p.id = pos.partner_id
+
+            UNION ALL
+
+            SELECT o.id * 10 + 5,
+                   o.completion_date::date,
+                   'caja',
+                   o.name,
+                   o.partner_id,
+                   o.commission_operator_id,
+                   o.currency_type,
+                   0.0,
+                   o.commission_amount,
+                   -o.commission_amount,
+                   o.company_id,
+                   'sucursales_cajas.operation',
+                   o.id
+            FROM sucursales_cajas_operation o
+            WHERE o.state = 'done' AND o.has_commission AND o.commission_amount != 0
+        """
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute("SELECT relkind FROM pg_class WHERE relname = %s", [self._table])
+        row = cr.fetchone()
+        if row and row[0] == 'm':
+            cr.execute("DROP MATERIALIZED VIEW %s CASCADE" % self._table)
+        else:
+            sql.drop_view_if_exists(cr, self._table)
+        cr.execute("CREATE MATERIALIZED VIEW %s AS (%s)" % (self._table, self._query()))
+        # El índice único es requisito del refresco concurrente
+        cr.execute("CREATE UNIQUE INDEX %s_id_uniq ON %s (id)" % (self._table, self._table))
+        cr.execute("CREATE INDEX %s_line_date_idx ON %s (business_line, date)" % (self._table, self._table))
+        cr.execute("CREATE INDEX %s_date_idx ON %s (date)" % (self._table, self._table))
+        cr.execute("CREATE INDEX %s_operator_idx ON %s (operator_id)" % (self._table, self._table))
+        cr.execute("CREATE INDEX %s_partner_idx ON %s (partner_id)" % (self._table, self._table))
+
+    @api.model
+    def _refresh(self):
+        """Recalcula la vista sin bloquear a quienes la están consultando"""
+        self.env.flush_all()
+        self.env.cr.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY %s" % self._table)
+        self.invalidate_model()
+        return True
+
+    @api.model
+    def _cron_refresh(self):
+        return self._refresh()
+
+    @api.model
+    def action_refresh(self):
+        """Encola el refresco del reporte"""
+        return self.env['chequera.job']._enqueue_action(
+            self, '_refresh', name=_('Actualización del resultado por línea de negocio')
+        )
+
+    def action_open_source(self):
+        """Abre el documento que originó la línea"""
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self.res_model,
+            'res_id': self.res_id,
+            'view_mode': 'form',
+            'views': [(False, 'form')],
+        }
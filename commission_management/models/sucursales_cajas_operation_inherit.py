@@ -118,6 +118,17 @@ class SucursalesCajasOperationInherit(models.Model):
         
         return super().action_complete()
     
+    def _get_batch_error(self, identity_verified=False):
+        """Agrega la validación de comisión al procesamiento en lote"""
+        error = super()._get_batch_error(identity_verified)
+        if error or not self.has_commission:
+            return error
+        if not self.commission_operator_id:
+            return _('Debe especificar el operador que comisiona.')
+        if self.commission_rate <= 0:
+            return _('La tasa de comisión debe ser mayor a cero.')
+        return False
+    
     def action_view_commission_liquidation(self):
         """Ver la liquidación de comisión relacionada"""
         self.ensure_one()
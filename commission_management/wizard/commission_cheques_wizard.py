@@ -50,18 +50,20 @@ class CommissionChequesWizard(models.TransientModel):
                 self.commission_rate = partner.commission_checks
     
     def action_calculate(self):
-        """Calcula las comisiones basándose en los parámetros"""
+        """Calcula las comisiones en segundo plano y reabre el asistente al terminar"""
         self.ensure_one()
-        self._calculate_commissions()
-        
-        return {
-            'type': 'ir.actions.act_window',
-            'res_model': 'commission.cheques.wizard',
-            'view_mode': 'form',
-            'res_id': self.id,
-            'target': 'new',
-            'context': self.env.context,
-        }
+        return self.env['chequera.job']._enqueue_action(
+            self, '_calculate_commissions',
+            name=_('Cálculo de comisiones de %s') % self.operator_id.name,
+            result_action={
+                'type': 'ir.actions.act_window',
+                'res_model': 'commission.cheques.wizard',
+                'view_mode': 'form',
+                'views': [(False, 'form')],
+                'res_id': self.id,
+                'target': 'new',
+            },
+        )
     
     def _calculate_commissions(self):
         """Calcula las comisiones de cheques para el operador en el período"""
@@ -43,12 +43,15 @@ Desarrollado por VRP - Virtual Remote Partner
         'security/divisas_security.xml',
         'security/ir.model.access.csv',
         'data/divisas_data.xml',
+        'views/divisas_dashboard_templates.xml',
         'views/divisas_dashboard_view.xml',
         'views/divisas_currency_view.xml',
         'views/divisas_exchange_wizard_view.xml',
         'views/divisas_wallet_view.xml',
         'views/divisas_exchange_rate_view.xml',
         'views/divisas_inventory_lot_view.xml',
+        'views/divisas_inventory_report_view.xml',
+        'views/divisas_inventory_archive_view.xml',
         'views/divisas_open_position_view.xml',
         'views/partner_view_inherit.xml',
         'views/divisas_menus.xml',
@@ -7,4 +7,7 @@ from . import divisas_exchange_rate
 from . import divisas_inventory_lot
 from . import divisas_dashboard_wizard
 from . import divisas_open_position
-from . import divisas_currency_extension
\ No newline at end of file
+from . import divisas_currency_extension
+from . import divisas_inventory_report
+from . import divisas_daily_stats
+from . import divisas_inventory_archive
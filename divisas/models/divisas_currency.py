@@ -143,14 +143,16 @@ class DivisasCurrency(models.Model):
     
     @api.model_create_multi
     def create(self, vals_list):
+        pending = [vals for vals in vals_list if vals.get('name', _('Nuevo')) == _('Nuevo')]
+        names = self.env['ir.sequence'].next_block_by_code('divisas.currency', len(pending))
+        for vals, name in zip(pending, names):
+            if vals.get('operation_type') == 'buy':
+                prefix = 'COMPRA'
+            else:
+                prefix = 'VENTA'
+            vals['name'] = prefix + name if name else _('Nuevo')
+        
         for vals in vals_list:
-            if vals.get('name', _('Nuevo')) == _('Nuevo'):
-                if vals.get('operation_type') == 'buy':
-                    prefix = 'COMPRA'
-                else:
-                    prefix = 'VENTA'
-                vals['name'] = prefix + self.env['ir.sequence'].next_by_code('divisas.currency') or _('Nuevo')
-            
             # Asegurarse de que el tipo de cambio tenga un valor
             if 'exchange_rate' not in vals or not vals.get('exchange_rate'):
                 vals['exchange_rate'] = 1.0
@@ -78,7 +78,8 @@ class DivisasCurrencyExtension(models.Model):
                 'acquisition_rate': acquisition_rate,
                 'reference_currency': reference_currency,
                 'date': self.date,
-                'state': 'available'
+                'state': 'available',
+                'company_id': self.company_id.id,
             }
             
             inventory_lot = self.env['divisas.inventory.lot'].create(lot_vals)
@@ -105,6 +106,7 @@ class DivisasCurrencyExtension(models.Model):
         
         # Buscar lotes disponibles
         available_lots = self.env['divisas.inventory.lot'].search([
+            ('company_id', '=', self.company_id.id),
             ('currency_type', '=', self.currency_type),
             ('state', '=', 'available'),
             ('quantity_available', '>', 0)
@@ -209,7 +211,8 @@ class DivisasCurrencyExtension(models.Model):
             'quantity_open': quantity,
             'sale_rate': self.exchange_rate,
             'payment_currency': self.payment_currency_type,
-            'state': 'open'
+            'state': 'open',
+            'company_id': self.company_id.id,
         }
         
         return self.env['divisas.open.position'].create(position_vals)
@@ -220,9 +223,10 @@ class DivisasCurrencyExtension(models.Model):
         
         # Buscar posiciones abiertas FIFO
         open_positions = self.env['divisas.open.position'].search([
+            ('company_id', '=', self.company_id.id),
             ('currency_type', '=', self.currency_type),
             ('state', 'in', ['open', 'partial'])
-        ], order='create_date asc')
+        ], order='create_date asc, id asc')
         
         if not open_positions:
             return 0.0  # No se usó nada para coberturas
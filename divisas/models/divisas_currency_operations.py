@@ -85,7 +85,8 @@ class DivisasCurrencyOperations(models.Model):
             'acquisition_rate': acquisition_rate,
             'reference_currency': reference_currency,
             'date': self.date,
-            'state': 'available'
+            'state': 'available',
+            'company_id': self.company_id.id,
         }
         
         inventory_lot = self.env['divisas.inventory.lot'].create(lot_vals)
@@ -102,6 +103,7 @@ class DivisasCurrencyOperations(models.Model):
         
         # Buscar lotes disponibles FIFO (ordenados por fecha ascendente)
         available_lots = self.env['divisas.inventory.lot'].search([
+            ('company_id', '=', self.company_id.id),
             ('currency_type', '=', self.currency_type),
             ('state', '=', 'available'),
             ('quantity_available', '>', 0)
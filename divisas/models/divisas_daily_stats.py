@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api, _
+
+
+class DivisasDailyStats(models.Model):
+    """Acumulado diario de operaciones confirmadas.
+
+    Una fila por día, divisa, tipo de operación, moneda de ganancia y compañía.
+    Se mantiene por deltas desde ``action_confirm`` / ``action_cancel`` de
+    ``divisas.currency``, de modo que los KPIs de un período son la suma de a
+    lo sumo unas pocas filas por día.
+    """
+    _name = 'divisas.daily.stats'
+    _description = 'Acumulado Diario de Operaciones de Divisas'
+    _order = 'date desc, currency_type, operation_type'
+    _log_access = False
+
+    date = fields.Date(string='Fecha', required=True, readonly=True, index=True)
+    currency_type = fields.Selection([
+        ('USD', 'Dólares (USD)'),
+        ('USDT', 'Tether (USDT)'),
+        ('ARS', 'Pesos (ARS)')
+    ], string='Moneda', required=True, readonly=True)
+    operation_type = fields.Selection([
+        ('buy', 'Compra'),
+        ('sell', 'Venta')
+    ], string='Tipo de Operación', required=True, readonly=True)
+    profit_currency = fields.Selection([
+        ('ARS', 'ARS'),
+        ('USD', 'USD')
+    ], string='Moneda de Ganancia', required=True, readonly=True)
+    company_id = fields.Many2one('res.company', string='Compañía', required=True, readonly=True)
+
+    count = fields.Integer(string='Cantidad de Operaciones', readonly=True)
+    amount = fields.Float(string='Monto', digits=(16, 2), readonly=True)
+    payment_amount = fields.Float(string='Monto Pagado', digits=(16, 2), readonly=True)
+    profit_ars = fields.Float(string='Ganancia (ARS)', digits=(16, 2), readonly=True)
+    profit_usd = fields.Float(string='Ganancia (USD)', digits=(16, 2), readonly=True)
+
+    _sql_constraints = [
+        ('day_key_uniq',
+         'unique(date, currency_type, operation_type, profit_currency, company_id)',
+         'Ya existe un acumulado para ese día, divisa, operación y compañía.'),
+    ]
+
+    @api.model
+    def _collect_deltas(self, operations, sign=1):
+        """Agrupa las operaciones por clave diaria; sign=-1 para restarlas"""
+        deltas = {}
+        for op in operations:
+            key = (op.date, op.currency_type, op.operation_type,
+                   op.profit_currency or 'ARS', op.company_id.id)
+            delta = deltas.setdefault(key, [0, 0.0, 0.0, 0.0, 0.0])
+            delta[0] += sign
+            delta[1] += sign * op.amount
+            delta[2] += sign * op.payment_amount
+            delta[3] += sign * op.profit_ars
+            delta[4] += sign * op.profit_usd
+        return deltas
+
+    @api.model
+    def _apply_deltas(self, deltas):
+        """Suma los deltas al acumulado con un upsert por clave"""
+        if not deltas:
+            return
+        for key, delta in deltas.items():
+            self.env.cr.execute("""
+                INSERT INTO divisas_daily_stats
+                    (date, currency_type, operation_type, profit_currency, company_id,
+                     count, amount, payment_amount, profit_ars, profit_usd)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (date, currency_type, operation_type, profit_currency, company_id)
+                DO UPDATE SET
+                    count = divisas_daily_stats.count + EXCLUDED.count,
+                    amount = divisas_daily_stats.amount + EXCLUDED.amount,
+                    payment_amount = divisas_daily_stats.payment_amount + EXCLUDED.payment_amount,
+                    profit_ars = divisas_daily_stats.profit_ars + EXCLUDED.profit_ars,
+                    profit_usd = divisas_daily_stats.profit_usd + EXCLUDED.profit_usd
+            """, key + tuple(delta))
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild(self):
+        """Reconstruye el acumulado completo desde las operaciones confirmadas"""
+        self.env['divisas.currency'].flush_model()
+        self.env.cr.execute("DELETE FROM divisas_daily_stats")
+        self.env.cr.execute("""
+            INSERT INTO divisas_daily_stats
+                (date, currency_type, operation_type, profit_currency, company_id,
+                 count, amount, payment_amount, profit_ars, profit_usd)
+            SELECT date, currency_type, operation_type, COALESCE(profit_currency, 'ARS'), company_id,
+                   COUNT(*), SUM(amount), SUM(COALESCE(payment_amount, 0)),
+                   SUM(COALESCE(profit_ars, 0)), SUM(COALESCE(profit_usd, 0))
+            FROM divisas_currency
+            WHERE state = 'confirmed'
+            GROUP BY date, currency_type, operation_type, COALESCE(profit_currency, 'ARS'), company_id
+        """)
+        self.invalidate_model()
+
+    def init(self):
+        # Carga inicial del acumulado al instalar el módulo
+        self.env.cr.execute("SELECT 1 FROM divisas_daily_stats LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._rebuild()
+
+
+class DivisasCurrencyDailyStats(models.Model):
+    """Mantiene el acumulado diario al confirmar y cancelar operaciones"""
+    _inherit = 'divisas.currency'
+
+    def action_confirm(self):
+        result = super().action_confirm()
+        stats = self.env['divisas.daily.stats']
+        stats._apply_deltas(stats._collect_deltas(self.filtered(lambda op: op.state == 'confirmed')))
+        return result
+
+    def action_cancel(self):
+        # Calcular el delta antes de que la cancelación limpie las ganancias
+        stats = self.env['divisas.daily.stats']
+        deltas = stats._collect_deltas(self.filtered(lambda op: op.state == 'confirmed'), sign=-1)
+        result = super().action_cancel()
+        stats._apply_deltas(deltas)
+        return result
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError
 from datetime import datetime, timedelta
 from markupsafe import Markup
+import hashlib
+import json
 
 
 class DivisasDashboardWizard(models.TransientModel):
@@ -218,50 +220,50 @@ class DivisasDashboardWizard(models.TransientModel):
     
     balance_usd_progress_html = fields.Html(
         string='Barra de Progreso USD',
-        compute='_compute_all_metrics',
+        compute='_compute_balance_html',
         sanitize=False
     )
     
     balance_usd_badge_html = fields.Html(
         string='Badge USD',
-        compute='_compute_all_metrics',
+        compute='_compute_balance_html',
         sanitize=False
     )
     
     balance_usdt_progress_html = fields.Html(
         string='Barra de Progreso USDT',
-        compute='_compute_all_metrics',
+        compute='_compute_balance_html',
         sanitize=False
     )
     
     balance_usdt_badge_html = fields.Html(
         string='Badge USDT',
-        compute='_compute_all_metrics',
+        compute='_compute_balance_html',
         sanitize=False
     )
     
     alerts_html = fields.Html(
         string='Alertas del Dashboard',
-        compute='_compute_all_metrics',
+        compute='_compute_alerts_html',
         sanitize=False
     )
     
     position_usd_html = fields.Html(
         string='Posición USD HTML',
-        compute='_compute_all_metrics',
+        compute='_compute_position_html',
         sanitize=False
     )
     
     position_usdt_html = fields.Html(
         string='Posición USDT HTML',
-        compute='_compute_all_metrics',
+        compute='_compute_position_html',
         sanitize=False
     )
     
     # NUEVO: HTML para posiciones abiertas
     open_positions_html = fields.Html(
         string='Posiciones Abiertas HTML',
-        compute='_compute_all_metrics',
+        compute='_compute_open_positions_html',
         sanitize=False
     )
     
@@ -301,7 +303,7 @@ class DivisasDashboardWizard(models.TransientModel):
     # ==========================================
     
     @api.depends('dashboard_period', 'dashboard_date_from', 'dashboard_date_to', 
-                 'operations_limit', 'inventory_low_usd', 'inventory_low_usdt',
+                 'operations_limit',
                  'threshold_critical_low', 'threshold_warning_low',
                  'threshold_balanced_min', 'threshold_balanced_max',
                  'threshold_warning_high', 'threshold_critical_high', 
@@ -327,9 +329,6 @@ class DivisasDashboardWizard(models.TransientModel):
             # Calcular TC sugeridos
             wizard._calculate_suggested_rates()
             
-            # Generar HTML
-            wizard._generate_html_elements()
-            
             # Obtener operaciones recientes
             wizard._get_recent_operations()
     
@@ -393,36 +392,23 @@ class DivisasDashboardWizard(models.TransientModel):
     
     def _calculate_position_metrics(self, date_from, date_to):
         """Calcula métricas de posición neta incluyendo posiciones abiertas"""
-        # Operaciones USD
-        ops_usd = self.env['divisas.currency'].search([
-            ('currency_type', '=', 'USD'),
-            ('state', '=', 'confirmed'),
-            ('date', '>=', date_from),
-            ('date', '<=', date_to)
-        ])
+        # Montos comprados/vendidos desde el acumulado diario
+        amounts = {
+            (currency_type, operation_type): amount
+            for currency_type, operation_type, amount in self.env['divisas.daily.stats']._read_group(
+                [('date', '>=', date_from), ('date', '<=', date_to),
+                 ('currency_type', 'in', ['USD', 'USDT'])],
+                groupby=['currency_type', 'operation_type'],
+                aggregates=['amount:sum'],
+            )
+        }
         
-        self.position_usd_bought = sum(
-            ops_usd.filtered(lambda o: o.operation_type == 'buy').mapped('amount')
-        )
-        self.position_usd_sold = sum(
-            ops_usd.filtered(lambda o: o.operation_type == 'sell').mapped('amount')
-        )
+        self.position_usd_bought = amounts.get(('USD', 'buy'), 0.0)
+        self.position_usd_sold = amounts.get(('USD', 'sell'), 0.0)
         self.position_usd_net = self.position_usd_bought - self.position_usd_sold
         
-        # Operaciones USDT
-        ops_usdt = self.env['divisas.currency'].search([
-            ('currency_type', '=', 'USDT'),
-            ('state', '=', 'confirmed'),
-            ('date', '>=', date_from),
-            ('date', '<=', date_to)
-        ])
-        
-        self.position_usdt_bought = sum(
-            ops_usdt.filtered(lambda o: o.operation_type == 'buy').mapped('amount')
-        )
-        self.position_usdt_sold = sum(
-            ops_usdt.filtered(lambda o: o.operation_type == 'sell').mapped('amount')
-        )
+        self.position_usdt_bought = amounts.get(('USDT', 'buy'), 0.0)
+        self.position_usdt_sold = amounts.get(('USDT', 'sell'), 0.0)
         self.position_usdt_net = self.position_usdt_bought - self.position_usdt_sold
         
         # NUEVO: Calcular posiciones abiertas
@@ -488,23 +474,26 @@ class DivisasDashboardWizard(models.TransientModel):
     
     def _calculate_profit_metrics(self, date_from, date_to):
         """Calcula métricas de ganancias"""
-        # Operaciones con ganancias
-        sales = self.env['divisas.currency'].search([
-            ('operation_type', '=', 'sell'),
-            ('state', '=', 'confirmed'),
-            ('date', '>=', date_from),
-            ('date', '<=', date_to)
-        ])
+        # Ganancias de ventas desde el acumulado diario
+        profits = {
+            profit_currency: (count, profit_ars, profit_usd)
+            for profit_currency, count, profit_ars, profit_usd in self.env['divisas.daily.stats']._read_group(
+                [('operation_type', '=', 'sell'),
+                 ('date', '>=', date_from), ('date', '<=', date_to)],
+                groupby=['profit_currency'],
+                aggregates=['count:sum', 'profit_ars:sum', 'profit_usd:sum'],
+            )
+        }
         
         # Ganancias en ARS
-        sales_ars = sales.filtered(lambda s: s.profit_currency == 'ARS')
-        self.profit_total_ars = sum(sales_ars.mapped('profit_ars'))
-        self.profit_count_ars = len(sales_ars)
+        count_ars, profit_ars, _profit_usd = profits.get('ARS', (0, 0.0, 0.0))
+        self.profit_total_ars = profit_ars
+        self.profit_count_ars = count_ars
         
         # Ganancias en USD
-        sales_usd = sales.filtered(lambda s: s.profit_currency == 'USD')
-        self.profit_total_usd = sum(sales_usd.mapped('profit_usd'))
-        self.profit_count_usd = len(sales_usd)
+        count_usd, _profit_ars, profit_usd = profits.get('USD', (0, 0.0, 0.0))
+        self.profit_total_usd = profit_usd
+        self.profit_count_usd = count_usd
     
     def _calculate_suggested_rates(self):
         """Calcula tipos de cambio sugeridos"""
@@ -530,105 +519,59 @@ class DivisasDashboardWizard(models.TransientModel):
             except:
                 self.suggested_rate_usdt = 0
     
-    def _generate_html_elements(self):
-        """Genera elementos HTML para el dashboard"""
-        # Generar elementos para USD
-        self._generate_balance_html_usd()
-        
-        # Generar elementos para USDT
-        self._generate_balance_html_usdt()
-        
-        # Generar alertas
-        self._generate_alerts()
-        
-        # Generar tablas de posición
-        self._generate_position_tables()
-        
-        # NUEVO: Generar HTML de posiciones abiertas
-        self._generate_open_positions_html()
-    
-    def _generate_balance_html_usd(self):
-        """Genera HTML para balance USD"""
-        # Determinar colores según el estado
-        if self.balance_usd_status == 'balanced':
-            progress_color = 'linear-gradient(90deg, #00b09b, #96c93d)'
-            badge_color = '#28a745'
-            badge_text = 'BALANCEADO'
-        elif self.balance_usd_status in ['critical_low', 'critical_high']:
-            progress_color = 'linear-gradient(90deg, #eb3349, #f45c43)'
-            badge_color = '#dc3545'
-            if self.balance_usd_status == 'critical_low':
-                badge_text = 'CRÍTICO: VENTAS MUY BAJAS'
-            else:
-                badge_text = 'CRÍTICO: SOBREVENDIDO'
-        else:
-            progress_color = 'linear-gradient(90deg, #f093fb, #f5576c)'
-            badge_color = '#ffc107'
-            if self.balance_usd_status == 'warning_low':
-                badge_text = 'ADVERTENCIA: VENTAS BAJAS'
-            else:
-                badge_text = 'ADVERTENCIA: STOCK BAJO'
-        
-        # Generar barra de progreso USD
-        self.balance_usd_progress_html = Markup("""
-            <div class="progress" style="height: 30px; background-color: #f0f0f0; border-radius: 15px;">
-                <div class="progress-bar" role="progressbar" 
-                     style="width: {percentage}%; background: {color}; border-radius: 15px; font-weight: bold; color: white;">
-                    {percentage:.1f}% vendido
-                </div>
-            </div>
-        """.format(percentage=min(self.balance_usd_percentage, 100), color=progress_color))
-        
-        # Generar badge USD
-        self.balance_usd_badge_html = Markup("""
-            <span class="badge" style="background-color: {color}; color: white; padding: 8px 15px; 
-                  font-size: 14px; border-radius: 20px;">
-                {text}
-            </span>
-        """.format(color=badge_color, text=badge_text))
+    # ==========================================
+    # FRAGMENTOS HTML (QWeb + caché)
+    # ==========================================
     
-    def _generate_balance_html_usdt(self):
-        """Genera HTML para balance USDT"""
-        # Determinar colores según el estado
-        if self.balance_usdt_status == 'balanced':
-            progress_color = 'linear-gradient(90deg, #00b09b, #96c93d)'
-            badge_color = '#28a745'
-            badge_text = 'BALANCEADO'
-        elif self.balance_usdt_status in ['critical_low', 'critical_high']:
-            progress_color = 'linear-gradient(90deg, #eb3349, #f45c43)'
-            badge_color = '#dc3545'
-            if self.balance_usdt_status == 'critical_low':
+    @tools.ormcache('template', 'values_hash', 'lang')
+    def _render_cached_fragment(self, template, values_hash, lang, values):
+        """Renderiza un template QWeb; el resultado queda cacheado por hash de valores e idioma"""
+        return self.env['ir.qweb'].with_context(lang=lang)._render(template, values)
+    
+    def _render_fragment(self, template, values):
+        """Renderiza un fragmento reutilizando el caché si los valores no cambiaron"""
+        values_hash = hashlib.sha1(
+            json.dumps(values, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return self._render_cached_fragment(template, values_hash, self.env.lang, values)
+    
+    def _get_balance_style(self, status):
+        """Devuelve (color de barra, color de badge, texto de badge) según el estado de balance"""
+        if status == 'balanced':
+            return 'linear-gradient(90deg, #00b09b, #96c93d)', '#28a745', 'BALANCEADO'
+        if status in ['critical_low', 'critical_high']:
+            if status == 'critical_low':
                 badge_text = 'CRÍTICO: VENTAS MUY BAJAS'
             else:
                 badge_text = 'CRÍTICO: SOBREVENDIDO'
+            return 'linear-gradient(90deg, #eb3349, #f45c43)', '#dc3545', badge_text
+        if status == 'warning_low':
+            badge_text = 'ADVERTENCIA: VENTAS BAJAS'
         else:
-            progress_color = 'linear-gradient(90deg, #f093fb, #f5576c)'
-            badge_color = '#ffc107'
-            if self.balance_usdt_status == 'warning_low':
-                badge_text = 'ADVERTENCIA: VENTAS BAJAS'
-            else:
-                badge_text = 'ADVERTENCIA: STOCK BAJO'
-        
-        # Generar barra de progreso USDT
-        self.balance_usdt_progress_html = Markup("""
-            <div class="progress" style="height: 30px; background-color: #f0f0f0; border-radius: 15px;">
-                <div class="progress-bar" role="progressbar" 
-                     style="width: {percentage}%; background: {color}; border-radius: 15px; font-weight: bold; color: white;">
-                    {percentage:.1f}% vendido
-                </div>
-            </div>
-        """.format(percentage=min(self.balance_usdt_percentage, 100), color=progress_color))
-        
-        # Generar badge USDT
-        self.balance_usdt_badge_html = Markup("""
-            <span class="badge" style="background-color: {color}; color: white; padding: 8px 15px; 
-                  font-size: 14px; border-radius: 20px;">
-                {text}
-            </span>
-        """.format(color=badge_color, text=badge_text))
+            badge_text = 'ADVERTENCIA: STOCK BAJO'
+        return 'linear-gradient(90deg, #f093fb, #f5576c)', '#ffc107', badge_text
     
-    def _generate_alerts(self):
-        """Genera las alertas del dashboard incluyendo posiciones abiertas"""
+    @api.depends('balance_usd_status', 'balance_usd_percentage',
+                 'balance_usdt_status', 'balance_usdt_percentage')
+    def _compute_balance_html(self):
+        """Genera barra de progreso y badge de balance para USD y USDT"""
+        for wizard in self:
+            for currency in ('usd', 'usdt'):
+                status = wizard['balance_%s_status' % currency]
+                progress_color, badge_color, badge_text = wizard._get_balance_style(status)
+                wizard['balance_%s_progress_html' % currency] = wizard._render_fragment(
+                    'divisas.dashboard_balance_progress', {
+                        'percentage': min(wizard['balance_%s_percentage' % currency], 100),
+                        'color': progress_color,
+                    })
+                wizard['balance_%s_badge_html' % currency] = wizard._render_fragment(
+                    'divisas.dashboard_balance_badge', {
+                        'color': badge_color,
+                        'text': badge_text,
+                    })
+    
+    def _get_alerts(self):
+        """Obtiene las alertas del dashboard incluyendo posiciones abiertas"""
         alerts = []
         
         # Alertas de balance USD
@@ -727,172 +670,65 @@ class DivisasDashboardWizard(models.TransientModel):
                 'message': f'Inventario USDT bajo: {self.inventory_usdt_quantity:.2f} USDT (mínimo: {self.inventory_low_usdt:.0f})'
             })
         
-        # Generar HTML de alertas
-        if alerts:
-            alerts_html = ''
-            for alert in alerts:
-                alert_colors = {
-                    'danger': {'bg': '#ffe0e0', 'border': '#eb3349', 'text': '#721c24'},
-                    'warning': {'bg': '#fff3cd', 'border': '#f5576c', 'text': '#856404'},
-                    'info': {'bg': '#d1ecf1', 'border': '#4facfe', 'text': '#0c5460'}
-                }
-                colors = alert_colors.get(alert['type'], alert_colors['info'])
-                
-                alerts_html += """
-                    <div class="alert" style="background: {bg}; border-left: 4px solid {border}; 
-                         color: {text}; padding: 10px 15px; margin-bottom: 10px; border-radius: 8px;">
-                        <i class="fa {icon}"></i> {message}
-                    </div>
-                """.format(
-                    bg=colors['bg'],
-                    border=colors['border'],
-                    text=colors['text'],
-                    icon=alert.get('icon', 'fa-info'),
-                    message=alert['message']
-                )
-            self.alerts_html = Markup(alerts_html)
-        else:
-            self.alerts_html = Markup("""
-                <div class="alert" style="background: #d4edda; border-left: 4px solid #28a745; 
-                     color: #155724; padding: 10px 15px; border-radius: 8px;">
-                    <i class="fa fa-check-circle"></i> Sistema operando normalmente
-                </div>
-            """)
-    
-    def _generate_position_tables(self):
+        return alerts
+    
+    @api.depends('balance_usd_status', 'balance_usd_percentage',
+                 'balance_usdt_status', 'balance_usdt_percentage',
+                 'open_positions_usd', 'open_positions_count_usd',
+                 'open_positions_usdt', 'open_positions_count_usdt',
+                 'inventory_usd_quantity', 'inventory_usdt_quantity',
+                 'inventory_low_usd', 'inventory_low_usdt')
+    def _compute_alerts_html(self):
+        """Genera el bloque de alertas del dashboard"""
+        alert_colors = {
+            'danger': {'bg': '#ffe0e0', 'border': '#eb3349', 'text': '#721c24'},
+            'warning': {'bg': '#fff3cd', 'border': '#f5576c', 'text': '#856404'},
+            'info': {'bg': '#d1ecf1', 'border': '#4facfe', 'text': '#0c5460'}
+        }
+        for wizard in self:
+            alerts = [
+                dict(alert, **alert_colors.get(alert['type'], alert_colors['info']))
+                for alert in wizard._get_alerts()
+            ]
+            wizard.alerts_html = wizard._render_fragment('divisas.dashboard_alerts', {'alerts': alerts})
+    
+    @api.depends('position_usd_bought', 'position_usd_sold', 'position_usd_net', 'open_positions_usd',
+                 'position_usdt_bought', 'position_usdt_sold', 'position_usdt_net', 'open_positions_usdt')
+    def _compute_position_html(self):
         """Genera las tablas HTML de posiciones incluyendo posiciones abiertas"""
-        # Tabla USD
-        if abs(self.position_usd_net) < 100:
-            usd_color = '#28a745'
-        elif abs(self.position_usd_net) < 1000:
-            usd_color = '#ffc107'
-        else:
-            usd_color = '#dc3545'
-        
-        # Incluir fila de posiciones abiertas si existen
-        open_pos_row_usd = ""
-        if self.open_positions_usd > 0:
-            open_pos_row_usd = f"""
-                <tr>
-                    <td style="color: #ff6b6b;">Posiciones Abiertas:</td>
-                    <td class="text-right" style="color: #ff6b6b;">
-                        <strong>{self.open_positions_usd:.2f}</strong>
-                    </td>
-                </tr>
-            """
-        
-        self.position_usd_html = Markup("""
-            <table class="table table-sm">
-                <tr>
-                    <td>Comprado:</td>
-                    <td class="text-right"><strong>{bought:.2f}</strong></td>
-                </tr>
-                <tr>
-                    <td>Vendido:</td>
-                    <td class="text-right"><strong>{sold:.2f}</strong></td>
-                </tr>
-                {open_pos_row}
-                <tr style="border-top: 2px solid #dee2e6;">
-                    <td><strong>Neto:</strong></td>
-                    <td class="text-right">
-                        <strong style="color: {color};">{net:.2f}</strong>
-                    </td>
-                </tr>
-            </table>
-        """.format(
-            bought=self.position_usd_bought,
-            sold=self.position_usd_sold,
-            open_pos_row=open_pos_row_usd,
-            net=self.position_usd_net,
-            color=usd_color
-        ))
-        
-        # Tabla USDT
-        if abs(self.position_usdt_net) < 100:
-            usdt_color = '#28a745'
-        elif abs(self.position_usdt_net) < 1000:
-            usdt_color = '#ffc107'
-        else:
-            usdt_color = '#dc3545'
-        
-        # Incluir fila de posiciones abiertas si existen
-        open_pos_row_usdt = ""
-        if self.open_positions_usdt > 0:
-            open_pos_row_usdt = f"""
-                <tr>
-                    <td style="color: #ff6b6b;">Posiciones Abiertas:</td>
-                    <td class="text-right" style="color: #ff6b6b;">
-                        <strong>{self.open_positions_usdt:.2f}</strong>
-                    </td>
-                </tr>
-            """
-        
-        self.position_usdt_html = Markup("""
-            <table class="table table-sm">
-                <tr>
-                    <td>Comprado:</td>
-                    <td class="text-right"><strong>{bought:.2f}</strong></td>
-                </tr>
-                <tr>
-                    <td>Vendido:</td>
-                    <td class="text-right"><strong>{sold:.2f}</strong></td>
-                </tr>
-                {open_pos_row}
-                <tr style="border-top: 2px solid #dee2e6;">
-                    <td><strong>Neto:</strong></td>
-                    <td class="text-right">
-                        <strong style="color: {color};">{net:.2f}</strong>
-                    </td>
-                </tr>
-            </table>
-        """.format(
-            bought=self.position_usdt_bought,
-            sold=self.position_usdt_sold,
-            open_pos_row=open_pos_row_usdt,
-            net=self.position_usdt_net,
-            color=usdt_color
-        ))
-    
-    def _generate_open_positions_html(self):
+        for wizard in self:
+            for currency in ('usd', 'usdt'):
+                net = wizard['position_%s_net' % currency]
+                if abs(net) < 100:
+                    color = '#28a745'
+                elif abs(net) < 1000:
+                    color = '#ffc107'
+                else:
+                    color = '#dc3545'
+                wizard['position_%s_html' % currency] = wizard._render_fragment(
+                    'divisas.dashboard_position_table', {
+                        'bought': wizard['position_%s_bought' % currency],
+                        'sold': wizard['position_%s_sold' % currency],
+                        'open_positions': wizard['open_positions_%s' % currency],
+                        'net': net,
+                        'color': color,
+                    })
+    
+    @api.depends('open_positions_usd', 'open_positions_count_usd',
+                 'open_positions_usdt', 'open_positions_count_usdt')
+    def _compute_open_positions_html(self):
         """Genera HTML para mostrar posiciones abiertas"""
-        if self.open_positions_usd > 0 or self.open_positions_usdt > 0:
-            html_content = """
-                <div class="card" style="border: 2px solid #ff6b6b; background-color: #fff5f5;">
-                    <div class="card-header" style="background-color: #ff6b6b; color: white;">
-                        <h5><i class="fa fa-exclamation-triangle"></i> Posiciones Abiertas (Requieren Cobertura)</h5>
-                    </div>
-                    <div class="card-body">
-                        <div class="row">
-            """
-            
-            if self.open_positions_usd > 0:
-                html_content += f"""
-                    <div class="col-md-6">
-                        <div class="text-center">
-                            <h3 style="color: #ff6b6b;">{self.open_positions_usd:.2f} USD</h3>
-                            <p class="text-muted">{self.open_positions_count_usd} posiciones abiertas</p>
-                        </div>
-                    </div>
-                """
-            
-            if self.open_positions_usdt > 0:
-                html_content += f"""
-                    <div class="col-md-6">
-                        <div class="text-center">
-                            <h3 style="color: #ff6b6b;">{self.open_positions_usdt:.2f} USDT</h3>
-                            <p class="text-muted">{self.open_positions_count_usdt} posiciones abiertas</p>
-                        </div>
-                    </div>
-                """
-            
-            html_content += """
-                        </div>
-                    </div>
-                </div>
-            """
-            self.open_positions_html = Markup(html_content)
-        else:
-            self.open_positions_html = Markup("")
+        for wizard in self:
+            if wizard.open_positions_usd > 0 or wizard.open_positions_usdt > 0:
+                wizard.open_positions_html = wizard._render_fragment(
+                    'divisas.dashboard_open_positions', {
+                        'usd': wizard.open_positions_usd,
+                        'count_usd': wizard.open_positions_count_usd,
+                        'usdt': wizard.open_positions_usdt,
+                        'count_usdt': wizard.open_positions_count_usdt,
+                    })
+            else:
+                wizard.open_positions_html = Markup("")
     
     def _get_recent_operations(self):
         """Obtiene las operaciones recientes según el límite configurado"""
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+import logging
+from datetime import timedelta
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import sql
+
+_logger = logging.getLogger(__name__)
+
+
+class DivisasInventoryLotArchive(models.Model):
+    """Archivo frío de lotes agotados o cancelados.
+
+    Los lotes se mueven aquí desde ``divisas.inventory.lot`` por el cron de
+    archivo, conservando su id original para que los reportes puedan unir
+    ambas tablas sin colisiones.
+    """
+    _name = 'divisas.inventory.lot.archive'
+    _description = 'Archivo de Lotes de Inventario FIFO'
+    _order = 'date asc, original_id asc'
+    _rec_name = 'name'
+
+    original_id = fields.Integer(string='ID Original', required=True, readonly=True, index=True)
+    name = fields.Char(string='Referencia', readonly=True)
+    purchase_operation_id = fields.Many2one('divisas.currency', string='Operación de Compra',
+                                            readonly=True, index=True)
+    partner_id = fields.Many2one('res.partner', string='Proveedor', readonly=True)
+    currency_type = fields.Selection([
+        ('USD', 'Dólares (USD)'),
+        ('USDT', 'Tether (USDT)')
+    ], string='Divisa', readonly=True)
+    quantity_purchased = fields.Float(string='Cantidad Comprada', digits=(16, 2), readonly=True)
+    quantity_available = fields.Float(string='Cantidad Disponible', digits=(16, 2), readonly=True)
+    acquisition_rate = fields.Float(string='TC de Adquisición', digits=(16, 6), readonly=True)
+    reference_currency = fields.Selection([
+        ('ARS', 'ARS'),
+        ('USD', 'USD'),
+        ('USDT', 'USDT')
+    ], string='Moneda de Referencia', readonly=True)
+    total_cost = fields.Float(string='Costo Total', digits=(16, 2), readonly=True)
+    date = fields.Date(string='Fecha de Compra', readonly=True)
+    state = fields.Selection([
+        ('available', 'Disponible'),
+        ('exhausted', 'Agotado'),
+        ('cancelled', 'Cancelado')
+    ], string='Estado', readonly=True)
+    company_id = fields.Many2one('res.company', string='Compañía', readonly=True)
+    archive_date = fields.Date(string='Fecha de Archivo', readonly=True)
+
+    consumption_ids = fields.One2many('divisas.lot.consumption.archive', 'lot_archive_id',
+                                      string='Consumos')
+
+    _sql_constraints = [
+        ('original_id_uniq', 'unique(original_id)', 'El lote ya se encuentra archivado.'),
+    ]
+
+
+class DivisasLotConsumptionArchive(models.Model):
+    """Archivo frío de consumos de lotes archivados"""
+    _name = 'divisas.lot.consumption.archive'
+    _description = 'Archivo de Consumos de Lote FIFO'
+    _order = 'date desc, original_id desc'
+
+    original_id = fields.Integer(string='ID Original', required=True, readonly=True, index=True)
+    lot_original_id = fields.Integer(string='ID Original del Lote', required=True, readonly=True, index=True)
+    lot_archive_id = fields.Many2one('divisas.inventory.lot.archive', string='Lote',
+                                     readonly=True, index=True, ondelete='cascade')
+    sale_operation_id = fields.Many2one('divisas.currency', string='Operación de Venta',
+                                        readonly=True, index=True)
+    quantity_consumed = fields.Float(string='Cantidad Consumida', digits=(16, 2), readonly=True)
+    acquisition_rate = fields.Float(string='TC de Adquisición', digits=(16, 6), readonly=True)
+    consumption_rate = fields.Float(string='TC de Venta', digits=(16, 6), readonly=True)
+    profit_ars = fields.Float(string='Ganancia (ARS)', digits=(16, 2), readonly=True)
+    profit_usd = fields.Float(string='Ganancia (USD)', digits=(16, 2), readonly=True)
+    profit_currency = fields.Selection([
+        ('ARS', 'ARS'),
+        ('USD', 'USD')
+    ], string='Moneda', readonly=True)
+    currency_type = fields.Selection([
+        ('USD', 'Dólares (USD)'),
+        ('USDT', 'Tether (USDT)')
+    ], string='Divisa', readonly=True)
+    reference_currency = fields.Selection([
+        ('ARS', 'ARS'),
+        ('USD', 'USD'),
+        ('USDT', 'USDT')
+    ], string='Moneda de Referencia', readonly=True)
+    date = fields.Date(string='Fecha', readonly=True)
+    partner_id = fields.Many2one('res.partner', string='Cliente', readonly=True)
+    state = fields.Selection([
+        ('active', 'Activo'),
+        ('reverted', 'Revertido')
+    ], string='Estado', readonly=True)
+    company_id = fields.Many2one('res.company', string='Compañía', readonly=True)
+
+    _sql_constraints = [
+        ('original_id_uniq', 'unique(original_id)', 'El consumo ya se encuentra archivado.'),
+    ]
+
+    def init(self):
+        # Índice para sumar consumos archivados activos por lote hasta una fecha
+        sql.create_index(
+            self.env.cr,
+            'divisas_lot_consumption_archive_lot_date_active_idx',
+            self._table,
+            ['lot_original_id', 'date'],
+            where="state = 'active'",
+        )
+
+
+class DivisasInventoryLotArchiving(models.Model):
+    _inherit = 'divisas.inventory.lot'
+
+    @api.model
+    def _get_archive_horizon_days(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param('divisas.archive.horizon.days', 365))
+
+    @api.model
+    def _cron_archive_lots(self, batch_size=5000):
+        """Mueve lotes agotados/cancelados y sus consumos anteriores al horizonte al archivo"""
+        cutoff = fields.Date.context_today(self) - timedelta(days=self._get_archive_horizon_days())
+        self.env.flush_all()
+        cr = self.env.cr
+        total = 0
+        while True:
+            # Solo lotes cerrados cuyos consumos son todos anteriores al horizonte
+            cr.execute("""
+                SELECT l.id
+                FROM divisas_inventory_lot l
+                WHERE l.state IN ('exhausted', 'cancelled')
+                  AND l.date < %(cutoff)s
+                  AND NOT EXISTS (
+                      SELECT 1 FROM divisas_lot_consumption c
+                      WHERE c.lot_id = l.id AND c.date >= %(cutoff)s
+                  )
+                ORDER BY l.id
+                LIMIT %(limit)s
+            """, {'cutoff': cutoff, 'limit': batch_size})
+            lot_ids = [row[0] for row in cr.fetchall()]
+            if not lot_ids:
+                break
+
+            cr.execute("""
+                INSERT INTO divisas_inventory_lot_archive
+                    (original_id, name, purchase_operation_id, partner_id, currency_type,
+                     quantity_purchased, quantity_available, acquisition_rate, reference_currency,
+                     total_cost, date, state, company_id, archive_date,
+                     create_uid, create_date, write_uid, write_date)
+                SELECT id, name, purchase_operation_id, partner_id, currency_type,
+                       quantity_purchased, quantity_available, acquisition_rate, reference_currency,
+                       total_cost, date, state, company_id, %(today)s,
+                       %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+                FROM divisas_inventory_lot
+                WHERE id = ANY(%(lot_ids)s)
+            """, {'lot_ids': lot_ids, 'today': fields.Date.context_today(self), 'uid': self.env.uid})
+
+            cr.execute("""
+                INSERT INTO divisas_lot_consumption_archive
+                    (original_id, lot_original_id, lot_archive_id, sale_operation_id,
+                     quantity_consumed, acquisition_rate, consumption_rate, profit_ars, profit_usd,
+                     profit_currency, currency_type, reference_currency, date, partner_id, state,
+                     company_id, create_uid, create_date, write_uid, write_date)
+                SELECT c.id, c.lot_id, a.id, c.sale_operation_id,
+                       c.quantity_consumed, c.acquisition_rate, c.consumption_rate, c.profit_ars, c.profit_usd,
+                       c.profit_currency, c.currency_type, c.reference_currency, c.date, c.partner_id, c.state,
+                       c.company_id, %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+                FROM divisas_lot_consumption c
+                JOIN divisas_inventory_lot_archive a ON a.original_id = c.lot_id
+                WHERE c.lot_id = ANY(%(lot_ids)s)
+            """, {'lot_ids': lot_ids, 'uid': self.env.uid})
+
+            cr.execute("DELETE FROM divisas_lot_consumption WHERE lot_id = ANY(%s)", (lot_ids,))
+            cr.execute("UPDATE divisas_currency SET inventory_lot_id = NULL WHERE inventory_lot_id = ANY(%s)",
+                       (lot_ids,))
+            cr.execute("DELETE FROM divisas_inventory_lot WHERE id = ANY(%s)", (lot_ids,))
+            total += len(lot_ids)
+
+        if total:
+            self.env.invalidate_all()
+            _logger.info('Archivo FIFO: %s lotes movidos al archivo (corte %s)', total, cutoff)
+        return total
+
+
+class DivisasCurrencyArchiving(models.Model):
+    _inherit = 'divisas.currency'
+
+    archived_consumption_ids = fields.One2many('divisas.lot.consumption.archive',
+                                               'sale_operation_id',
+                                               string='Consumos Archivados')
+
+    archived_lot_id = fields.Many2one('divisas.inventory.lot.archive',
+                                      string='Lote Archivado',
+                                      compute='_compute_archived_lot_id')
+
+    def _compute_archived_lot_id(self):
+        archived = self.env['divisas.inventory.lot.archive'].search([
+            ('purchase_operation_id', 'in', self.ids)
+        ])
+        lot_by_operation = {lot.purchase_operation_id.id: lot for lot in archived}
+        for record in self:
+            record.archived_lot_id = lot_by_operation.get(record.id, False)
+
+    def action_cancel(self):
+        for record in self:
+            if record.state == 'confirmed' and (record.archived_consumption_ids or record.archived_lot_id):
+                raise UserError(_(
+                    'No se puede cancelar la operación %s porque su inventario FIFO ya fue archivado.'
+                ) % record.name)
+        return super().action_cancel()
@@ -2,6 +2,7 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
+from odoo.tools import sql
 from datetime import datetime
 
 
@@ -96,11 +97,22 @@ class DivisasInventoryLot(models.Model):
     
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get('name', _('Nuevo')) == _('Nuevo'):
-                vals['name'] = self.env['ir.sequence'].next_by_code('divisas.inventory.lot') or _('Nuevo')
+        pending = [vals for vals in vals_list if vals.get('name', _('Nuevo')) == _('Nuevo')]
+        names = self.env['ir.sequence'].next_block_by_code('divisas.inventory.lot', len(pending))
+        for vals, name in zip(pending, names):
+            vals['name'] = name or _('Nuevo')
         return super(DivisasInventoryLot, self).create(vals_list)
     
+    def init(self):
+        # Cola FIFO por compañía: solo indexa los lotes disponibles
+        sql.create_index(
+            self.env.cr,
+            'divisas_inventory_lot_fifo_queue_idx',
+            self._table,
+            ['company_id', 'currency_type', 'date', 'id'],
+            where="state = 'available'",
+        )
+    
     @api.depends('quantity_purchased', 'quantity_available')
     def _compute_quantity_consumed(self):
         for record in self:
@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
+from odoo.tools import sql
 
 class DivisasOpenPosition(models.Model):
     """Posiciones abiertas cuando se vende sin inventario"""
     _name = 'divisas.open.position'
     _description = 'Posición Abierta FIFO'
-    _order = 'create_date asc'  # FIFO para cubrir
+    _order = 'create_date asc, id asc'  # FIFO para cubrir
     _rec_name = 'name'
     
     name = fields.Char(string='Referencia', required=True, 
@@ -95,11 +96,22 @@ class DivisasOpenPosition(models.Model):
     
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get('name', _('Nuevo')) == _('Nuevo'):
-                vals['name'] = self.env['ir.sequence'].next_by_code('divisas.open.position') or _('Nuevo')
+        pending = [vals for vals in vals_list if vals.get('name', _('Nuevo')) == _('Nuevo')]
+        names = self.env['ir.sequence'].next_block_by_code('divisas.open.position', len(pending))
+        for vals, name in zip(pending, names):
+            vals['name'] = name or _('Nuevo')
         return super().create(vals_list)
     
+    def init(self):
+        # Cola FIFO por compañía: solo indexa las posiciones pendientes de cobertura
+        sql.create_index(
+            self.env.cr,
+            'divisas_open_position_fifo_queue_idx',
+            self._table,
+            ['company_id', 'currency_type', 'create_date', 'id'],
+            where="state IN ('open', 'partial')",
+        )
+    
     @api.depends('quantity_open', 'quantity_covered')
     def _compute_quantity_pending(self):
         for record in self:
@@ -55,9 +55,10 @@ class DivisasWalletMovement(models.Model):
     
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get('name', _('Nuevo')) == _('Nuevo'):
-                vals['name'] = self.env['ir.sequence'].next_by_code('divisas.wallet.movement') or _('Nuevo')
+        pending = [vals for vals in vals_list if vals.get('name', _('Nuevo')) == _('Nuevo')]
+        names = self.env['ir.sequence'].next_block_by_code('divisas.wallet.movement', len(pending))
+        for vals, name in zip(pending, names):
+            vals['name'] = name or _('Nuevo')
         
         movements = super(DivisasWalletMovement, self).create(vals_list)
         
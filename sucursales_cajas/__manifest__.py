@@ -18,6 +18,7 @@
         'base',
         'mail',
         'web',
+        'bus',
         'chequera',  # Dependencia del módulo de cheques
         'divisas',   # Dependencia del módulo de divisas
     ],
@@ -34,7 +35,10 @@
         'views/sucursales_cajas_branch_view.xml',
         'views/sucursales_cajas_cashbox_view.xml',
         'views/sucursales_cajas_session_view.xml',
+        'views/sucursales_cajas_balance_bill_view.xml',
         'views/sucursales_cajas_operation_view.xml',
+        'views/sucursales_cajas_transfer_view.xml',
+        'views/sucursales_cajas_transfer_destination_view.xml',
         'views/res_partner_inherit_view.xml',
         
         # Wizards
@@ -43,6 +47,7 @@
         'wizard_views/cash_count_wizard_view.xml',
         'wizard_views/session_login_wizard_view.xml',
         'wizard_views/process_operation_wizard_view.xml',
+        'wizard_views/batch_process_wizard_view.xml',
         'wizard_views/close_session_wizard_view.xml',
         
         # Dashboard (después de las acciones)
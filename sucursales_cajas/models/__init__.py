@@ -3,8 +3,13 @@ from . import sucursales_cajas_account
 from . import sucursales_cajas_cashbox_line
 from . import sucursales_cajas_cashbox
 from . import sucursales_cajas_balance
+from . import sucursales_cajas_balance_bill
 from . import sucursales_cajas_session
+from . import sucursales_cajas_session_total
+from . import sucursales_cajas_transfer_destination
 from . import sucursales_cajas_operation
+from . import sucursales_cajas_transfer
 from . import res_partner_inherit
 from . import chequera_wallet_inherit
-from . import res_partner_wallet_inherit
\ No newline at end of file
+from . import res_partner_wallet_inherit
+from . import ir_websocket
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = 'ir.websocket'
+    
+    def _build_bus_channel_list(self, channels):
+        """Suscribe a cada usuario interno a los canales de las cajas que puede operar"""
+        if self.env.uid and self.env.user._is_internal():
+            channels = list(channels)
+            channels.extend(self.env['sucursales_cajas.cashbox'].search([
+                ('allowed_user_ids', 'in', self.env.uid)
+            ]))
+        return super()._build_bus_channel_list(channels)
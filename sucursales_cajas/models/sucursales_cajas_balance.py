@@ -2,7 +2,6 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
-import json
 
 
 class SucursalesCajasBalance(models.Model):
@@ -96,9 +95,10 @@ class SucursalesCajasBalance(models.Model):
     )
     
     # Detalle de billetes (para efectivo)
-    bill_details = fields.Text(
-        string='Detalle de Billetes',
-        help="JSON con el detalle de billetes por denominación"
+    bill_ids = fields.One2many(
+        'sucursales_cajas.balance_bill',
+        'balance_id',
+        string='Detalle de Billetes'
     )
     
     bill_details_display = fields.Html(
@@ -136,6 +136,11 @@ class SucursalesCajasBalance(models.Model):
         readonly=True
     )
     
+    _sql_constraints = [
+        ('session_line_type_unique', 'UNIQUE(session_id, balance_type, cashbox_line_id)',
+         'Ya existe un balance de ese tipo para la subcaja en esta sesión.'),
+    ]
+    
     @api.depends('session_id', 'balance_type', 'cashbox_line_id')
     def _compute_display_name(self):
         """Genera el nombre para mostrar"""
@@ -166,85 +171,58 @@ class SucursalesCajasBalance(models.Model):
                 # Para otros tipos, usar el monto declarado
                 balance.difference = balance.declared_amount - balance.system_balance
     
+    @api.depends('bill_ids.quantity')
     def _compute_bill_details_display(self):
         """Genera HTML para mostrar el detalle de billetes"""
         for balance in self:
-            if not balance.bill_details:
+            bills = balance.bill_ids.filtered(lambda b: b.quantity > 0)
+            if not bills:
                 balance.bill_details_display = False
                 continue
             
-            try:
-                details = json.loads(balance.bill_details)
-                
-                # Generar tabla HTML
-                html = '<table class="table table-sm">'
-                html += '<thead><tr><th>Denominación</th><th>Cantidad</th><th>Subtotal</th></tr></thead>'
-                html += '<tbody>'
-                
-                total = 0
-                for denom, qty in sorted(details.items(), key=lambda x: float(x[0]), reverse=True):
-                    if qty > 0:
-                        subtotal = float(denom) * qty
-                        total += subtotal
-                        html += f'<tr><td>${denom}</td><td>{qty}</td><td>${subtotal:,.2f}</td></tr>'
-                
-                html += f'<tr class="font-weight-bold"><td colspan="2">Total</td><td>${total:,.2f}</td></tr>'
-                html += '</tbody></table>'
-                
-                balance.bill_details_display = html
-            except:
-                balance.bill_details_display = '<p>Error al mostrar detalle</p>'
+            # Generar tabla HTML
+            html = '<table class="table table-sm">'
+            html += '<thead><tr><th>Denominación</th><th>Cantidad</th><th>Subtotal</th></tr></thead>'
+            html += '<tbody>'
+            
+            for bill in bills.sorted('denomination', reverse=True):
+                html += f'<tr><td>${bill.denomination:g}</td><td>{bill.quantity}</td><td>${bill.subtotal:,.2f}</td></tr>'
+            
+            html += f'<tr class="font-weight-bold"><td colspan="2">Total</td><td>${sum(bills.mapped("subtotal")):,.2f}</td></tr>'
+            html += '</tbody></table>'
+            
+            balance.bill_details_display = html
     
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Override create para establecer saldo del sistema"""
-        # Obtener el saldo del sistema al momento de crear
-        if vals.get('cashbox_line_id') and vals.get('balance_type'):
-            line = self.env['sucursales_cajas.cashbox_line'].browse(vals['cashbox_line_id'])
-            
-            if vals['balance_type'] == 'opening':
-                # Para apertura, usar el saldo actual de la línea
-                vals['system_balance'] = line.current_balance
-            else:
-                # Para cierre, calcular basado en la sesión
-                # TODO: Implementar cuando tengamos operaciones
-                vals['system_balance'] = line.session_current_balance
+        for vals in vals_list:
+            # Obtener el saldo del sistema al momento de crear
+            if vals.get('cashbox_line_id') and vals.get('balance_type'):
+                line = self.env['sucursales_cajas.cashbox_line'].browse(vals['cashbox_line_id'])
+                
+                if vals['balance_type'] == 'opening':
+                    # Para apertura, usar el saldo actual de la línea
+                    vals['system_balance'] = line.current_balance
+                elif 'system_balance' not in vals:
+                    # Para cierre, el wizard envía el saldo esperado ya calculado
+                    vals['system_balance'] = line.session_current_balance
         
-        return super(SucursalesCajasBalance, self).create(vals)
-    
-    @api.constrains('session_id', 'balance_type', 'cashbox_line_id')
-    def _check_unique_balance(self):
-        """Verifica que no haya balances duplicados"""
-        for balance in self:
-            # No puede haber dos balances del mismo tipo para la misma línea en la misma sesión
-            duplicate = self.search([
-                ('session_id', '=', balance.session_id.id),
-                ('balance_type', '=', balance.balance_type),
-                ('cashbox_line_id', '=', balance.cashbox_line_id.id),
-                ('id', '!=', balance.id)
-            ], limit=1)
-            
-            if duplicate:
-                raise ValidationError(
-                    _('Ya existe un balance de %s para la subcaja "%s" en esta sesión.') 
-                    % ('apertura' if balance.balance_type == 'opening' else 'cierre',
-                       balance.cashbox_line_id.display_name)
-                )
+        return super(SucursalesCajasBalance, self).create(vals_list)
     
     def action_confirm(self):
-        """Confirma el balance"""
-        self.ensure_one()
-        
-        if self.state == 'confirmed':
+        """Confirma los balances"""
+        if any(balance.state == 'confirmed' for balance in self):
             raise UserError(_('Este balance ya está confirmado.'))
         
         # Validar que se haya ingresado un monto
-        if self.is_cash:
-            if not self.counted_amount and self.counted_amount != 0:
-                raise UserError(_('Debe contar el efectivo antes de confirmar.'))
-        else:
-            if not self.declared_amount and self.declared_amount != 0:
-                raise UserError(_('Debe declarar el monto antes de confirmar.'))
+        for balance in self:
+            if balance.is_cash:
+                if not balance.counted_amount and balance.counted_amount != 0:
+                    raise UserError(_('Debe contar el efectivo antes de confirmar.'))
+            else:
+                if not balance.declared_amount and balance.declared_amount != 0:
+                    raise UserError(_('Debe declarar el monto antes de confirmar.'))
         
         # Actualizar campos
         self.write({
@@ -254,12 +232,12 @@ class SucursalesCajasBalance(models.Model):
         })
         
         # Si es balance de apertura, actualizar el saldo inicial de la sesión
-        if self.balance_type == 'opening':
+        for balance in self.filtered(lambda b: b.balance_type == 'opening'):
             # El saldo declarado/contado se convierte en el saldo inicial
-            amount = self.counted_amount if self.is_cash else self.declared_amount
+            amount = balance.counted_amount if balance.is_cash else balance.declared_amount
             
             # Actualizar el balance de la línea de caja si hay diferencia
-            if self.difference != 0:
+            if balance.difference != 0:
                 # TODO: Crear operación de ajuste
                 pass
         
@@ -302,7 +280,7 @@ class SucursalesCajasBalance(models.Model):
         self.account_id = False
         self.declared_amount = 0.0
         self.counted_amount = 0.0
-        self.bill_details = False
+        self.bill_ids = [(5, 0, 0)]
         
         # Si la línea tiene una sola cuenta, seleccionarla automáticamente
         if self.cashbox_line_id and not self.is_cash:
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from odoo import models, fields, api, tools
+from odoo.tools import sql
+
+# Prefijo de los parámetros cargados por data/bill_denominations_data.xml
+DENOMINATION_PARAM_PREFIX = 'sucursales_cajas.denom_'
+
+
+class SucursalesCajasBalanceBill(models.Model):
+    """Cantidad contada de una denominación en un balance de efectivo.
+
+    Una fila por denominación permite agrupar la composición del efectivo
+    entre sesiones con una sola consulta.
+    """
+    _name = 'sucursales_cajas.balance_bill'
+    _description = 'Detalle de Billetes de Balance'
+    _order = 'balance_id, denomination desc'
+
+    balance_id = fields.Many2one(
+        'sucursales_cajas.balance',
+        string='Balance',
+        required=True,
+        index=True,
+        ondelete='cascade'
+    )
+
+    denomination = fields.Float(
+        string='Denominación',
+        required=True,
+        group_operator=False
+    )
+
+    quantity = fields.Integer(
+        string='Cantidad',
+        required=True,
+        default=0
+    )
+
+    subtotal = fields.Float(
+        string='Subtotal',
+        compute='_compute_subtotal',
+        store=True
+    )
+
+    # Campos relacionados para agrupar sin joins
+    currency_type = fields.Selection(
+        related='balance_id.currency_type',
+        string='Moneda',
+        store=True
+    )
+
+    balance_type = fields.Selection(
+        related='balance_id.balance_type',
+        string='Tipo de Balance',
+        store=True
+    )
+
+    session_id = fields.Many2one(
+        related='balance_id.session_id',
+        string='Sesión',
+        store=True,
+        index=True
+    )
+
+    cashbox_id = fields.Many2one(
+        related='balance_id.cashbox_id',
+        string='Caja',
+        store=True
+    )
+
+    date = fields.Datetime(
+        related='balance_id.session_id.start_datetime',
+        string='Fecha',
+        store=True
+    )
+
+    _sql_constraints = [
+        ('balance_denomination_unique', 'UNIQUE(balance_id, denomination)',
+         'La denominación ya está cargada en este balance.'),
+        ('quantity_positive', 'CHECK(quantity >= 0)',
+         'La cantidad no puede ser negativa.'),
+    ]
+
+    @api.depends('denomination', 'quantity')
+    def _compute_subtotal(self):
+        for bill in self:
+            bill.subtotal = bill.denomination * bill.quantity
+
+    def init(self):
+        super().init()
+        # Migrar el detalle JSON de billetes anterior a filas por denominación
+        cr = self.env.cr
+        if not sql.column_exists(cr, 'sucursales_cajas_balance', 'bill_details'):
+            return
+        cr.execute("""
+            SELECT b.id, b.bill_details
+            FROM sucursales_cajas_balance b
+            WHERE b.bill_details IS NOT NULL AND b.bill_details != ''
+              AND NOT EXISTS (
+                  SELECT 1 FROM sucursales_cajas_balance_bill bb WHERE bb.balance_id = b.id
+              )
+        """)
+        vals_list = []
+        for balance_id, bill_details in cr.fetchall():
+            try:
+                details = json.loads(bill_details)
+            except ValueError:
+                continue
+            for denomination, quantity in details.items():
+                if quantity and int(quantity) > 0:
+                    vals_list.append({
+                        'balance_id': balance_id,
+                        'denomination': float(denomination),
+                        'quantity': int(quantity),
+                    })
+        if vals_list:
+            self.create(vals_list)
+
+    @api.model
+    @tools.ormcache()
+    def _get_denomination_map(self):
+        """Denominaciones por moneda {moneda: (mayor, ..., menor)} leídas una vez de los parámetros.
+
+        La caché se invalida al modificar parámetros del sistema.
+        """
+        params = self.env['ir.config_parameter'].sudo().search_read(
+            [('key', '=like', DENOMINATION_PARAM_PREFIX + '%')],
+            ['key', 'value'],
+        )
+        denominations = {}
+        for param in params:
+            currency = param['key'][len(DENOMINATION_PARAM_PREFIX):].split('_', 1)[0].upper()
+            try:
+                value = float(param['value'])
+            except (TypeError, ValueError):
+                continue
+            if value > 0:
+                denominations.setdefault(currency, set()).add(value)
+        return {
+            currency: tuple(sorted(values, reverse=True))
+            for currency, values in denominations.items()
+        }
+
+    @api.model
+    def _get_denominations(self, currency_type):
+        """Denominaciones de la moneda, de mayor a menor"""
+        return self._get_denomination_map().get(currency_type, ())
+
+    @api.model
+    def _get_cash_composition(self, domain=None):
+        """Composición del efectivo contado por mes, moneda y denominación en una consulta"""
+        groups = self._read_group(
+            domain or [],
+            ['date:month', 'currency_type', 'denomination'],
+            ['quantity:sum', 'subtotal:sum'],
+        )
+        return [{
+            'month': month,
+            'currency_type': currency,
+            'denomination': denomination,
+            'quantity': quantity,
+            'subtotal': subtotal,
+        } for month, currency, denomination, quantity, subtotal in groups]
@@ -233,6 +233,11 @@ class SucursalesCajasCashbox(models.Model):
         string='Inicio de Sesión'
     )
     
+    _sql_constraints = [
+        ('name_branch_unique', 'UNIQUE(branch_id, name)',
+         'Ya existe una caja con ese nombre en la sucursal.'),
+    ]
+    
     @api.depends('name', 'code', 'branch_id')
     def _compute_display_name(self):
         """Genera el nombre completo para mostrar"""
@@ -249,17 +254,19 @@ class SucursalesCajasCashbox(models.Model):
     @api.depends('cashbox_line_ids')
     def _compute_counts(self):
         """Calcula contadores varios"""
-        Operation = self.env['sucursales_cajas.operation']
+        # Operaciones pendientes de todas las cajas en una sola consulta agrupada
+        pending = dict(self.env['sucursales_cajas.operation']._read_group(
+            [('cashbox_id', 'in', self.ids), ('state', '=', 'pending')],
+            ['cashbox_id'],
+            ['__count']
+        )) if self.ids else {}
         
         for cashbox in self:
             # Contar líneas
             cashbox.line_count = len(cashbox.cashbox_line_ids)
             
             # Contar operaciones pendientes
-            cashbox.pending_operations_count = Operation.search_count([
-                ('cashbox_id', '=', cashbox.id),
-                ('state', '=', 'pending')
-            ])
+            cashbox.pending_operations_count = pending.get(cashbox._origin, 0)
     
     def _compute_total_balances(self):
         """Calcula los balances totales en diferentes monedas"""
@@ -341,6 +348,10 @@ class SucursalesCajasCashbox(models.Model):
         # Por ahora no hacemos nada ya que los cálculos son en tiempo real
         return True
     
+    def _refresh_pending_count(self):
+        """Marca el contador de pendientes para recalcularlo en bloque al próximo flush"""
+        self.env.add_to_compute(self._fields['pending_operations_count'], self)
+    
     @api.constrains('allowed_user_ids', 'responsible_user_id')
     def _check_responsible_in_allowed_users(self):
         """Verifica que el responsable esté en los usuarios permitidos"""
@@ -350,22 +361,6 @@ class SucursalesCajasCashbox(models.Model):
                     _('El responsable debe estar incluido en los usuarios permitidos de la caja.')
                 )
     
-    @api.constrains('branch_id', 'name')
-    def _check_unique_name_per_branch(self):
-        """Verifica que no haya nombres duplicados en la misma sucursal"""
-        for cashbox in self:
-            duplicate = self.search([
-                ('branch_id', '=', cashbox.branch_id.id),
-                ('name', '=', cashbox.name),
-                ('id', '!=', cashbox.id)
-            ], limit=1)
-            
-            if duplicate:
-                raise ValidationError(
-                    _('Ya existe una caja con el nombre "%s" en la sucursal "%s".')
-                    % (cashbox.name, cashbox.branch_id.name)
-                )
-    
     @api.model_create_multi
     def create(self, vals_list):
         """Override create para configuración inicial"""
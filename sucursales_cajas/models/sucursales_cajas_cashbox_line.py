@@ -88,6 +88,12 @@ class SucursalesCajasCashboxLine(models.Model):
         default=0.0
     )
     
+    available_balance = fields.Float(
+        string='Saldo Disponible',
+        compute='_compute_available_balance',
+        help="Saldo actual menos lo enviado en transferencias aún no liquidadas"
+    )
+    
     # Balance en sesión
     session_opening_balance = fields.Float(
         string='Saldo Apertura Sesión',
@@ -145,6 +151,14 @@ class SucursalesCajasCashboxLine(models.Model):
         store=True
     )
     
+    # Para efectivo no puede haber dos subcajas del mismo tipo en la caja
+    _sql_constraints = [
+        ('cash_line_type_unique',
+         'EXCLUDE USING btree (cashbox_id WITH =, line_type WITH =) WHERE (is_cash)',
+         'Ya existe una subcaja de ese tipo de efectivo en esta caja. '
+         'Solo puede haber una subcaja de cada tipo de efectivo.'),
+    ]
+    
     @api.depends('line_type')
     def _compute_name(self):
         """Genera nombre basado en el tipo"""
@@ -205,6 +219,13 @@ class SucursalesCajasCashboxLine(models.Model):
         for line in self:
             line.account_count = len(line.account_ids)
     
+    @api.depends('current_balance')
+    def _compute_available_balance(self):
+        """Descuenta del saldo actual el efectivo comprometido en transferencias abiertas"""
+        committed = self.env['sucursales_cajas.transfer']._get_committed_amounts(self._origin)
+        for line in self:
+            line.available_balance = line.current_balance - committed.get(line._origin.id, 0.0)
+    
     def _compute_session_balances(self):
         """Calcula saldos relacionados con la sesión actual"""
         for line in self:
@@ -230,25 +251,6 @@ class SucursalesCajasCashboxLine(models.Model):
                 line.session_opening_balance = 0.0
                 line.session_current_balance = 0.0
     
-    @api.constrains('line_type', 'cashbox_id')
-    def _check_unique_line_type(self):
-        """Verifica que no haya tipos duplicados en la misma caja para efectivo"""
-        for line in self:
-            if line.is_cash:
-                # Para efectivo, no puede haber duplicados del mismo tipo
-                duplicate = self.search([
-                    ('cashbox_id', '=', line.cashbox_id.id),
-                    ('line_type', '=', line.line_type),
-                    ('id', '!=', line.id)
-                ], limit=1)
-                
-                if duplicate:
-                    raise ValidationError(
-                        _('Ya existe una subcaja de tipo "%s" en esta caja. '
-                          'Solo puede haber una subcaja de cada tipo de efectivo.') 
-                        % line.name
-                    )
-    
     @api.constrains('current_balance', 'min_balance', 'max_balance')
     def _check_balance_limits(self):
         """Verifica que el saldo esté dentro de los límites"""
@@ -2,8 +2,22 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
+from odoo.tools import sql
 import json
 
+from .sucursales_cajas_session_total import TOTAL_FIELDS
+
+# Campos que alteran los totales por sesión y moneda
+SESSION_TOTAL_TRIGGERS = {'session_id', 'state', 'currency_type', 'operation_type', 'amount'}
+
+# Estados que se publican en el canal de la caja
+BUS_EVENTS = {
+    'pending': 'created',
+    'processing': 'started',
+    'done': 'completed',
+    'cancelled': 'cancelled',
+}
+
 
 class SucursalesCajasOperation(models.Model):
     _name = 'sucursales_cajas.operation'
@@ -133,10 +147,13 @@ class SucursalesCajasOperation(models.Model):
         ('other', 'Otro')
     ], string='Tipo de Transferencia', tracking=True)
     
-    # Datos de transferencia (JSON)
-    transfer_data = fields.Text(
-        string='Datos de Transferencia',
-        help="Información de la cuenta destino en formato JSON"
+    # Cuenta destino normalizada
+    transfer_destination_id = fields.Many2one(
+        'sucursales_cajas.transfer_destination',
+        string='Cuenta Destino',
+        index=True,
+        ondelete='restrict',
+        tracking=True
     )
     
     transfer_reference = fields.Char(
@@ -238,15 +255,154 @@ class SucursalesCajasOperation(models.Model):
     @api.model_create_multi
     def create(self, vals_list):
         """Override create para generar número"""
+        pending = [vals for vals in vals_list if vals.get('name', 'Nueva') == 'Nueva']
+        names = self.env['ir.sequence'].next_block_by_code('sucursales_cajas.operation', len(pending))
+        for vals, name in zip(pending, names):
+            vals['name'] = name or 'OP/001'
+        
         for vals in vals_list:
-            if vals.get('name', 'Nueva') == 'Nueva':
-                vals['name'] = self.env['ir.sequence'].next_by_code('sucursales_cajas.operation') or 'OP/001'
-            
             # Si viene desde partner, marcar como pendiente
             if vals.get('origin') == 'partner' and vals.get('state') == 'draft':
                 vals['state'] = 'pending'
         
-        return super(SucursalesCajasOperation, self).create(vals_list)
+        operations = super(SucursalesCajasOperation, self).create(vals_list)
+        self.env['sucursales_cajas.session_total']._apply_deltas(operations._get_session_total_deltas())
+        operations.filtered(lambda o: o.state == 'pending')._notify_cashbox({})
+        return operations
+    
+    def write(self, vals):
+        """Actualiza los totales de sesión por delta y publica en el bus los cambios de estado"""
+        update_totals = bool(SESSION_TOTAL_TRIGGERS & set(vals))
+        notify = 'state' in vals or 'cashbox_id' in vals
+        if not update_totals and not notify:
+            return super(SucursalesCajasOperation, self).write(vals)
+        
+        deltas = self._get_session_total_deltas(sign=-1) if update_totals else {}
+        previous = {operation.id: (operation.state, operation.cashbox_id) for operation in self}
+        res = super(SucursalesCajasOperation, self).write(vals)
+        
+        if update_totals:
+            self.env['sucursales_cajas.session_total']._apply_deltas(
+                self._get_session_total_deltas(deltas=deltas)
+            )
+        if notify:
+            self._notify_cashbox(previous)
+        return res
+    
+    def unlink(self):
+        """Descuenta las operaciones eliminadas de los totales de su sesión"""
+        deltas = self._get_session_total_deltas(sign=-1)
+        res = super(SucursalesCajasOperation, self).unlink()
+        self.env['sucursales_cajas.session_total']._apply_deltas(deltas)
+        return res
+    
+    def _get_session_total_deltas(self, sign=1, deltas=None):
+        """Acumula el aporte de las operaciones a los totales de sesión.
+        
+        :param sign: 1 para sumar el estado actual, -1 para descontarlo
+        :param deltas: diccionario a completar {(sesión, moneda): {campo: delta}}
+        """
+        deltas = {} if deltas is None else deltas
+        for operation in self:
+            if not operation.session_id or not operation.currency_type:
+                continue
+            row = deltas.setdefault(
+                (operation.session_id.id, operation.currency_type),
+                dict.fromkeys(TOTAL_FIELDS, 0)
+            )
+            row['operation_count'] += sign
+            if operation.state == 'pending':
+                row['pending_count'] += sign
+            elif operation.state == 'done':
+                row['done_count'] += sign
+                if operation.operation_type == 'deposit':
+                    row['deposit_count'] += sign
+                    row['total_deposits'] += sign * operation.amount
+                elif operation.operation_type == 'withdrawal':
+                    row['withdrawal_count'] += sign
+                    row['total_withdrawals'] += sign * operation.amount
+        return deltas
+    
+    def _get_bus_payload(self, previous_state):
+        """Datos mínimos de la operación para actualizar las pantallas de caja"""
+        self.ensure_one()
+        return {
+            'event': BUS_EVENTS.get(self.state, 'updated'),
+            'id': self.id,
+            'name': self.name,
+            'state': self.state,
+            'previous_state': previous_state,
+            'operation_type': self.operation_type,
+            'partner_id': [self.partner_id.id, self.partner_id.display_name],
+            'currency_type': self.currency_type,
+            'amount': self.amount,
+            'request_date': fields.Datetime.to_string(self.request_date),
+            'completion_date': fields.Datetime.to_string(self.completion_date),
+            'cashbox_id': [self.cashbox_id.id, self.cashbox_id.display_name],
+        }
+    
+    def _notify_cashbox(self, previous):
+        """Envía un evento por operación al canal de su caja.
+        
+        :param previous: {id: (estado anterior, caja anterior)} antes del cambio
+        """
+        state_changed = self.filtered(lambda o: previous.get(o.id, (False, None)) != (o.state, o.cashbox_id))
+        if not state_changed:
+            return
+        
+        # Contadores de la caja actual y de la anterior si la operación cambió de caja
+        cashboxes = state_changed.cashbox_id
+        for _state, cashbox in previous.values():
+            cashboxes |= cashbox
+        cashboxes._refresh_pending_count()
+        
+        changed = state_changed.filtered(lambda o: o.state in BUS_EVENTS)
+        notifications = []
+        for operation in changed:
+            payload = operation._get_bus_payload(previous.get(operation.id, (False,))[0])
+            payload['cashbox_pending_count'] = operation.cashbox_id.pending_operations_count
+            notifications.append((operation.cashbox_id, 'sucursales_cajas/operation', payload))
+        self.env['bus.bus']._sendmany(notifications)
+    
+    def init(self):
+        super().init()
+        cr = self.env.cr
+        # Completar los totales de las sesiones existentes: se hace desde aquí
+        # porque la tabla de operaciones se crea después que la de totales
+        self.env['sucursales_cajas.session_total']._init_totals()
+        
+        # Migrar los datos JSON de transferencias anteriores a cuentas destino
+        if not sql.column_exists(cr, self._table, 'transfer_data'):
+            return
+        cr.execute("""
+            SELECT id, partner_id, transfer_data
+            FROM sucursales_cajas_operation
+            WHERE transfer_data IS NOT NULL AND transfer_data != ''
+              AND transfer_destination_id IS NULL
+        """)
+        Destination = self.env['sucursales_cajas.transfer_destination']
+        for operation_id, partner_id, transfer_data in cr.fetchall():
+            try:
+                data = json.loads(transfer_data)
+            except ValueError:
+                continue
+            if data.get('type') not in ('bank_transfer', 'crypto', 'mercadopago') or not partner_id:
+                continue
+            destination = Destination._find_or_create(self.env['res.partner'].browse(partner_id), {
+                'transfer_type': data['type'],
+                'bank_name': data.get('bank_name'),
+                'account_number': data.get('account_number'),
+                'cbu': data.get('cbu'),
+                'alias': data.get('alias'),
+                'account_holder': data.get('account_holder'),
+                'network': data.get('network') or False,
+                'address': data.get('address'),
+            })
+            destination.flush_recordset()
+            cr.execute(
+                "UPDATE sucursales_cajas_operation SET transfer_destination_id = %s WHERE id = %s",
+                (destination.id, operation_id)
+            )
     
     @api.depends('cashbox_line_id', 'operation_type')
     def _compute_is_cash(self):
@@ -257,41 +413,14 @@ class SucursalesCajasOperation(models.Model):
             else:
                 operation.is_cash = operation.transfer_type == 'cash'
     
+    @api.depends('transfer_destination_id')
     def _compute_destination_display(self):
         """Genera texto descriptivo de la cuenta destino"""
         for operation in self:
-            if not operation.transfer_data:
-                operation.destination_account_display = ''
-                continue
-            
-            try:
-                data = json.loads(operation.transfer_data)
-                parts = []
-                
-                # Construir descripción según el tipo
-                if operation.transfer_type == 'bank_transfer':
-                    if data.get('bank_name'):
-                        parts.append(data['bank_name'])
-                    if data.get('account_number'):
-                        parts.append(f"Cuenta: {data['account_number']}")
-                    if data.get('cbu'):
-                        parts.append(f"CBU: {data['cbu']}")
-                    if data.get('alias'):
-                        parts.append(f"Alias: {data['alias']}")
-                
-                elif operation.transfer_type == 'crypto':
-                    if data.get('network'):
-                        parts.append(f"Red: {data['network']}")
-                    if data.get('address'):
-                        addr = data['address']
-                        if len(addr) > 20:
-                            addr = f"{addr[:10]}...{addr[-10:]}"
-                        parts.append(f"Dirección: {addr}")
-                
-                operation.destination_account_display = '\n'.join(parts)
-                
-            except:
-                operation.destination_account_display = 'Error al leer datos'
+            destination = operation.transfer_destination_id
+            operation.destination_account_display = '\n'.join(
+                f"{label}: {value}" for label, value in destination._get_display_lines(short=True)
+            ) if destination else ''
     
     def _compute_can_process(self):
         """Determina si la operación puede ser procesada"""
@@ -323,8 +452,8 @@ class SucursalesCajasOperation(models.Model):
                 operation.has_sufficient_balance = True
                 continue
             
-            # Verificar saldo de la línea
-            available = operation.cashbox_line_id.current_balance
+            # Verificar saldo de la línea, descontando transferencias en tránsito
+            available = operation.cashbox_line_id.available_balance
             operation.has_sufficient_balance = available >= operation.amount
     
     @api.constrains('operation_type', 'amount')
@@ -460,6 +589,11 @@ class SucursalesCajasOperation(models.Model):
             self._update_partner_wallet(self.amount)
             
         elif self.operation_type == 'withdrawal':
+            available = self.cashbox_line_id.available_balance
+            if available < self.amount:
+                raise UserError(
+                    _('Saldo insuficiente. Disponible: %s %s') % (self.currency_type, available)
+                )
             self.cashbox_line_id.current_balance -= self.amount
             # Actualizar wallet del partner
             self._update_partner_wallet(-self.amount)
@@ -482,22 +616,29 @@ class SucursalesCajasOperation(models.Model):
     def _update_partner_wallet(self, amount):
         """Actualiza el wallet del partner según la moneda"""
         self.ensure_one()
+        model, vals = self._prepare_partner_wallet_vals(amount)
+        if model:
+            self.env[model].create(vals)
+    
+    def _prepare_partner_wallet_vals(self, amount):
+        """Devuelve (modelo, valores) del movimiento de wallet según la moneda"""
+        self.ensure_one()
         
         # Determinar qué wallet actualizar
         if self.currency_type == 'ARS':
-            # Crear movimiento en wallet de chequera
-            self.env['chequera.wallet.movement'].create({
+            # Movimiento en wallet de chequera
+            return 'chequera.wallet.movement', {
                 'partner_id': self.partner_id.id,
                 'tipo': 'cashbox_operation',
                 'monto': amount,
                 'fecha': fields.Date.today(),
                 'cashbox_operation_id': self.id,
                 'notes': f'Operación de caja: {self.name}'
-            })
+            }
             
         elif self.currency_type in ['USD', 'USDT']:
-            # Crear movimiento en wallet de divisas
-            self.env['divisas.wallet.movement'].create({
+            # Movimiento en wallet de divisas
+            return 'divisas.wallet.movement', {
                 'partner_id': self.partner_id.id,
                 'operation_type': 'adjustment',
                 'currency_type': self.currency_type,
@@ -507,7 +648,119 @@ class SucursalesCajasOperation(models.Model):
                 'date': fields.Date.today(),
                 'cashbox_operation_id': self.id,
                 'notes': f'Operación de caja: {self.name}'
+            }
+        
+        return False, False
+    
+    def _get_batch_error(self, identity_verified=False):
+        """Motivo por el que la operación no puede completarse en lote, o False"""
+        self.ensure_one()
+        
+        if self.state not in ('pending', 'processing'):
+            return _('La operación no está pendiente.')
+        
+        if not self.cashbox_line_id:
+            return _('Debe seleccionar la subcaja para completar la operación.')
+        
+        if not self.is_cash and not self.account_id:
+            return _('Debe seleccionar la cuenta para operaciones no efectivo.')
+        
+        if self.is_third_party and not identity_verified and (
+                self.operation_type == 'withdrawal' or self.is_cash):
+            return _('Debe verificar la identidad del beneficiario.')
+        
+        if self.operation_type == 'withdrawal' and self.transfer_type and not self.is_cash \
+                and not self.transfer_reference:
+            return _('Debe ingresar la referencia o comprobante de la transferencia.')
+        
+        return False
+    
+    def _complete_batch(self, session, identity_verified=False):
+        """Completa varias operaciones de una misma sesión en bloque.
+        
+        Valida todas juntas con el saldo acumulado de cada subcaja, aplica un
+        único delta por subcaja, crea los movimientos de wallet con un create
+        por modelo y marca las operaciones con una sola escritura. Las que no
+        pasan la validación se devuelven con su motivo sin frenar el resto.
+        
+        :return: (operaciones completadas, {operación: mensaje de error})
+        """
+        errors = {}
+        done = self.browse()
+        signs = {'deposit': 1, 'withdrawal': -1}
+        
+        # Subcaja por defecto para operaciones en efectivo sin subcaja asignada
+        default_lines = {}
+        for line in session.cashbox_id.cashbox_line_ids.filtered(lambda l: l.active and l.is_cash):
+            key = line.currency_type
+            default_lines[key] = False if key in default_lines else line
+        to_assign = {}
+        for operation in self.filtered(lambda o: not o.cashbox_line_id and o.transfer_type in (False, 'cash')):
+            line = default_lines.get(operation.currency_type)
+            if line:
+                to_assign[line] = to_assign.get(line, self.browse()) | operation
+        for line, operations in to_assign.items():
+            operations.write({'cashbox_line_id': line.id})
+        
+        # Saldo de partida: lo enviado en transferencias abiertas no está disponible
+        running_balances = {}
+        committed = self.env['sucursales_cajas.transfer']._get_committed_amounts(self.cashbox_line_id)
+        deltas = {}
+        for operation in self.sorted('request_date'):
+            error = operation._get_batch_error(identity_verified)
+            if not error and operation.cashbox_id != session.cashbox_id:
+                error = _('La operación pertenece a otra caja.')
+            
+            line = operation.cashbox_line_id
+            sign = signs.get(operation.operation_type, 0)
+            if not error:
+                balance = running_balances.get(line.id, line.current_balance - committed.get(line.id, 0.0))
+                if sign < 0 and balance < operation.amount:
+                    error = _('Saldo insuficiente. Disponible: %s %s') % (operation.currency_type, balance)
+            
+            if error:
+                errors[operation] = error
+                continue
+            
+            running_balances[line.id] = balance + sign * operation.amount
+            deltas[line] = deltas.get(line, 0.0) + sign * operation.amount
+            done |= operation
+        
+        if not done:
+            return done, errors
+        
+        # Un único ajuste de saldo por subcaja
+        for line, delta in deltas.items():
+            if delta:
+                line.current_balance += delta
+        
+        # Movimientos de wallet: un create por modelo
+        movements = {}
+        for operation in done:
+            sign = signs.get(operation.operation_type, 0)
+            if not sign:
+                continue
+            model, vals = operation._prepare_partner_wallet_vals(sign * operation.amount)
+            if model:
+                movements.setdefault(model, []).append(vals)
+        for model, vals_list in movements.items():
+            self.env[model].create(vals_list)
+        
+        now = fields.Datetime.now()
+        done.filtered(lambda o: not o.processing_date).write({'processing_date': now})
+        done.write({
+            'state': 'done',
+            'session_id': session.id,
+            'completion_date': now,
+            'processed_by_user_id': self.env.user.id,
+        })
+        if done.account_id:
+            done.account_id.write({
+                'last_operation_date': now,
+                'last_operation_user_id': self.env.user.id,
             })
+        
+        return done, errors
     
     def action_cancel(self):
         """Cancela la operación"""
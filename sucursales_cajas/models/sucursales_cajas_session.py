@@ -114,6 +114,14 @@ class SucursalesCajasSession(models.Model):
         string='Operaciones'
     )
     
+    # Totales por moneda mantenidos por delta desde las operaciones
+    total_ids = fields.One2many(
+        'sucursales_cajas.session_total',
+        'session_id',
+        string='Totales por Moneda',
+        readonly=True
+    )
+    
     # Contadores
     operation_count = fields.Integer(
         string='Cantidad de Operaciones',
@@ -167,7 +175,8 @@ class SucursalesCajasSession(models.Model):
     # Control de cierre
     has_pending_operations = fields.Boolean(
         string='Tiene Operaciones Pendientes',
-        compute='_compute_has_pending'
+        compute='_compute_counts',
+        store=True
     )
     
     closing_notes = fields.Text(
@@ -198,13 +207,22 @@ class SucursalesCajasSession(models.Model):
         store=True
     )
     
+    # Una sola sesión abierta o en cierre por caja (restricción parcial en base)
+    _sql_constraints = [
+        ('one_open_session_per_cashbox',
+         "EXCLUDE USING btree (cashbox_id WITH =) WHERE (state IN ('open', 'closing'))",
+         'Ya existe una sesión abierta para esta caja.'),
+    ]
+    
     @api.model_create_multi
     def create(self, vals_list):
         """Override create para generar número de sesión"""
+        pending = [vals for vals in vals_list if vals.get('name', 'Nueva') == 'Nueva']
+        names = self.env['ir.sequence'].next_block_by_code('sucursales_cajas.session', len(pending))
+        for vals, name in zip(pending, names):
+            vals['name'] = name or 'SES/001'
+        
         for vals in vals_list:
-            if vals.get('name', 'Nueva') == 'Nueva':
-                vals['name'] = self.env['ir.sequence'].next_by_code('sucursales_cajas.session') or 'SES/001'
-            
             # Capturar información del contexto
             if self.env.context.get('login_ip'):
                 vals['login_ip'] = self.env.context.get('login_ip')
@@ -232,56 +250,29 @@ class SucursalesCajasSession(models.Model):
             else:
                 session.duration = 0.0
     
-    @api.depends('operation_ids', 'operation_ids.state', 'operation_ids.operation_type')
+    @api.depends('total_ids.operation_count', 'total_ids.pending_count',
+                 'total_ids.deposit_count', 'total_ids.withdrawal_count')
     def _compute_counts(self):
-        """Calcula contadores de operaciones"""
+        """Suma los contadores de las filas de totales por moneda"""
         for session in self:
-            operations = session.operation_ids
-            session.operation_count = len(operations)
-            session.pending_operation_count = len(operations.filtered(lambda o: o.state == 'pending'))
-            session.deposit_count = len(operations.filtered(
-                lambda o: o.operation_type == 'deposit' and o.state == 'done'
-            ))
-            session.withdrawal_count = len(operations.filtered(
-                lambda o: o.operation_type == 'withdrawal' and o.state == 'done'
-            ))
-    
-    @api.depends('operation_ids', 'operation_ids.amount', 'operation_ids.currency_type', 
-                 'operation_ids.operation_type', 'operation_ids.state')
+            totals = session.total_ids
+            session.operation_count = sum(totals.mapped('operation_count'))
+            session.pending_operation_count = sum(totals.mapped('pending_count'))
+            session.has_pending_operations = session.pending_operation_count > 0
+            session.deposit_count = sum(totals.mapped('deposit_count'))
+            session.withdrawal_count = sum(totals.mapped('withdrawal_count'))
+    
+    @api.depends('total_ids.currency_type', 'total_ids.total_deposits', 'total_ids.total_withdrawals')
     def _compute_totals(self):
-        """Calcula totales por moneda"""
-        for session in self:
-            # Filtrar solo operaciones completadas
-            done_operations = session.operation_ids.filtered(lambda o: o.state == 'done')
-            
-            # Depósitos
-            deposits_ars = done_operations.filtered(
-                lambda o: o.operation_type == 'deposit' and o.currency_type == 'ARS'
-            )
-            deposits_usd = done_operations.filtered(
-                lambda o: o.operation_type == 'deposit' and o.currency_type == 'USD'
-            )
-            
-            # Retiros
-            withdrawals_ars = done_operations.filtered(
-                lambda o: o.operation_type == 'withdrawal' and o.currency_type == 'ARS'
-            )
-            withdrawals_usd = done_operations.filtered(
-                lambda o: o.operation_type == 'withdrawal' and o.currency_type == 'USD'
-            )
-            
-            # Sumar
-            session.total_deposits_ars = sum(deposits_ars.mapped('amount'))
-            session.total_deposits_usd = sum(deposits_usd.mapped('amount'))
-            session.total_withdrawals_ars = sum(withdrawals_ars.mapped('amount'))
-            session.total_withdrawals_usd = sum(withdrawals_usd.mapped('amount'))
-    
-    def _compute_has_pending(self):
-        """Verifica si hay operaciones pendientes"""
+        """Expone los totales de ARS y USD desde las filas por moneda"""
         for session in self:
-            session.has_pending_operations = any(
-                op.state == 'pending' for op in session.operation_ids
-            )
+            by_currency = {total.currency_type: total for total in session.total_ids}
+            ars = by_currency.get('ARS')
+            usd = by_currency.get('USD')
+            session.total_deposits_ars = ars.total_deposits if ars else 0.0
+            session.total_withdrawals_ars = ars.total_withdrawals if ars else 0.0
+            session.total_deposits_usd = usd.total_deposits if usd else 0.0
+            session.total_withdrawals_usd = usd.total_withdrawals if usd else 0.0
     
     @api.depends('closing_balance_ids', 'closing_balance_ids.difference')
     def _compute_has_discrepancies(self):
@@ -407,6 +398,68 @@ class SucursalesCajasSession(models.Model):
                 'type': 'success',
             }
         }
+
+    def _create_closing_balances(self, balance_lines):
+        """Crea o actualiza los balances de cierre en lote y los confirma juntos.
+        
+        ``balance_lines`` son diccionarios con los valores del balance y, si ya
+        existe, su ``balance_id``.
+        """
+        self.ensure_one()
+        Balance = self.env['sucursales_cajas.balance']
+        
+        # Los balances ya creados por un intento anterior se actualizan, no se duplican
+        existing = {balance.cashbox_line_id.id: balance for balance in self.closing_balance_ids}
+        
+        balances = Balance
+        vals_list = []
+        for line in balance_lines:
+            vals = dict(line)
+            balance = Balance.browse(vals.pop('balance_id', False)).exists()
+            balance = balance or existing.get(vals.get('cashbox_line_id'), Balance)
+            if balance:
+                # Actualizar balance existente
+                balance.write({
+                    key: vals[key] for key in ('declared_amount', 'counted_amount', 'notes')
+                })
+                balances |= balance
+            else:
+                vals.update({
+                    'session_id': self.id,
+                    'balance_type': 'closing',
+                })
+                vals_list.append(vals)
+        
+        if vals_list:
+            balances |= Balance.create(vals_list)
+        
+        # Confirmar todos los balances pendientes
+        balances.filtered(lambda b: b.state == 'draft').action_confirm()
+    
+    def _close_with_balances(self, balance_lines, closing_notes=False, print_report=False):
+        """Cierre completo preparado por el wizard; se ejecuta como tarea en segundo plano"""
+        self.ensure_one()
+        Job = self.env['chequera.job']
+        
+        # Un reintento después de un cierre ya confirmado no hace nada
+        if self.state == 'closed':
+            return True
+        
+        # Crear/actualizar balances de cierre
+        Job._report_progress(20, _('Registrando balances de cierre'))
+        self._create_closing_balances(balance_lines)
+        
+        self.closing_notes = closing_notes
+        result = self.action_close_session()
+        
+        # Generar el reporte de cierre como otra tarea
+        if print_report:
+            Job._enqueue(
+                self.env['ir.actions.report']._get_report('sucursales_cajas.action_report_session_closing'),
+                '_chequera_render_attachment', args=[self.ids],
+                name=_('Reporte de cierre %s') % self.name,
+            )
+        return result
     
     def action_cancel_session(self):
         """Cancela la sesión (solo si no hay operaciones)"""
@@ -456,10 +509,11 @@ class SucursalesCajasSession(models.Model):
         raise UserError(_('Función en desarrollo.'))
     
     def action_print_session_report(self):
-        """Imprime reporte de sesión"""
+        """Genera el reporte de cierre de la sesión en segundo plano"""
         self.ensure_one()
-        # TODO: Implementar reporte
-        raise UserError(_('Función en desarrollo.'))
+        return self.env['chequera.job']._enqueue_report(
+            'sucursales_cajas.action_report_session_closing', self
+        )
     
     @api.constrains('cashbox_id', 'user_id')
     def _check_user_allowed(self):
@@ -471,23 +525,6 @@ class SucursalesCajasSession(models.Model):
                     % (session.user_id.name, session.cashbox_id.display_name)
                 )
     
-    @api.constrains('cashbox_id', 'state')
-    def _check_one_open_session(self):
-        """Verifica que solo haya una sesión abierta por caja"""
-        for session in self:
-            if session.state in ['open', 'closing']:
-                other_sessions = self.search([
-                    ('cashbox_id', '=', session.cashbox_id.id),
-                    ('state', 'in', ['open', 'closing']),
-                    ('id', '!=', session.id)
-                ])
-                
-                if other_sessions:
-                    raise ValidationError(
-                        _('Ya existe una sesión abierta para la caja %s.')
-                        % session.cashbox_id.display_name
-                    )
-    
     def unlink(self):
         """Validaciones antes de eliminar"""
         for session in self:
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from odoo.tools import sql
+
+# Contadores y montos acumulados por sesión y moneda
+TOTAL_FIELDS = (
+    'operation_count',
+    'pending_count',
+    'done_count',
+    'deposit_count',
+    'withdrawal_count',
+    'total_deposits',
+    'total_withdrawals',
+)
+
+
+class SucursalesCajasSessionTotal(models.Model):
+    _name = 'sucursales_cajas.session_total'
+    _description = 'Totales de Sesión por Moneda'
+    _order = 'session_id, currency_type'
+    _rec_name = 'currency_type'
+
+    session_id = fields.Many2one(
+        'sucursales_cajas.session',
+        string='Sesión',
+        required=True,
+        readonly=True,
+        index=True,
+        ondelete='cascade'
+    )
+
+    currency_type = fields.Selection(
+        selection=lambda self: self.env['sucursales_cajas.operation']._fields['currency_type'].selection,
+        string='Moneda',
+        required=True,
+        readonly=True
+    )
+
+    # Campos relacionados para listas y reportes
+    cashbox_id = fields.Many2one(
+        related='session_id.cashbox_id',
+        string='Caja',
+        store=True
+    )
+
+    branch_id = fields.Many2one(
+        related='session_id.branch_id',
+        string='Sucursal',
+        store=True
+    )
+
+    # Contadores
+    operation_count = fields.Integer(string='Operaciones', readonly=True)
+    pending_count = fields.Integer(string='Pendientes', readonly=True)
+    done_count = fields.Integer(string='Completadas', readonly=True)
+    deposit_count = fields.Integer(string='Depósitos', readonly=True)
+    withdrawal_count = fields.Integer(string='Retiros', readonly=True)
+
+    # Montos de operaciones completadas
+    total_deposits = fields.Float(string='Total Depósitos', readonly=True)
+    total_withdrawals = fields.Float(string='Total Retiros', readonly=True)
+
+    net_amount = fields.Float(
+        string='Neto',
+        compute='_compute_net_amount',
+        store=True
+    )
+
+    _sql_constraints = [
+        ('session_currency_uniq', 'unique(session_id, currency_type)',
+         'Ya existen totales para esta moneda en la sesión.'),
+    ]
+
+    @api.depends('total_deposits', 'total_withdrawals')
+    def _compute_net_amount(self):
+        for total in self:
+            total.net_amount = total.total_deposits - total.total_withdrawals
+
+    @api.model
+    def _apply_deltas(self, deltas):
+        """Suma los deltas {(sesión, moneda): {campo: delta}} a las filas existentes o las crea"""
+        deltas = {
+            key: values for key, values in deltas.items()
+            if any(values.values())
+        }
+        if not deltas:
+            return
+
+        session_ids = {session_id for session_id, _currency in deltas}
+        existing = {
+            (total.session_id.id, total.currency_type): total
+            for total in self.sudo().search([('session_id', 'in', list(session_ids))])
+        }
+
+        vals_list = []
+        for (session_id, currency), values in deltas.items():
+            total = existing.get((session_id, currency))
+            if total:
+                total.write({
+                    field: total[field] + delta
+                    for field, delta in values.items() if delta
+                })
+            else:
+                vals_list.append(dict(values, session_id=session_id, currency_type=currency))
+        if vals_list:
+            self.sudo().create(vals_list)
+
+    @api.model
+    def _rebuild(self):
+        """Recalcula todas las filas desde las operaciones con una consulta agrupada"""
+        self.env['sucursales_cajas.operation'].flush_model(
+            ['session_id', 'currency_type', 'operation_type', 'state', 'amount']
+        )
+        self.env.cr.execute("DELETE FROM sucursales_cajas_session_total")
+        self.env.cr.execute("""
+            INSERT INTO sucursales_cajas_session_total (
+                session_id, currency_type, cashbox_id, branch_id,
+                operation_count, pending_count, done_count, deposit_count, withdrawal_count,
+                total_deposits, total_withdrawals, net_amount
+            )
+            SELECT o.session_id, o.currency_type, s.cashbox_id, s.branch_id,
+                   COUNT(*),
+                   COUNT(*) FILTER (WHERE o.state = 'pending'),
+                   COUNT(*) FILTER (WHERE o.state = 'done'),
+                   COUNT(*) FILTER (WHERE o.state = 'done' AND o.operation_type = 'deposit'),
+                   COUNT(*) FILTER (WHERE o.state = 'done' AND o.operation_type = 'withdrawal'),
+                   COALESCE(SUM(o.amount) FILTER (WHERE o.state = 'done' AND o.operation_type = 'deposit'), 0),
+                   COALESCE(SUM(o.amount) FILTER (WHERE o.state = 'done' AND o.operation_type = 'withdrawal'), 0),
+                   COALESCE(SUM(o.amount) FILTER (WHERE o.state = 'done' AND o.operation_type = 'deposit'), 0)
+                   - COALESCE(SUM(o.amount) FILTER (WHERE o.state = 'done' AND o.operation_type = 'withdrawal'), 0)
+            FROM sucursales_cajas_operation o
+            JOIN sucursales_cajas_session s ON s.id = o.session_id
+            WHERE o.currency_type IS NOT NULL
+            GROUP BY o.session_id, o.currency_type, s.cashbox_id, s.branch_id
+        """)
+        self.invalidate_model()
+
+    @api.model
+    def _init_totals(self):
+        """Completa los totales de las sesiones existentes si la tabla está vacía.
+
+        Lo llama el init() de las operaciones, cuando su tabla ya existe.
+        """
+        cr = self.env.cr
+        if not sql.table_exists(cr, 'sucursales_cajas_operation'):
+            return
+        cr.execute("SELECT 1 FROM sucursales_cajas_session_total LIMIT 1")
+        if not cr.fetchone():
+            self._rebuild()
@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError, ValidationError
+
+# Transferencias que todavía comprometen saldo de la subcaja origen
+OPEN_TRANSFER_STATES = ('in_transit', 'received')
+
+
+class SucursalesCajasTransfer(models.Model):
+    """Traslado de efectivo entre dos subcajas.
+
+    El envío solo reserva saldo en la subcaja origen; los saldos se mueven al
+    liquidar, que agrupa todas las transferencias recibidas entre el mismo par
+    de subcajas en un único neto.
+    """
+    _name = 'sucursales_cajas.transfer'
+    _description = 'Transferencia entre Subcajas'
+    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _order = 'create_date desc, id desc'
+    _rec_name = 'name'
+
+    name = fields.Char(
+        string='Número',
+        required=True,
+        readonly=True,
+        default='Nueva',
+        copy=False
+    )
+
+    # Tramos
+    source_line_id = fields.Many2one(
+        'sucursales_cajas.cashbox_line',
+        string='Subcaja Origen',
+        required=True,
+        index=True,
+        ondelete='restrict',
+        tracking=True
+    )
+
+    dest_line_id = fields.Many2one(
+        'sucursales_cajas.cashbox_line',
+        string='Subcaja Destino',
+        required=True,
+        index=True,
+        ondelete='restrict',
+        tracking=True
+    )
+
+    source_cashbox_id = fields.Many2one(
+        related='source_line_id.cashbox_id',
+        string='Caja Origen',
+        store=True
+    )
+
+    dest_cashbox_id = fields.Many2one(
+        related='dest_line_id.cashbox_id',
+        string='Caja Destino',
+        store=True
+    )
+
+    source_branch_id = fields.Many2one(
+        related='source_line_id.branch_id',
+        string='Sucursal Origen',
+        store=True
+    )
+
+    dest_branch_id = fields.Many2one(
+        related='dest_line_id.branch_id',
+        string='Sucursal Destino',
+        store=True
+    )
+
+    currency_type = fields.Selection(
+        related='source_line_id.currency_type',
+        string='Moneda',
+        store=True
+    )
+
+    amount = fields.Float(
+        string='Monto',
+        required=True,
+        tracking=True
+    )
+
+    # Estado
+    state = fields.Selection([
+        ('draft', 'Borrador'),
+        ('in_transit', 'En Tránsito'),
+        ('received', 'Recibida'),
+        ('settled', 'Liquidada'),
+        ('cancelled', 'Cancelada')
+    ], string='Estado', default='draft', required=True, index=True, tracking=True)
+
+    # Trazabilidad
+    sent_date = fields.Datetime(string='Fecha de Envío', readonly=True)
+    sent_user_id = fields.Many2one('res.users', string='Enviada por', readonly=True)
+    received_date = fields.Datetime(string='Fecha de Recepción', readonly=True)
+    received_user_id = fields.Many2one('res.users', string='Recibida por', readonly=True)
+
+    settlement_id = fields.Many2one(
+        'sucursales_cajas.transfer_settlement',
+        string='Liquidación',
+        readonly=True,
+        index=True,
+        copy=False
+    )
+
+    notes = fields.Text(string='Observaciones')
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Empresa',
+        default=lambda self: self.env.company
+    )
+
+    _sql_constraints = [
+        ('amount_positive', 'CHECK(amount > 0)', 'El monto de la transferencia debe ser mayor a cero.'),
+        ('distinct_lines', 'CHECK(source_line_id != dest_line_id)',
+         'La subcaja origen y destino deben ser distintas.'),
+    ]
+
+    @api.constrains('source_line_id', 'dest_line_id')
+    def _check_currency(self):
+        """Ambos tramos deben estar en la misma moneda"""
+        for transfer in self:
+            if transfer.source_line_id.currency_type != transfer.dest_line_id.currency_type:
+                raise ValidationError(
+                    _('La subcaja origen y destino deben tener la misma moneda.')
+                )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create para generar número"""
+        pending = [vals for vals in vals_list if vals.get('name', 'Nueva') == 'Nueva']
+        names = self.env['ir.sequence'].next_block_by_code('sucursales_cajas.transfer', len(pending))
+        for vals, name in zip(pending, names):
+            vals['name'] = name or 'TRF/001'
+        return super(SucursalesCajasTransfer, self).create(vals_list)
+
+    def unlink(self):
+        if any(transfer.state not in ('draft', 'cancelled') for transfer in self):
+            raise UserError(_('Solo se pueden eliminar transferencias en borrador o canceladas.'))
+        return super(SucursalesCajasTransfer, self).unlink()
+
+    @api.model
+    def _get_committed_amounts(self, lines):
+        """Monto enviado y aún no liquidado por subcaja origen {línea_id: monto}"""
+        groups = self._read_group(
+            [('source_line_id', 'in', lines.ids), ('state', 'in', OPEN_TRANSFER_STATES)],
+            ['source_line_id'],
+            ['amount:sum'],
+        )
+        return {line.id: amount for line, amount in groups}
+
+    @api.model
+    def _get_unsettled_deltas(self, lines):
+        """Efectivo movido físicamente y aún no reflejado en ``current_balance`` {línea_id: neto}.
+
+        Lo enviado sale del cajón al despachar y lo recibido entra al
+        confirmar la recepción, aunque el saldo recién se mueva al liquidar.
+        """
+        deltas = {}
+        outgoing = self._read_group(
+            [('source_line_id', 'in', lines.ids), ('state', 'in', OPEN_TRANSFER_STATES)],
+            ['source_line_id'],
+            ['amount:sum'],
+        )
+        for line, amount in outgoing:
+            deltas[line.id] = deltas.get(line.id, 0.0) - amount
+        incoming = self._read_group(
+            [('dest_line_id', 'in', lines.ids), ('state', '=', 'received')],
+            ['dest_line_id'],
+            ['amount:sum'],
+        )
+        for line, amount in incoming:
+            deltas[line.id] = deltas.get(line.id, 0.0) + amount
+        return deltas
+
+    @api.model
+    def _get_session_deltas(self, lines, since):
+        """Neto de efectivo enviado y recibido por subcaja desde ``since`` {línea_id: neto}"""
+        deltas = {}
+        sent = self._read_group(
+            [('source_line_id', 'in', lines.ids),
+             ('state', 'in', OPEN_TRANSFER_STATES + ('settled',)),
+             ('sent_date', '>=', since)],
+            ['source_line_id'],
+            ['amount:sum'],
+        )
+        for line, amount in sent:
+            deltas[line.id] = deltas.get(line.id, 0.0) - amount
+        received = self._read_group(
+            [('dest_line_id', 'in', lines.ids),
+             ('state', 'in', ('received', 'settled')),
+             ('received_date', '>=', since)],
+            ['dest_line_id'],
+            ['amount:sum'],
+        )
+        for line, amount in received:
+            deltas[line.id] = deltas.get(line.id, 0.0) + amount
+        return deltas
+
+    def action_send(self):
+        """Despacha el efectivo: reserva el saldo de la subcaja origen"""
+        if any(transfer.state != 'draft' for transfer in self):
+            raise UserError(_('Solo se pueden enviar transferencias en borrador.'))
+
+        for transfer in self:
+            if self.env.user not in transfer.source_cashbox_id.allowed_user_ids:
+                raise UserError(
+                    _('No tiene permisos para enviar desde la caja %s.') % transfer.source_cashbox_id.display_name
+                )
+
+        # Saldo disponible = saldo actual menos lo ya comprometido en tránsito
+        committed = self._get_committed_amounts(self.source_line_id)
+        for transfer in self:
+            line = transfer.source_line_id
+            available = line.current_balance - committed.get(line.id, 0.0)
+            if available < transfer.amount:
+                raise UserError(
+                    _('Saldo insuficiente en %s. Disponible: %s %.2f')
+                    % (line.display_name, transfer.currency_type, available)
+                )
+            committed[line.id] = committed.get(line.id, 0.0) + transfer.amount
+
+        self.write({
+            'state': 'in_transit',
+            'sent_date': fields.Datetime.now(),
+            'sent_user_id': self.env.user.id,
+        })
+        return True
+
+    def action_receive(self):
+        """Confirma la recepción en destino; queda pendiente de liquidación"""
+        if any(transfer.state != 'in_transit' for transfer in self):
+            raise UserError(_('Solo se pueden recibir transferencias en tránsito.'))
+
+        for transfer in self:
+            if self.env.user not in transfer.dest_cashbox_id.allowed_user_ids:
+                raise UserError(
+                    _('No tiene permisos para recibir en la caja %s.') % transfer.dest_cashbox_id.display_name
+                )
+
+        self.write({
+            'state': 'received',
+            'received_date': fields.Datetime.now(),
+            'received_user_id': self.env.user.id,
+        })
+        return True
+
+    def action_cancel(self):
+        """Cancela la transferencia y libera el saldo reservado"""
+        if any(transfer.state not in ('draft', 'in_transit') for transfer in self):
+            raise UserError(_('Solo se pueden cancelar transferencias en borrador o en tránsito.'))
+        self.write({'state': 'cancelled'})
+        return True
+
+    def action_settle(self):
+        """Liquida ahora las transferencias recibidas seleccionadas"""
+        transfers = self.filtered(lambda t: t.state == 'received')
+        if not transfers:
+            raise UserError(_('No hay transferencias recibidas para liquidar.'))
+        settlements = self.env['sucursales_cajas.transfer_settlement']._settle(transfers)
+        return {
+            'name': _('Liquidaciones'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'sucursales_cajas.transfer_settlement',
+            'view_mode': 'tree,form',
+            'domain': [('id', 'in', settlements.ids)],
+        }
+
+
+class SucursalesCajasTransferSettlement(models.Model):
+    """Neto de las transferencias recibidas entre un par de subcajas.
+
+    Cada liquidación mueve el saldo una sola vez por tramo, sin importar
+    cuántas transferencias agrupe.
+    """
+    _name = 'sucursales_cajas.transfer_settlement'
+    _description = 'Liquidación de Transferencias'
+    _order = 'date desc, id desc'
+
+    date = fields.Datetime(
+        string='Fecha',
+        required=True,
+        readonly=True,
+        default=fields.Datetime.now
+    )
+
+    source_line_id = fields.Many2one(
+        'sucursales_cajas.cashbox_line',
+        string='Subcaja Origen',
+        required=True,
+        readonly=True,
+        ondelete='restrict'
+    )
+
+    dest_line_id = fields.Many2one(
+        'sucursales_cajas.cashbox_line',
+        string='Subcaja Destino',
+        required=True,
+        readonly=True,
+        ondelete='restrict'
+    )
+
+    currency_type = fields.Selection(
+        related='source_line_id.currency_type',
+        string='Moneda',
+        store=True
+    )
+
+    amount = fields.Float(
+        string='Neto Liquidado',
+        readonly=True,
+        help="Monto neto movido de la subcaja origen a la destino"
+    )
+
+    gross_amount = fields.Float(
+        string='Bruto',
+        readonly=True,
+        help="Suma de las transferencias agrupadas en ambos sentidos"
+    )
+
+    transfer_ids = fields.One2many(
+        'sucursales_cajas.transfer',
+        'settlement_id',
+        string='Transferencias'
+    )
+
+    transfer_count = fields.Integer(
+        string='Transferencias',
+        readonly=True
+    )
+
+    @api.model
+    def _settle(self, transfers):
+        """Agrupa las transferencias recibidas por par de subcajas y aplica un neto por par.
+
+        Todos los tramos se aplican en la misma transacción con una única
+        escritura de saldo por subcaja.
+        """
+        transfers = transfers.filtered(lambda t: t.state == 'received')
+        if not transfers:
+            return self
+
+        # Bloquear las subcajas involucradas para serializar con otras liquidaciones
+        lines = transfers.source_line_id | transfers.dest_line_id
+        self.env.cr.execute(
+            "SELECT id FROM sucursales_cajas_cashbox_line WHERE id IN %s ORDER BY id FOR UPDATE",
+            [tuple(lines.ids)]
+        )
+
+        # Par normalizado (menor id, mayor id) -> neto en sentido menor -> mayor
+        pairs = {}
+        for transfer in transfers:
+            source, dest = transfer.source_line_id, transfer.dest_line_id
+            key = tuple(sorted((source.id, dest.id)))
+            pair = pairs.setdefault(key, {'net': 0.0, 'gross': 0.0, 'transfers': self.env['sucursales_cajas.transfer']})
+            pair['net'] += transfer.amount if source.id == key[0] else -transfer.amount
+            pair['gross'] += transfer.amount
+            pair['transfers'] |= transfer
+
+        vals_list = []
+        deltas = {}
+        for (first_id, second_id), pair in pairs.items():
+            source_id, dest_id = (first_id, second_id) if pair['net'] >= 0 else (second_id, first_id)
+            net = abs(pair['net'])
+            vals_list.append({
+                'source_line_id': source_id,
+                'dest_line_id': dest_id,
+                'amount': net,
+                'gross_amount': pair['gross'],
+                'transfer_count': len(pair['transfers']),
+            })
+            if net:
+                deltas[source_id] = deltas.get(source_id, 0.0) - net
+                deltas[dest_id] = deltas.get(dest_id, 0.0) + net
+
+        settlements = self.create(vals_list)
+
+        # Un único movimiento de saldo por subcaja
+        for line in lines.sudo().filtered(lambda l: deltas.get(l.id)):
+            line.current_balance += deltas[line.id]
+
+        for settlement, pair in zip(settlements, pairs.values()):
+            pair['transfers'].write({
+                'state': 'settled',
+                'settlement_id': settlement.id,
+            })
+        return settlements
+
+    @api.model
+    def _cron_settle_transfers(self):
+        """Liquidación nocturna de todas las transferencias recibidas"""
+        transfers = self.env['sucursales_cajas.transfer'].search([('state', '=', 'received')])
+        return self._settle(transfers)
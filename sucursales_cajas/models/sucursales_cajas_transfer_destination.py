@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+
+from odoo import models, fields, api, _
+
+# Campos que identifican una cuenta destino
+DESTINATION_KEY_FIELDS = ('transfer_type', 'bank_name', 'account_number', 'cbu', 'alias', 'network', 'address')
+
+
+def _normalize(value):
+    return (value or '').strip()
+
+
+class SucursalesCajasTransferDestination(models.Model):
+    """Cuenta destino de una transferencia (banco, wallet crypto o Mercado Pago).
+
+    Se guarda una única vez por cliente: las operaciones la referencian y las
+    consultas por CBU, alias o dirección usan índices en lugar de leer texto.
+    """
+    _name = 'sucursales_cajas.transfer_destination'
+    _description = 'Cuenta Destino de Transferencia'
+    _order = 'last_used_date desc, id desc'
+    _rec_name = 'name'
+
+    name = fields.Char(
+        string='Cuenta Destino',
+        compute='_compute_name',
+        store=True
+    )
+
+    partner_id = fields.Many2one(
+        'res.partner',
+        string='Cliente/Contacto',
+        required=True,
+        index=True,
+        ondelete='cascade'
+    )
+
+    transfer_type = fields.Selection([
+        ('bank_transfer', 'Transferencia Bancaria'),
+        ('crypto', 'Criptomoneda'),
+        ('mercadopago', 'Mercado Pago')
+    ], string='Tipo', required=True)
+
+    # Banco / Mercado Pago
+    bank_name = fields.Char(string='Banco')
+    account_number = fields.Char(string='Número de Cuenta')
+    cbu = fields.Char(string='CBU', index=True)
+    alias = fields.Char(string='Alias', index=True)
+    account_holder = fields.Char(string='Titular de la Cuenta')
+
+    # Crypto
+    network = fields.Selection([
+        ('trc20', 'TRC-20 (Tron)'),
+        ('erc20', 'ERC-20 (Ethereum)'),
+        ('bep20', 'BEP-20 (BSC)'),
+        ('polygon', 'Polygon'),
+        ('other', 'Otra')
+    ], string='Red')
+
+    address = fields.Char(string='Dirección de Wallet', index=True)
+
+    dedup_key = fields.Char(
+        string='Clave de duplicado',
+        compute='_compute_dedup_key',
+        store=True,
+        copy=False
+    )
+
+    operation_ids = fields.One2many(
+        'sucursales_cajas.operation',
+        'transfer_destination_id',
+        string='Operaciones'
+    )
+
+    last_used_date = fields.Datetime(
+        string='Último Uso',
+        readonly=True
+    )
+
+    active = fields.Boolean(
+        string='Activo',
+        default=True
+    )
+
+    _sql_constraints = [
+        ('dedup_key_unique', 'UNIQUE(dedup_key)', 'Esta cuenta destino ya está registrada para el cliente.'),
+    ]
+
+    @api.depends('transfer_type', 'bank_name', 'cbu', 'alias', 'account_number', 'network', 'address')
+    def _compute_name(self):
+        for destination in self:
+            destination.name = ' - '.join(
+                value for _label, value in destination._get_display_lines(short=True)
+            ) or _('Cuenta destino')
+
+    @api.depends('partner_id', *DESTINATION_KEY_FIELDS)
+    def _compute_dedup_key(self):
+        for destination in self:
+            destination.dedup_key = self._make_dedup_key(
+                destination.partner_id.id,
+                {field: destination[field] for field in DESTINATION_KEY_FIELDS},
+            )
+
+    @api.model
+    def _normalize_vals(self, vals):
+        """Limpia los identificadores: sin blancos, CBU sin espacios ni guiones y alias en minúsculas"""
+        vals = dict(vals)
+        for field in ('bank_name', 'account_number', 'account_holder', 'address'):
+            if field in vals:
+                vals[field] = _normalize(vals[field]) or False
+        if 'cbu' in vals:
+            vals['cbu'] = _normalize(vals['cbu']).replace(' ', '').replace('-', '') or False
+        if 'alias' in vals:
+            vals['alias'] = _normalize(vals['alias']).lower() or False
+        return vals
+
+    @api.model
+    def _make_dedup_key(self, partner_id, vals):
+        payload = '|'.join([str(partner_id or '')] + [
+            str(vals.get(field) or '').lower() for field in DESTINATION_KEY_FIELDS
+        ])
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    @api.model
+    def _find_or_create(self, partner, vals):
+        """Devuelve la cuenta destino del cliente con esos datos, creándola si no existe"""
+        vals = self._normalize_vals(vals)
+        key = self._make_dedup_key(partner.id, vals)
+        destination = self.with_context(active_test=False).search([('dedup_key', '=', key)], limit=1)
+        if destination:
+            destination.write({
+                'active': True,
+                'account_holder': vals.get('account_holder') or destination.account_holder,
+                'last_used_date': fields.Datetime.now(),
+            })
+            return destination
+        return self.create(dict(vals, partner_id=partner.id, last_used_date=fields.Datetime.now()))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        return super().create([self._normalize_vals(vals) for vals in vals_list])
+
+    def write(self, vals):
+        return super().write(self._normalize_vals(vals))
+
+    def _get_display_lines(self, short=False):
+        """Lista de (etiqueta, valor) para mostrar la cuenta; ``short`` abrevia la dirección crypto"""
+        self.ensure_one()
+        lines = []
+        if self.transfer_type == 'bank_transfer':
+            if self.bank_name:
+                lines.append((_('Banco'), self.bank_name))
+            if self.account_holder and not short:
+                lines.append((_('Titular'), self.account_holder))
+            if self.account_number:
+                lines.append((_('Cuenta'), self.account_number))
+            if self.cbu:
+                lines.append((_('CBU'), self.cbu))
+            if self.alias:
+                lines.append((_('Alias'), self.alias))
+        elif self.transfer_type == 'crypto':
+            if self.network:
+                lines.append((_('Red'), dict(self._fields['network'].selection).get(self.network)))
+            if self.address:
+                address = self.address
+                if short and len(address) > 20:
+                    address = f"{address[:10]}...{address[-10:]}"
+                lines.append((_('Dirección'), address))
+        elif self.transfer_type == 'mercadopago':
+            if self.alias:
+                lines.append((_('Alias'), self.alias))
+        return lines
+
+    def action_view_operations(self):
+        self.ensure_one()
+        return {
+            'name': _('Operaciones a %s') % self.display_name,
+            'type': 'ir.actions.act_window',
+            'res_model': 'sucursales_cajas.operation',
+            'view_mode': 'tree,form',
+            'domain': [('transfer_destination_id', '=', self.id)],
+        }
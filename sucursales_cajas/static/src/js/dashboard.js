@@ -13,6 +13,7 @@ class SucursalesCajasDashboard extends Component {
         this.orm = useService("orm");
         this.action = useService("action");
         this.notification = useService("notification");
+        this.busService = useService("bus_service");
         
         this.state = useState({
             loading: true,
@@ -31,16 +32,16 @@ class SucursalesCajasDashboard extends Component {
             lastUpdate: new Date()
         });
 
-        // Auto-refresh interval (30 seconds)
-        this.refreshInterval = null;
+        // Updates arrive through the cashbox bus channels instead of polling
+        this.onOperationEvent = this.onOperationEvent.bind(this);
         
         onMounted(() => {
             this.loadDashboardData();
-            this.startAutoRefresh();
+            this.busService.subscribe("sucursales_cajas/operation", this.onOperationEvent);
         });
         
         onWillUnmount(() => {
-            this.stopAutoRefresh();
+            this.busService.unsubscribe("sucursales_cajas/operation", this.onOperationEvent);
         });
     }
 
@@ -161,22 +162,62 @@ class SucursalesCajasDashboard extends Component {
     }
 
     /**
-     * Start auto-refresh timer
+     * Apply a pending-operation event published on a cashbox channel
      */
-    startAutoRefresh() {
-        this.refreshInterval = setInterval(() => {
-            this.loadDashboardData();
-        }, 30000); // 30 seconds
+    onOperationEvent(payload) {
+        const stats = this.state.stats;
+        const wasPending = payload.previous_state === "pending";
+        const isPending = payload.state === "pending";
+        
+        // New operation of the day
+        if (!payload.previous_state) {
+            stats.totalOperations += 1;
+            if (payload.operation_type === "deposit") {
+                stats.deposits += 1;
+            } else if (payload.operation_type === "withdrawal") {
+                stats.withdrawals += 1;
+            }
+        }
+        if (isPending && !wasPending) {
+            stats.pending += 1;
+        } else if (wasPending && !isPending) {
+            stats.pending = Math.max(stats.pending - 1, 0);
+        }
+        
+        // Pending operations list (oldest first, 10 rows)
+        const pending = this.state.pendingOperations.filter(op => op.id !== payload.id);
+        if (isPending) {
+            pending.push(this._operationFromPayload(payload));
+            pending.sort((a, b) => (a.request_date || "").localeCompare(b.request_date || ""));
+        }
+        this.state.pendingOperations = pending.slice(0, 10);
+        
+        // Recent operations list (newest first, 10 rows)
+        const recent = this.state.recentOperations.filter(op => op.id !== payload.id);
+        recent.unshift(this._operationFromPayload(payload));
+        this.state.recentOperations = recent.slice(0, 10);
+        
+        // Cashbox counter comes computed from the server
+        const cashbox = this.state.activeCashboxes.find(cb => cb.id === payload.cashbox_id[0]);
+        if (cashbox) {
+            cashbox.pending_operations_count = payload.cashbox_pending_count;
+        }
+        this.state.lastUpdate = new Date();
     }
 
-    /**
-     * Stop auto-refresh timer
-     */
-    stopAutoRefresh() {
-        if (this.refreshInterval) {
-            clearInterval(this.refreshInterval);
-            this.refreshInterval = null;
-        }
+    _operationFromPayload(payload) {
+        return {
+            id: payload.id,
+            name: payload.name,
+            partner_id: payload.partner_id,
+            operation_type: payload.operation_type,
+            currency_type: payload.currency_type,
+            amount: payload.amount,
+            state: payload.state,
+            cashbox_id: payload.cashbox_id,
+            request_date: payload.request_date,
+            completion_date: payload.completion_date,
+        };
     }
 
     /**
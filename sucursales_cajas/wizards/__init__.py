@@ -2,4 +2,5 @@ from . import send_to_cashbox_wizard
 from . import cash_count_wizard
 from . import session_login_wizard
 from . import process_operation_wizard
-from . import close_session_wizard
\ No newline at end of file
+from . import close_session_wizard
+from . import batch_process_wizard
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+
+class BatchProcessWizard(models.TransientModel):
+    _name = 'sucursales_cajas.batch_process_wizard'
+    _description = 'Wizard para Procesar Operaciones en Lote'
+
+    # Caja y sesión
+    cashbox_id = fields.Many2one(
+        'sucursales_cajas.cashbox',
+        string='Caja',
+        required=True,
+        readonly=True
+    )
+
+    session_id = fields.Many2one(
+        related='cashbox_id.active_session_id',
+        string='Sesión'
+    )
+
+    # Operaciones a procesar
+    operation_ids = fields.Many2many(
+        'sucursales_cajas.operation',
+        'sucursales_cajas_batch_process_operation_rel',
+        'wizard_id',
+        'operation_id',
+        string='Operaciones',
+        domain="[('cashbox_id', '=', cashbox_id), ('state', 'in', ['pending', 'processing'])]"
+    )
+
+    # Verificación conjunta
+    identity_verified = fields.Boolean(
+        string='Identidades Verificadas',
+        help="Confirma que se verificó el DNI de los beneficiarios de las operaciones para terceros"
+    )
+
+    # Resultado
+    state = fields.Selection([
+        ('draft', 'Borrador'),
+        ('done', 'Procesado')
+    ], string='Estado', default='draft')
+
+    result_line_ids = fields.One2many(
+        'sucursales_cajas.batch_process_wizard.line',
+        'wizard_id',
+        string='Resultado'
+    )
+
+    done_count = fields.Integer(
+        string='Completadas',
+        readonly=True
+    )
+
+    error_count = fields.Integer(
+        string='Con Errores',
+        readonly=True
+    )
+
+    @api.model
+    def default_get(self, fields_list):
+        """Toma las operaciones seleccionadas en la lista"""
+        res = super().default_get(fields_list)
+
+        if self.env.context.get('active_model') == 'sucursales_cajas.operation':
+            operations = self.env['sucursales_cajas.operation'].browse(
+                self.env.context.get('active_ids', [])
+            ).filtered(lambda o: o.state in ('pending', 'processing'))
+
+            if not operations:
+                raise UserError(_('Seleccione al menos una operación pendiente.'))
+            if len(operations.cashbox_id) > 1:
+                raise UserError(_('Las operaciones a procesar en lote deben ser de la misma caja.'))
+
+            res['cashbox_id'] = operations.cashbox_id.id
+            res['operation_ids'] = [(6, 0, operations.ids)]
+
+        return res
+
+    def action_process(self):
+        """Procesa todas las operaciones y registra el resultado de cada una"""
+        self.ensure_one()
+
+        if not self.session_id:
+            raise UserError(_('No hay sesión activa en la caja.'))
+
+        if self.env.user not in self.cashbox_id.allowed_user_ids:
+            raise UserError(_('No tiene permisos para procesar operaciones en esta caja.'))
+
+        if not self.operation_ids:
+            raise UserError(_('Seleccione al menos una operación pendiente.'))
+
+        done, errors = self.operation_ids._complete_batch(
+            self.session_id,
+            identity_verified=self.identity_verified
+        )
+
+        lines = [(0, 0, {
+            'operation_id': operation.id,
+            'success': True,
+            'message': _('Completada'),
+        }) for operation in done]
+        lines += [(0, 0, {
+            'operation_id': operation.id,
+            'success': False,
+            'message': message,
+        }) for operation, message in errors.items()]
+
+        self.write({
+            'state': 'done',
+            'result_line_ids': [(5, 0, 0)] + lines,
+            'done_count': len(done),
+            'error_count': len(errors),
+        })
+
+        return {
+            'name': _('Procesar en Lote'),
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+
+class BatchProcessWizardLine(models.TransientModel):
+    _name = 'sucursales_cajas.batch_process_wizard.line'
+    _description = 'Resultado del Procesamiento en Lote'
+
+    wizard_id = fields.Many2one(
+        'sucursales_cajas.batch_process_wizard',
+        string='Wizard',
+        required=True,
+        ondelete='cascade'
+    )
+
+    operation_id = fields.Many2one(
+        'sucursales_cajas.operation',
+        string='Operación',
+        readonly=True
+    )
+
+    partner_id = fields.Many2one(
+        related='operation_id.partner_id',
+        string='Cliente'
+    )
+
+    operation_type = fields.Selection(
+        related='operation_id.operation_type',
+        string='Tipo'
+    )
+
+    currency_type = fields.Selection(
+        related='operation_id.currency_type',
+        string='Moneda'
+    )
+
+    amount = fields.Float(
+        related='operation_id.amount',
+        string='Monto'
+    )
+
+    success = fields.Boolean(
+        string='Completada',
+        readonly=True
+    )
+
+    message = fields.Char(
+        string='Detalle',
+        readonly=True
+    )
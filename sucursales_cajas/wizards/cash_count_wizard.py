@@ -2,7 +2,6 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
-import json
 
 
 class CashCountWizard(models.TransientModel):
@@ -61,46 +60,37 @@ class CashCountWizard(models.TransientModel):
         """Carga valores por defecto y crea líneas de denominaciones"""
         res = super().default_get(fields_list)
         
-        # Obtener denominaciones según la moneda
-        currency = res.get('currency_type', 'ARS')
-        denominations = self._get_denominations_for_currency(currency)
-        
-        # Crear líneas de denominaciones
-        lines = []
-        for i, denom in enumerate(denominations):
-            lines.append((0, 0, {
-                'sequence': i * 10,
-                'denomination': denom,
-                'quantity': 0,
-                'subtotal': 0.0,
-            }))
+        # Partir del conteo ya guardado en el balance, si lo hay
+        balance = self.env['sucursales_cajas.balance'].browse(res.get('balance_id'))
+        counted = {bill.denomination: bill.quantity for bill in balance.bill_ids}
         
-        res['denomination_ids'] = lines
+        currency = res.get('currency_type', 'ARS')
+        res['denomination_ids'] = self._prepare_denomination_lines(currency, counted)
         
         return res
     
+    @api.model
+    def _prepare_denomination_lines(self, currency_type, counted=None):
+        """Comandos de creación de líneas con las denominaciones en caché de la moneda"""
+        counted = counted or {}
+        return [(0, 0, {
+            'sequence': i * 10,
+            'denomination': denom,
+            'quantity': counted.get(denom, 0),
+        }) for i, denom in enumerate(self._get_denominations_for_currency(currency_type))]
+    
     @api.model
     def _get_denominations_for_currency(self, currency_type):
         """Retorna las denominaciones de billetes según la moneda"""
-        denominations = {
-            'ARS': [
-                10000, 2000, 1000, 500, 200, 100, 50, 20, 10, 5, 2, 1, 0.50, 0.25, 0.10, 0.05
-            ],
-            'USD': [
-                100, 50, 20, 10, 5, 2, 1
-            ],
-            'EUR': [
-                500, 200, 100, 50, 20, 10, 5
-            ]
-        }
-        
-        return denominations.get(currency_type, [])
+        return self.env['sucursales_cajas.balance_bill']._get_denominations(currency_type)
     
-    @api.depends('denomination_ids.subtotal')
+    @api.depends('denomination_ids.quantity')
     def _compute_total_amount(self):
         """Calcula el total contado"""
         for wizard in self:
-            wizard.total_amount = sum(wizard.denomination_ids.mapped('subtotal'))
+            wizard.total_amount = sum(
+                line.denomination * line.quantity for line in wizard.denomination_ids
+            )
     
     @api.depends('total_amount', 'current_amount')
     def _compute_difference(self):
@@ -164,21 +154,7 @@ class CashCountWizard(models.TransientModel):
     @api.onchange('currency_type')
     def _onchange_currency_type(self):
         """Recrea las líneas de denominaciones al cambiar la moneda"""
-        # Limpiar líneas existentes
-        self.denomination_ids = [(5, 0, 0)]
-        
-        # Crear nuevas líneas
-        denominations = self._get_denominations_for_currency(self.currency_type)
-        lines = []
-        for i, denom in enumerate(denominations):
-            lines.append((0, 0, {
-                'sequence': i * 10,
-                'denomination': denom,
-                'quantity': 0,
-                'subtotal': 0.0,
-            }))
-        
-        self.denomination_ids = lines
+        self.denomination_ids = [(5, 0, 0)] + self._prepare_denomination_lines(self.currency_type)
     
     def action_quick_count(self):
         """Abre un diálogo para conteo rápido por totales"""
@@ -194,15 +170,13 @@ class CashCountWizard(models.TransientModel):
         
         # Si está relacionado con un balance, actualizarlo
         if self.balance_id:
-            # Preparar detalle de billetes en JSON
-            bill_details = {}
-            for line in self.denomination_ids.filtered(lambda l: l.quantity > 0):
-                bill_details[str(line.denomination)] = line.quantity
-            
-            # Actualizar el balance
+            # Reemplazar el detalle de billetes por una fila por denominación
             self.balance_id.write({
                 'counted_amount': self.total_amount,
-                'bill_details': json.dumps(bill_details) if bill_details else False,
+                'bill_ids': [(5, 0, 0)] + [(0, 0, {
+                    'denomination': line.denomination,
+                    'quantity': line.quantity,
+                }) for line in self.denomination_ids if line.quantity > 0],
             })
             
             # Si el balance está en borrador, sugerir confirmarlo
@@ -21,7 +21,7 @@ class CloseSessionWizard(models.TransientModel):
     # Información de la sesión
     session_info = fields.Html(
         string='Información de la Sesión',
-        compute='_compute_session_info'
+        readonly=True
     )
     
     # Líneas de balance
@@ -34,23 +34,23 @@ class CloseSessionWizard(models.TransientModel):
     # Resumen de operaciones
     operations_summary = fields.Html(
         string='Resumen de Operaciones',
-        compute='_compute_operations_summary'
+        readonly=True
     )
     
     # Totales
     total_deposits_count = fields.Integer(
         string='Total Depósitos',
-        compute='_compute_totals'
+        readonly=True
     )
     
     total_withdrawals_count = fields.Integer(
         string='Total Retiros',
-        compute='_compute_totals'
+        readonly=True
     )
     
     total_operations_count = fields.Integer(
         string='Total Operaciones',
-        compute='_compute_totals'
+        readonly=True
     )
     
     # Discrepancias
@@ -94,172 +94,147 @@ class CloseSessionWizard(models.TransientModel):
     
     @api.model
     def default_get(self, fields_list):
-        """Carga valores por defecto"""
+        """Carga valores por defecto a partir de una única consulta agrupada de la sesión"""
         res = super().default_get(fields_list)
         
         session_id = self.env.context.get('default_session_id')
         if session_id:
             session = self.env['sucursales_cajas.session'].browse(session_id)
+            totals = self._get_session_operation_totals(session)
+            
+            # Balances de apertura y de cierre ya cargados, indexados por subcaja
+            opening_balances = {b.cashbox_line_id.id: b for b in session.opening_balance_ids}
+            closing_balances = {}
+            for balance in session.closing_balance_ids:
+                closing_balances.setdefault(balance.cashbox_line_id.id, balance)
+            
+            # Transferencias: las de la sesión para el saldo desde la apertura y
+            # las no liquidadas para el saldo vivo de la subcaja
+            active_lines = session.cashbox_id.cashbox_line_ids.filtered('active')
+            Transfer = self.env['sucursales_cajas.transfer']
+            session_deltas = Transfer._get_session_deltas(active_lines, session.start_datetime)
+            unsettled_deltas = Transfer._get_unsettled_deltas(active_lines)
             
-            # Obtener o crear balances de cierre
             lines = []
-            for cashbox_line in session.cashbox_id.cashbox_line_ids.filtered('active'):
-                # Buscar balance existente
-                balance = session.closing_balance_ids.filtered(
-                    lambda b: b.cashbox_line_id == cashbox_line
-                )
+            for cashbox_line in active_lines:
+                movements = totals['lines'].get(cashbox_line.id, {})
+                deposits = movements.get('deposits', 0.0)
+                withdrawals = movements.get('withdrawals', 0.0)
+                opening = opening_balances.get(cashbox_line.id)
+                
+                # Saldo esperado: apertura declarada más el neto de la sesión y de
+                # las transferencias; sin apertura, el saldo vivo de la subcaja
+                # más el efectivo enviado o recibido pendiente de liquidar
+                if opening:
+                    system_balance = (opening.declared_amount + deposits - withdrawals
+                                      + session_deltas.get(cashbox_line.id, 0.0))
+                else:
+                    system_balance = cashbox_line.current_balance + unsettled_deltas.get(cashbox_line.id, 0.0)
                 
+                balance = closing_balances.get(cashbox_line.id)
                 if balance:
-                    balance = balance[0]
                     declared = balance.declared_amount
                     counted = balance.counted_amount
                 else:
-                    declared = cashbox_line.session_current_balance
+                    declared = system_balance
                     counted = 0.0
                 
-                line_vals = {
+                lines.append((0, 0, {
                     'cashbox_line_id': cashbox_line.id,
                     'balance_id': balance.id if balance else False,
-                    'system_balance': cashbox_line.session_current_balance,
+                    'opening_balance': opening.declared_amount if opening else 0.0,
+                    'deposits_amount': deposits,
+                    'withdrawals_amount': withdrawals,
+                    'net_movement': deposits - withdrawals,
+                    'system_balance': system_balance,
                     'declared_balance': declared,
                     'counted_balance': counted,
-                }
-                
-                lines.append((0, 0, line_vals))
+                }))
             
-            res['balance_line_ids'] = lines
+            res.update({
+                'balance_line_ids': lines,
+                'total_operations_count': totals['done_count'],
+                'total_deposits_count': totals['deposit_count'],
+                'total_withdrawals_count': totals['withdrawal_count'],
+                'session_info': self._render_session_info(session, totals),
+                'operations_summary': self.env['ir.qweb']._render(
+                    'sucursales_cajas.close_session_operations_summary', {
+                        'currencies': [
+                            dict(data, currency=currency, net=data['deposits'] - data['withdrawals'])
+                            for currency, data in sorted(totals['currencies'].items())
+                        ],
+                    }),
+            })
         
         return res
     
-    @api.depends('session_id')
-    def _compute_session_info(self):
-        """Genera información HTML de la sesión"""
-        for wizard in self:
-            if not wizard.session_id:
-                wizard.session_info = ''
-                continue
-            
-            session = wizard.session_id
-            
-            html = '<div class="row">'
-            
-            # Información básica
-            html += '<div class="col-md-6">'
-            html += '<table class="table table-sm">'
-            html += f'<tr><td><strong>Sesión:</strong></td><td>{session.name}</td></tr>'
-            html += f'<tr><td><strong>Caja:</strong></td><td>{session.cashbox_id.display_name}</td></tr>'
-            html += f'<tr><td><strong>Usuario:</strong></td><td>{session.user_id.name}</td></tr>'
-            html += f'<tr><td><strong>Inicio:</strong></td><td>{session.start_datetime.strftime("%d/%m/%Y %H:%M")}</td></tr>'
-            
-            # Duración
-            duration = fields.Datetime.now() - session.start_datetime
-            hours = int(duration.total_seconds() // 3600)
-            minutes = int((duration.total_seconds() % 3600) // 60)
-            html += f'<tr><td><strong>Duración:</strong></td><td>{hours}h {minutes}m</td></tr>'
-            
-            html += '</table>'
-            html += '</div>'
-            
-            # Estadísticas
-            html += '<div class="col-md-6">'
-            html += '<table class="table table-sm">'
-            html += f'<tr><td><strong>Operaciones:</strong></td><td>{session.operation_count}</td></tr>'
-            html += f'<tr><td><strong>Depósitos:</strong></td><td>{session.deposit_count}</td></tr>'
-            html += f'<tr><td><strong>Retiros:</strong></td><td>{session.withdrawal_count}</td></tr>'
-            
-            if session.pending_operation_count > 0:
-                html += f'<tr class="text-danger"><td><strong>Pendientes:</strong></td><td>{session.pending_operation_count}</td></tr>'
-            
-            html += '</table>'
-            html += '</div>'
-            
-            html += '</div>'
-            
-            wizard.session_info = html
-    
-    @api.depends('session_id')
-    def _compute_operations_summary(self):
-        """Genera resumen de operaciones por moneda"""
-        for wizard in self:
-            if not wizard.session_id:
-                wizard.operations_summary = ''
+    @api.model
+    def _get_session_operation_totals(self, session):
+        """Agrupa las operaciones de la sesión por subcaja, moneda, tipo y estado en una sola consulta.
+        
+        Devuelve los contadores generales, los montos completados por moneda
+        (``currencies``) y los depósitos/retiros completados por subcaja (``lines``).
+        """
+        totals = {
+            'operation_count': 0,
+            'pending_count': 0,
+            'done_count': 0,
+            'deposit_count': 0,
+            'withdrawal_count': 0,
+            'currencies': {},
+            'lines': {},
+        }
+        
+        groups = self.env['sucursales_cajas.operation']._read_group(
+            [('session_id', '=', session.id)],
+            ['cashbox_line_id', 'currency_type', 'operation_type', 'state'],
+            ['amount:sum', '__count'],
+        )
+        
+        for cashbox_line, currency, operation_type, state, amount, count in groups:
+            totals['operation_count'] += count
+            if state == 'pending':
+                totals['pending_count'] += count
+            if state != 'done':
                 continue
             
-            # Agrupar operaciones por moneda y tipo
-            operations = wizard.session_id.operation_ids.filtered(lambda o: o.state == 'done')
-            
-            if not operations:
-                wizard.operations_summary = '<p class="text-muted">No se realizaron operaciones en esta sesión.</p>'
+            totals['done_count'] += count
+            if operation_type not in ('deposit', 'withdrawal'):
                 continue
             
-            # Diccionario para acumular por moneda
-            summary_by_currency = {}
-            
-            for op in operations:
-                currency = op.currency_type
-                if currency not in summary_by_currency:
-                    summary_by_currency[currency] = {
-                        'deposits': 0.0,
-                        'withdrawals': 0.0,
-                        'deposit_count': 0,
-                        'withdrawal_count': 0,
-                    }
-                
-                if op.operation_type == 'deposit':
-                    summary_by_currency[currency]['deposits'] += op.amount
-                    summary_by_currency[currency]['deposit_count'] += 1
-                elif op.operation_type == 'withdrawal':
-                    summary_by_currency[currency]['withdrawals'] += op.amount
-                    summary_by_currency[currency]['withdrawal_count'] += 1
-            
-            # Generar HTML
-            html = '<table class="table table-sm table-bordered">'
-            html += '<thead><tr>'
-            html += '<th>Moneda</th>'
-            html += '<th class="text-center">Depósitos</th>'
-            html += '<th class="text-center">Retiros</th>'
-            html += '<th class="text-center">Neto</th>'
-            html += '</tr></thead><tbody>'
-            
-            for currency, data in sorted(summary_by_currency.items()):
-                net = data['deposits'] - data['withdrawals']
-                net_class = 'text-success' if net >= 0 else 'text-danger'
-                
-                html += f'<tr>'
-                html += f'<td><strong>{currency}</strong></td>'
-                html += f'<td class="text-center">'
-                html += f'{data["deposits"]:,.2f}<br/>'
-                html += f'<small class="text-muted">({data["deposit_count"]} ops)</small>'
-                html += f'</td>'
-                html += f'<td class="text-center">'
-                html += f'{data["withdrawals"]:,.2f}<br/>'
-                html += f'<small class="text-muted">({data["withdrawal_count"]} ops)</small>'
-                html += f'</td>'
-                html += f'<td class="text-center {net_class}">'
-                html += f'<strong>{net:+,.2f}</strong>'
-                html += f'</td>'
-                html += f'</tr>'
+            kind = 'deposits' if operation_type == 'deposit' else 'withdrawals'
+            count_key = 'deposit_count' if operation_type == 'deposit' else 'withdrawal_count'
+            totals[count_key] += count
             
-            html += '</tbody></table>'
+            currency_data = totals['currencies'].setdefault(currency, {
+                'deposits': 0.0,
+                'withdrawals': 0.0,
+                'deposit_count': 0,
+                'withdrawal_count': 0,
+            })
+            currency_data[kind] += amount
+            currency_data[count_key] += count
             
-            wizard.operations_summary = html
+            if cashbox_line:
+                line_data = totals['lines'].setdefault(cashbox_line.id, {
+                    'deposits': 0.0,
+                    'withdrawals': 0.0,
+                })
+                line_data[kind] += amount
+        
+        return totals
     
-    @api.depends('session_id')
-    def _compute_totals(self):
-        """Calcula totales de operaciones"""
-        for wizard in self:
-            if wizard.session_id:
-                done_operations = wizard.session_id.operation_ids.filtered(lambda o: o.state == 'done')
-                deposits = done_operations.filtered(lambda o: o.operation_type == 'deposit')
-                withdrawals = done_operations.filtered(lambda o: o.operation_type == 'withdrawal')
-                
-                wizard.total_deposits_count = len(deposits)
-                wizard.total_withdrawals_count = len(withdrawals)
-                wizard.total_operations_count = len(done_operations)
-            else:
-                wizard.total_deposits_count = 0
-                wizard.total_withdrawals_count = 0
-                wizard.total_operations_count = 0
+    @api.model
+    def _render_session_info(self, session, totals):
+        """Renderiza la ficha de la sesión con los contadores ya agrupados"""
+        duration = fields.Datetime.now() - session.start_datetime
+        return self.env['ir.qweb']._render('sucursales_cajas.close_session_info', {
+            'session': session,
+            'start': session.start_datetime.strftime("%d/%m/%Y %H:%M"),
+            'hours': int(duration.total_seconds() // 3600),
+            'minutes': int((duration.total_seconds() % 3600) // 60),
+            'totals': totals,
+        })
     
     @api.depends('balance_line_ids.difference')
     def _compute_has_discrepancies(self):
@@ -330,74 +305,55 @@ class CloseSessionWizard(models.TransientModel):
                         % line.cashbox_line_id.display_name
                     )
     
-    def _create_closing_balances(self):
-        """Crea o actualiza los balances de cierre"""
-        Balance = self.env['sucursales_cajas.balance']
-        
+    def _prepare_closing_balances(self):
+        """Valores de los balances de cierre, serializables para la tarea de cierre"""
+        balance_lines = []
         for line in self.balance_line_ids:
-            if line.balance_id:
-                # Actualizar balance existente
-                line.balance_id.write({
-                    'declared_amount': line.declared_balance,
-                    'counted_amount': line.counted_balance if line.cashbox_line_id.is_cash else 0,
-                    'notes': line.notes,
-                })
-                balance = line.balance_id
-            else:
-                # Crear nuevo balance
-                balance_vals = {
-                    'session_id': self.session_id.id,
-                    'balance_type': 'closing',
-                    'cashbox_line_id': line.cashbox_line_id.id,
-                    'system_balance': line.system_balance,
-                    'declared_amount': line.declared_balance,
-                    'counted_amount': line.counted_balance if line.cashbox_line_id.is_cash else 0,
-                    'notes': line.notes,
-                }
-                balance = Balance.create(balance_vals)
-            
-            # Confirmar el balance
-            if balance.state == 'draft':
-                balance.action_confirm()
-    
-    def action_close_session(self):
-        """Cierra la sesión"""
-        self.ensure_one()
-        
-        # Validaciones
-        self._validate_closing()
-        
-        # Crear/actualizar balances de cierre
-        self._create_closing_balances()
-        
-        # Actualizar observaciones de la sesión
+            # Saldo del sistema ya precalculado en el wizard
+            balance_lines.append({
+                'balance_id': line.balance_id.id,
+                'cashbox_line_id': line.cashbox_line_id.id,
+                'system_balance': line.system_balance,
+                'declared_amount': line.declared_balance,
+                'counted_amount': line.counted_balance if line.cashbox_line_id.is_cash else 0,
+                'notes': line.notes or False,
+            })
+        return balance_lines
+    
+    def _prepare_closing_notes(self):
+        """Observaciones de cierre con la justificación de discrepancias"""
         notes = self.closing_notes or ''
         if self.has_discrepancies and self.discrepancy_notes:
             if notes:
                 notes += '\n\n'
             notes += f"[Discrepancias] {self.discrepancy_notes}"
+        return notes
+    
+    def action_close_session(self):
+        """Valida el cierre y lo ejecuta en segundo plano.
         
-        self.session_id.closing_notes = notes
+        La tarea se encola sobre la sesión con los valores ya preparados: el
+        wizard es transitorio y puede eliminarse antes de que la tarea corra.
+        """
+        self.ensure_one()
         
-        # Cerrar la sesión
-        self.session_id.action_close_session()
+        # Validaciones
+        self._validate_closing()
         
-        # Imprimir reporte si está marcado
-        if self.print_report:
-            # TODO: Implementar reporte
-            pass
+        # No encolar un segundo cierre mientras otro está pendiente o en curso
+        pending = self.env['chequera.job'].sudo().search([
+            ('model_name', '=', 'sucursales_cajas.session'),
+            ('method_name', '=', '_close_with_balances'),
+            ('state', 'in', ('pending', 'running')),
+        ]).filtered(lambda job: self.session_id.id in (job.res_ids or []))
+        if pending:
+            raise UserError(_('El cierre de la sesión %s ya se está procesando.') % self.session_id.name)
         
-        # Mostrar mensaje de éxito
-        return {
-            'type': 'ir.actions.client',
-            'tag': 'display_notification',
-            'params': {
-                'title': _('Sesión Cerrada'),
-                'message': _('La sesión %s ha sido cerrada exitosamente.') % self.session_id.name,
-                'sticky': False,
-                'type': 'success',
-            }
-        }
+        return self.env['chequera.job']._enqueue_action(
+            self.session_id, '_close_with_balances',
+            args=[self._prepare_closing_balances(), self._prepare_closing_notes(), self.print_report],
+            name=_('Cierre de sesión %s') % self.session_id.name,
+        )
 
 
 class CloseSessionWizardLine(models.TransientModel):
@@ -449,13 +405,13 @@ class CloseSessionWizardLine(models.TransientModel):
     # Balances
     opening_balance = fields.Float(
         string='Saldo Apertura',
-        compute='_compute_opening_balance'
+        readonly=True
     )
     
     system_balance = fields.Float(
         string='Saldo Sistema',
         readonly=True,
-        help="Saldo calculado según las operaciones"
+        help="Saldo esperado: apertura declarada más depósitos menos retiros de la sesión"
     )
     
     declared_balance = fields.Float(
@@ -474,20 +430,20 @@ class CloseSessionWizardLine(models.TransientModel):
         store=True
     )
     
-    # Movimientos del día
+    # Movimientos del día (cargados desde el resumen agrupado de la sesión)
     deposits_amount = fields.Float(
         string='Depósitos',
-        compute='_compute_movements'
+        readonly=True
     )
     
     withdrawals_amount = fields.Float(
         string='Retiros',
-        compute='_compute_movements'
+        readonly=True
     )
     
     net_movement = fields.Float(
         string='Movimiento Neto',
-        compute='_compute_movements'
+        readonly=True
     )
     
     # Notas
@@ -495,45 +451,6 @@ class CloseSessionWizardLine(models.TransientModel):
         string='Observaciones'
     )
     
-    @api.depends('cashbox_line_id', 'wizard_id.session_id')
-    def _compute_opening_balance(self):
-        """Obtiene el saldo de apertura"""
-        for line in self:
-            if line.wizard_id.session_id:
-                opening = line.wizard_id.session_id.opening_balance_ids.filtered(
-                    lambda b: b.cashbox_line_id == line.cashbox_line_id
-                )
-                if opening:
-                    line.opening_balance = opening[0].declared_amount
-                else:
-                    line.opening_balance = 0.0
-            else:
-                line.opening_balance = 0.0
-    
-    @api.depends('cashbox_line_id', 'wizard_id.session_id')
-    def _compute_movements(self):
-        """Calcula los movimientos del día"""
-        for line in self:
-            deposits = 0.0
-            withdrawals = 0.0
-            
-            if line.wizard_id.session_id and line.cashbox_line_id:
-                # Filtrar operaciones de esta subcaja
-                operations = line.wizard_id.session_id.operation_ids.filtered(
-                    lambda o: o.state == 'done' and 
-                    o.cashbox_line_id == line.cashbox_line_id
-                )
-                
-                for op in operations:
-                    if op.operation_type == 'deposit':
-                        deposits += op.amount
-                    elif op.operation_type == 'withdrawal':
-                        withdrawals += op.amount
-            
-            line.deposits_amount = deposits
-            line.withdrawals_amount = withdrawals
-            line.net_movement = deposits - withdrawals
-    
     @api.depends('system_balance', 'declared_balance', 'counted_balance', 'is_cash')
     def _compute_difference(self):
         """Calcula la diferencia"""
@@ -2,7 +2,7 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
-import json
+from markupsafe import Markup
 
 
 class ProcessOperationWizard(models.TransientModel):
@@ -160,50 +160,29 @@ class ProcessOperationWizard(models.TransientModel):
     def _compute_transfer_info(self):
         """Genera HTML con información de transferencia"""
         for wizard in self:
-            if not wizard.operation_id.transfer_data:
+            destination = wizard.operation_id.transfer_destination_id
+            if not destination:
                 wizard.transfer_info = ''
                 continue
             
-            try:
-                data = json.loads(wizard.operation_id.transfer_data)
-                
-                html = '<div class="alert alert-info">'
-                html += '<h6><i class="fa fa-exchange"></i> Datos de Transferencia</h6>'
-                html += '<table class="table table-sm mb-0">'
-                
-                if data.get('type') == 'bank_transfer':
-                    html += f'<tr><td><strong>Banco:</strong></td><td>{data.get("bank_name", "-")}</td></tr>'
-                    html += f'<tr><td><strong>Titular:</strong></td><td>{data.get("account_holder", "-")}</td></tr>'
-                    
-                    if data.get('cbu'):
-                        html += f'<tr><td><strong>CBU:</strong></td><td>{data.get("cbu")}</td></tr>'
-                    if data.get('alias'):
-                        html += f'<tr><td><strong>Alias:</strong></td><td>{data.get("alias")}</td></tr>'
-                    if data.get('account_number'):
-                        html += f'<tr><td><strong>Cuenta:</strong></td><td>{data.get("account_number")}</td></tr>'
-                
-                elif data.get('type') == 'crypto':
-                    html += f'<tr><td><strong>Red:</strong></td><td>{data.get("network", "-")}</td></tr>'
-                    addr = data.get('address', '')
-                    if len(addr) > 20:
-                        addr_display = f"{addr[:10]}...{addr[-10:]}"
-                    else:
-                        addr_display = addr
-                    html += f'<tr><td><strong>Dirección:</strong></td><td><code>{addr_display}</code></td></tr>'
-                
-                html += '</table></div>'
-                
-                wizard.transfer_info = html
-                
-            except:
-                wizard.transfer_info = '<p class="text-danger">Error al leer datos de transferencia</p>'
+            # Markup para que los datos cargados por el usuario se escapen
+            html = Markup('<div class="alert alert-info">')
+            html += Markup('<h6><i class="fa fa-exchange"></i> Datos de Transferencia</h6>')
+            html += Markup('<table class="table table-sm mb-0">')
+            for label, value in destination._get_display_lines(short=True):
+                if label == _('Dirección'):
+                    value = Markup('<code>%s</code>') % value
+                html += Markup('<tr><td><strong>%s:</strong></td><td>%s</td></tr>') % (label, value)
+            html += Markup('</table></div>')
+            
+            wizard.transfer_info = html
     
     @api.depends('cashbox_line_id')
     def _compute_current_balance(self):
-        """Calcula el saldo disponible de la subcaja"""
+        """Calcula el saldo disponible de la subcaja, sin lo comprometido en transferencias"""
         for wizard in self:
             if wizard.cashbox_line_id:
-                wizard.current_balance = wizard.cashbox_line_id.current_balance
+                wizard.current_balance = wizard.cashbox_line_id.available_balance
             else:
                 wizard.current_balance = 0.0
     
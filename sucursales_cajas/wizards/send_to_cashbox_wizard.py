@@ -2,7 +2,6 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
-import json
 
 
 class SendToCashboxWizard(models.TransientModel):
@@ -105,6 +104,14 @@ class SendToCashboxWizard(models.TransientModel):
         ('mercadopago', 'Mercado Pago')
     ], string='Tipo de Transferencia')
     
+    # Cuenta destino ya usada por el cliente
+    destination_id = fields.Many2one(
+        'sucursales_cajas.transfer_destination',
+        string='Cuenta Frecuente',
+        domain="[('partner_id', '=', partner_id), ('transfer_type', '=', transfer_type)]",
+        help="Seleccione una cuenta destino usada anteriormente por el cliente"
+    )
+    
     # Datos de cuenta destino (para transferencias en retiros)
     destination_bank = fields.Char(string='Banco')
     destination_account_number = fields.Char(string='Número de Cuenta')
@@ -199,6 +206,7 @@ class SendToCashboxWizard(models.TransientModel):
             self.destination_account_holder = False
             self.destination_network = False
             self.destination_wallet = False
+            self.destination_id = False
         else:
             # Establecer tipo de transferencia por defecto
             if self.currency_type in ['USDT']:
@@ -209,6 +217,9 @@ class SendToCashboxWizard(models.TransientModel):
     @api.onchange('transfer_type')
     def _onchange_transfer_type(self):
         """Limpia campos según el tipo de transferencia"""
+        if self.destination_id.transfer_type != self.transfer_type:
+            self.destination_id = False
+        
         if self.transfer_type != 'bank_transfer':
             self.destination_bank = False
             self.destination_account_number = False
@@ -219,6 +230,19 @@ class SendToCashboxWizard(models.TransientModel):
             self.destination_network = False
             self.destination_wallet = False
     
+    @api.onchange('destination_id')
+    def _onchange_destination_id(self):
+        """Completa los datos con la cuenta destino seleccionada"""
+        destination = self.destination_id
+        if destination:
+            self.destination_bank = destination.bank_name
+            self.destination_account_number = destination.account_number
+            self.destination_cbu = destination.cbu
+            self.destination_alias = destination.alias
+            self.destination_account_holder = destination.account_holder
+            self.destination_network = destination.network
+            self.destination_wallet = destination.address
+    
     @api.onchange('currency_type')
     def _onchange_currency_type(self):
         """Ajusta opciones según la moneda"""
@@ -240,32 +264,33 @@ class SendToCashboxWizard(models.TransientModel):
             if not self.beneficiary_name and self.partner_id:
                 self.beneficiary_name = self.partner_id.name
     
-    def _prepare_transfer_data(self):
-        """Prepara los datos de transferencia en formato JSON"""
-        transfer_data = {}
-        
+    def _prepare_transfer_destination(self):
+        """Obtiene (o registra) la cuenta destino normalizada de la transferencia"""
         if self.transfer_type == 'bank_transfer':
-            transfer_data = {
-                'type': 'bank_transfer',
-                'bank_name': self.destination_bank or '',
-                'account_number': self.destination_account_number or '',
-                'cbu': self.destination_cbu or '',
-                'alias': self.destination_alias or '',
-                'account_holder': self.destination_account_holder or '',
+            vals = {
+                'bank_name': self.destination_bank,
+                'account_number': self.destination_account_number,
+                'cbu': self.destination_cbu,
+                'alias': self.destination_alias,
+                'account_holder': self.destination_account_holder,
             }
         elif self.transfer_type == 'crypto':
-            transfer_data = {
-                'type': 'crypto',
-                'network': self.destination_network or '',
-                'address': self.destination_wallet or '',
+            vals = {
+                'network': self.destination_network,
+                'address': self.destination_wallet,
             }
         elif self.transfer_type == 'mercadopago':
-            transfer_data = {
-                'type': 'mercadopago',
-                'alias': self.destination_alias or '',
+            vals = {
+                'alias': self.destination_alias,
             }
+        else:
+            return self.env['sucursales_cajas.transfer_destination']
+        
+        if not any(vals.values()):
+            return self.env['sucursales_cajas.transfer_destination']
         
-        return json.dumps(transfer_data)
+        vals['transfer_type'] = self.transfer_type
+        return self.env['sucursales_cajas.transfer_destination']._find_or_create(self.partner_id, vals)
     
     def _validate_transfer_data(self):
         """Valida que se hayan ingresado los datos necesarios para transferencia"""
@@ -345,7 +370,7 @@ class SendToCashboxWizard(models.TransientModel):
         if self.delivery_method == 'transfer':
             operation_vals.update({
                 'transfer_type': self.transfer_type,
-                'transfer_data': self._prepare_transfer_data(),
+                'transfer_destination_id': self._prepare_transfer_destination().id,
             })
         
         # Crear la operación